@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from utils.error_handlers import (
     validation_exception_handler,
@@ -18,6 +18,10 @@ current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 from config.settings import settings
+from services.container import container
+from utils.response_cache import ResponseCache, ResponseCacheMiddleware
+from utils.compression import CompressionMiddleware, ResponseCompressor
+from utils.exporters import ARROW_MEDIA_TYPE, ExportDependencyError, ensure_arrow_support, frame_to_arrow_ipc
 import uvicorn
 import logging
 
@@ -35,6 +39,43 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+def current_data_version() -> Optional[str]:
+    """Versi dataset aktif; None jika DataService belum siap (cache di-bypass)"""
+    if not container.is_loaded('data_service'):
+        return None
+    return container.data_service.data_version
+
+def no_store_response(content: dict) -> JSONResponse:
+    """Response fallback/degraded: Cache-Control no-store supaya tidak disimpan response cache"""
+    return JSONResponse(content=content, headers={"Cache-Control": "no-store"})
+
+# Kompresi response; dipakai juga oleh response cache untuk menyimpan
+# body terkompresi per entry (kompresi sekali, bukan per hit)
+compressor = ResponseCompressor(
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality
+) if settings.compression_enabled else None
+
+# Response cache untuk endpoint data (ditambahkan sebelum CORS supaya
+# header CORS tetap dipasang oleh middleware terluar)
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    max_bytes=settings.response_cache_max_mb * 1024 * 1024
+)
+if settings.response_cache_enabled:
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        cache=response_cache,
+        version_provider=current_data_version,
+        compressor=compressor
+    )
+
+# Kompresi response non-cache (mis. batch prediction); response cache
+# yang sudah ber-Content-Encoding diteruskan apa adanya
+if compressor is not None:
+    app.add_middleware(CompressionMiddleware, compressor=compressor)
+
 # CORS middleware for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -48,41 +89,28 @@ app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
-# Global variables for services (initialized later)
-data_service = None
-prediction_service = None
-ai_service = None
-
 @app.on_event("startup")
 async def startup_event():
     """Initialize application components on startup"""
-    global data_service, prediction_service, ai_service
-    
     logger.info("🚀 Starting PANGAN-AI Backend...")
     logger.info(f"📊 Debug mode: {settings.debug}")
     logger.info(f"📁 Data directory: {settings.data_dir}")
     
-    # Test service initialization
-    try:
-        from services.data_service import DataService
-        from services.prediction_service import PredictionService
-        from services.ai_service import AIService
-        
-        # Initialize services
-        data_service = DataService()
-        prediction_service = PredictionService()
-        ai_service = AIService()
-        
-        logger.info("✅ All services initialized successfully")
-        
-    except Exception as e:
-        logger.error(f"⚠️ Service initialization warning: {str(e)}")
+    # Dataset dan model di-load sekali ke service container yang di-share
+    # oleh semua router dan fallback endpoints. TensorFlow dan AI SDK
+    # di-warm-up di background agar endpoint data langsung tersedia.
+    container.startup(background_warmup=settings.background_warmup)
+    
+    if container.get_status()['failed']:
         logger.info("🔄 Running in fallback mode...")
+    else:
+        logger.info("✅ Data service ready, prediction/AI services warming up")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown"""
     logger.info("🛑 Shutting down PANGAN-AI Backend...")
+    container.shutdown()
 
 @app.get("/")
 async def root():
@@ -127,6 +155,7 @@ async def comprehensive_health_check():
         }
         
         # Check services if available
+        data_service = container.try_get('data_service')
         if data_service:
             health_status["components"] = {
                 "data_service": {
@@ -143,6 +172,9 @@ async def comprehensive_health_check():
             health_status["status"] = "degraded"
             health_status["warnings"] = ["Services not fully loaded"]
         
+        health_status["service_container"] = container.get_status()
+        health_status["response_cache"] = response_cache.get_stats()
+        
         return health_status
         
     except Exception as e:
@@ -159,6 +191,7 @@ async def comprehensive_health_check():
 @app.get("/api/data/commodities")
 async def get_commodities_fallback():
     """Fallback commodities endpoint"""
+    data_service = container.try_get('data_service')
     if data_service:
         try:
             commodities = data_service.get_available_commodities()
@@ -168,15 +201,15 @@ async def get_commodities_fallback():
                 "count": len(commodities)
             }
         except Exception as e:
-            return {"error": str(e), "fallback": True}
+            return no_store_response({"error": str(e), "fallback": True})
     else:
-        return {
+        return no_store_response({
             "success": True,
             "commodities": ["Cabai Rawit Merah"],
             "count": 3,
             "fallback": True,
             "message": "Using mock data - services not loaded"
-        }
+        })
 
 # Tambahkan ini setelah @app.get("/health") di app.py
 
@@ -188,12 +221,51 @@ async def get_historical_data_force(
     start_date: str = None,
     end_date: str = None,
     include_weather: bool = True,
-    include_events: bool = True
+    include_events: bool = True,
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = Query(None, ge=1, le=settings.historical_max_page_size),
+    resolution: str = Query("raw", pattern="^(raw|daily|weekly|monthly|lttb)$"),
+    points: int = Query(500, ge=3, le=10000),
+    format: str = Query("json", pattern="^(json|arrow)$"),
+    fields: Optional[str] = None
 ):
-    """Historical data endpoint - force registered with debug"""
+    """
+    Historical data endpoint - force registered with debug.
+    Tanpa cursor/page_size: 1000 baris terakhir (terurut by tanggal).
+    Dengan cursor atau page_size: keyset pagination terurut by
+    (komoditas, wilayah, tanggal); lanjutkan dengan pagination.next_cursor.
+    Dengan resolution daily/weekly/monthly (agregat OHLC) atau lttb (target
+    `points` titik per series), seluruh range di-downsample di server.
+    format=arrow mengembalikan Arrow IPC stream (metadata response ada di
+    schema metadata key 'pangan_ai').
+    fields (comma-separated, mis. "tanggal,harga") membatasi field per record;
+    hanya kolom yang dibutuhkan yang diambil dari data layer. Tanpa fields,
+    include_weather/include_events menentukan blok cuaca/events.
+    """
     logger.info(f"🔍 Historical data requested: komoditas='{komoditas}', wilayah='{wilayah}'")
     
+    paginated = cursor is not None or page_size is not None
+    if paginated and resolution != "raw":
+        raise HTTPException(status_code=400, detail="Pagination is only supported with resolution=raw")
+    if format == "arrow":
+        try:
+            ensure_arrow_support()
+        except ExportDependencyError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    if cursor and container.try_get('data_service'):
+        try:
+            container.data_service.decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    requested_fields = None
+    if fields and container.try_get('data_service'):
+        try:
+            requested_fields = container.data_service.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
     try:
+        data_service = container.try_get('data_service')
         if data_service:
             logger.info(f"📊 DataService status: data_loaded={data_service.data_loaded}")
             
@@ -202,8 +274,9 @@ async def get_historical_data_force(
                 available_commodities = data_service.get_available_commodities()
                 available_regions = data_service.get_available_regions()
                 
-                logger.info(f"📦 Available commodities: {available_commodities}")
-                logger.info(f"🌍 Available regions: {available_regions}")
+                # Projection: field response -> kolom yang diambil dari data layer
+                response_fields = requested_fields or data_service.default_fields(include_weather, include_events)
+                columns = data_service.historical_columns(response_fields)
                 
                 # Check case sensitivity
                 komoditas_normalized = komoditas.title() if komoditas != "all" else "all"
@@ -228,60 +301,64 @@ async def get_historical_data_force(
                         logger.error(f"❌ Invalid end_date: {e}")
                 
                 # Try with original komoditas first
-                result = data_service.get_historical_data(
-                    commodity=None if komoditas == "all" else komoditas,
-                    region=None if wilayah == "all" else wilayah,
-                    start_date=start_dt,
-                    end_date=end_dt,
-                    limit=1000
-                )
+                if paginated:
+                    data, metadata = data_service.get_historical_page(
+                        commodity=None if komoditas == "all" else komoditas,
+                        region=None if wilayah == "all" else wilayah,
+                        start_date=start_dt,
+                        end_date=end_dt,
+                        cursor=cursor,
+                        page_size=page_size or settings.historical_page_size,
+                        columns=columns
+                    )
+                else:
+                    data, metadata = data_service.get_historical_frame(
+                        commodity=None if komoditas == "all" else komoditas,
+                        region=None if wilayah == "all" else wilayah,
+                        start_date=start_dt,
+                        end_date=end_dt,
+                        limit=1000,
+                        resolution=resolution,
+                        points=points,
+                        columns=columns
+                    )
                 
-                logger.info(f"📈 DataService result success: {result.get('success', False)}")
-                logger.info(f"📊 Records returned: {len(result.get('data', []))}")
+                logger.info(f"📊 Records returned: {len(data)}")
                 
-                if result.get('success', False) and len(result.get('data', [])) > 0:
-                    # Process successful data
-                    processed_data = []
-                    raw_data = result.get('data', [])
-                    
-                    for item in raw_data:
-                        data_item = {
-                            "tanggal": item['tanggal'],
-                            "komoditas": item['komoditas'],
-                            "wilayah": item['wilayah'],
-                            "level_harga": level_harga if level_harga != "all" else "Konsumen", 
-                            "harga": item['harga']
-                        }
-                        
-                        if include_weather:
-                            data_item["cuaca"] = {
-                                "suhu_rata": item.get('tavg', 26.5),
-                                "kelembaban": item.get('rh_avg', 75),
-                                "curah_hujan": item.get('curah_hujan', 0),
-                                "kecepatan_angin": item.get('ff_avg', 3)
-                            }
-                        
-                        if include_events:
-                            events = []
-                            if item.get('ramadan', False):
-                                events.append("ramadan")
-                            if item.get('idul_fitri', False):
-                                events.append("idul_fitri")
-                            if item.get('natal_newyear', False):
-                                events.append("natal_tahun_baru")
-                            if not events:
-                                events.append("normal")
-                            data_item["events"] = events
-                        
-                        processed_data.append(data_item)
+                if format == "arrow":
+                    # Columnar langsung dari frame, tanpa record per baris
+                    arrow_metadata = {
+                        "filters_applied": {
+                            "komoditas": komoditas,
+                            "wilayah": wilayah,
+                            "level_harga": level_harga,
+                            "start_date": start_date,
+                            "end_date": end_date,
+                            "fields": requested_fields
+                        },
+                        "metadata": metadata
+                    }
+                    body = frame_to_arrow_ipc(
+                        data_service.build_columnar_frame(data, fields=response_fields),
+                        metadata=arrow_metadata
+                    )
+                    return Response(content=body, media_type=ARROW_MEDIA_TYPE)
+                
+                # Page kosong tetap response valid (akhir pagination)
+                if len(data) > 0 or paginated:
+                    # Process successful data (column-wise, satu pass)
+                    processed_data = data_service.build_api_records(
+                        data,
+                        level_harga=level_harga if level_harga != "all" else "Konsumen",
+                        fields=response_fields
+                    )
                     
                     # Extract summary
-                    metadata = result.get('metadata', {})
                     price_stats = metadata.get('price_stats', {})
                     
                     logger.info(f"✅ Returning REAL data: {len(processed_data)} records")
                     
-                    return {
+                    response = {
                         "success": True,
                         "data": processed_data,
                         "filters_applied": {
@@ -291,7 +368,8 @@ async def get_historical_data_force(
                             "start_date": start_date,
                             "end_date": end_date,
                             "include_weather": include_weather,
-                            "include_events": include_events
+                            "include_events": include_events,
+                            "fields": requested_fields
                         },
                         "summary": {
                             "total_records": len(processed_data),
@@ -309,6 +387,12 @@ async def get_historical_data_force(
                             "normalized_komoditas": komoditas_normalized
                         }
                     }
+                    if paginated:
+                        response["pagination"] = metadata['pagination']
+                    if 'downsampling' in metadata:
+                        response["downsampling"] = metadata['downsampling']
+                    
+                    return response
                 else:
                     logger.warning(f"⚠️ DataService returned no data or failed")
                     # Try with normalized komoditas
@@ -334,9 +418,10 @@ async def get_historical_data_force(
         import traceback
         logger.error(f"🔥 Traceback: {traceback.format_exc()}")
     
-    # Fallback mock data
+    # Fallback mock data (tidak di-cache: error sementara tidak boleh
+    # tersimpan di bawah data_version yang valid)
     logger.info("🔄 Returning MOCK data")
-    return {
+    return no_store_response({
         "success": True,
         "data": [
             {
@@ -368,11 +453,12 @@ async def get_historical_data_force(
         "debug_info": {
             "reason": "DataService failed or returned no data"
         }
-    }
+    })
 
 @app.get("/api/data/regions")
 async def get_regions_fallback():
     """Fallback regions endpoint"""
+    data_service = container.try_get('data_service')
     if data_service:
         try:
             regions = data_service.get_available_regions()
@@ -382,19 +468,20 @@ async def get_regions_fallback():
                 "count": len(regions)
             }
         except Exception as e:
-            return {"error": str(e), "fallback": True}
+            return no_store_response({"error": str(e), "fallback": True})
     else:
-        return {
+        return no_store_response({
             "success": True,
             "regions": ["Kota Bandung", "Kota Depok", "Kota Bekasi", "Kabupaten Garut", "Kabupaten Bandung", "Kabupaten Bogor", "Kabupaten Cianjur", "Kabupaten Majalengka"],
             "count": 8,
             "fallback": True,
             "message": "Using mock data - services not loaded"
-        }
+        })
 
 @app.get("/api/predict/health")
 async def prediction_health_fallback():
     """Fallback prediction health endpoint"""
+    prediction_service = container.try_get('prediction_service')
     if prediction_service:
         try:
             return prediction_service.get_prediction_health_check()
@@ -412,6 +499,7 @@ async def prediction_health_fallback():
 @app.get("/api/ai/status")
 async def ai_status_fallback():
     """Fallback AI status endpoint"""
+    ai_service = container.try_get('ai_service')
     if ai_service:
         try:
             status = ai_service.get_ai_service_status()
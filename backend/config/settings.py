@@ -25,6 +25,61 @@ class Settings(BaseSettings):
     model_path: str = "./data/models/"
     scaler_path: str = "./data/scalers/"
     
+    # Feature cache (processed dataset di-persist per fingerprint CSV)
+    feature_cache_enabled: bool = True
+    feature_cache_path: str = "./data/cache/"
+    
+    # Load AI SDK dan TensorFlow di background thread saat startup
+    background_warmup: bool = True
+    
+    # Hot reload: interval polling file dataset dalam detik (0 = nonaktif)
+    dataset_watch_interval: int = 0
+    
+    # Compact in-memory schema (categorical dimensi, float32 fitur, int8 flag)
+    compact_schema: bool = False
+    
+    # Memory-mapped model input store (float32, sudah di-scale per series)
+    feature_store_enabled: bool = False
+    feature_store_path: str = "./data/feature_store/"
+    
+    # Keyset pagination /api/data/historical
+    historical_page_size: int = 500
+    historical_max_page_size: int = 5000
+    
+    # Jumlah series maksimal per request /api/data/matrix
+    matrix_max_series: int = 100
+    
+    # Price alert: rata-rata N baris terakhir vs M baris sebelumnya per series,
+    # alert jika |perubahan| >= threshold (%), CRITICAL jika >= critical (%)
+    price_alert_recent_window: int = 7
+    price_alert_previous_window: int = 7
+    price_alert_threshold_pct: float = 20.0
+    price_alert_critical_pct: float = 30.0
+    
+    # Jumlah baris per chunk untuk streaming /api/data/export
+    export_chunk_size: int = 50000
+    
+    # Response cache endpoint data (key: route + query + versi dataset)
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 256
+    response_cache_max_mb: int = 64
+    
+    # Kompresi response (gzip, brotli jika package 'brotli' terinstall)
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    
+    # Storage backend DataProcessor: "memory" (pandas frame per worker)
+    # atau "sqlite" (file embedded, query di-push ke engine)
+    storage_backend: str = "memory"
+    sqlite_path: str = "./data/cache/pangan_ai.sqlite"
+    # POST /api/data/ingest butuh storage_backend "sqlite" (persist, semua
+    # worker melihat baris baru). Di mode "memory" baris hasil ingest hanya
+    # ada di satu worker dan hilang saat reload/watcher swap, jadi endpoint
+    # ditolak kecuali flag ini diaktifkan (mis. single worker untuk testing)
+    memory_ingest_enabled: bool = False
+    
     # Base directories
     base_dir: Path = Path(__file__).parent.parent
     data_dir: Path = base_dir / "data"
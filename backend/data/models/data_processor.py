@@ -4,29 +4,83 @@ import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.impute import SimpleImputer
 from typing import Dict, List, Tuple, Optional
+import copy
+import hashlib
+import json
 import logging
+import os
+import shutil
+import threading
+from bisect import bisect_left
 from pathlib import Path
 
+from data.models.sql_store import SQLiteStore
+
 logger = logging.getLogger(__name__)
 
+# Versi pipeline feature engineering. Naikkan nilai ini setiap kali
+# _preprocess_data menghasilkan kolom yang berbeda agar feature cache lama
+# di disk otomatis di-rebuild.
+FEATURE_PIPELINE_VERSION = "1"
+
+# Jumlah baris histori yang dibutuhkan untuk menghitung fitur baris baru:
+# window rolling terpanjang (30) - 1, juga mencakup lag terpanjang (14)
+SERIES_CONTEXT_ROWS = 29
+
 class DataProcessor:
     """
     Handles data loading, preprocessing, and feature engineering for PANGAN-AI
     Updated to match 28-feature LSTM model
     """
     
-    def __init__(self, dataset_path: str):
+    def __init__(self, dataset_path: str, cache_dir: Optional[str] = None,
+                 compact_schema: bool = False, sqlite_path: Optional[str] = None):
         self.dataset_path = Path(dataset_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.compact_schema = compact_schema
+        # Dengan sqlite_path, processed data disimpan di SQLite dan self.data
+        # tetap None; query dijalankan oleh engine (lihat sql_store.py)
+        self.sql_store = SQLiteStore(sqlite_path) if sqlite_path else None
         self.data = None
+        self.fingerprint = None
+        self.revision = 0  # Naik setiap ada incremental append
+        # Backend memory: komoditas yang di-append per revisi (SQLite: meta table)
+        self._revision_log: Dict[int, str] = {}
+        self.memory_footprint = {}
+        # Optional memory-mapped model input store (lihat feature_store.py)
+        self.feature_store = None
+        # Optional ringkasan statistik per series (data_version, table), di-attach
+        # oleh DataService (lihat series_statistics.compute_series_summary)
+        self.series_summary = None
+        self._write_lock = threading.Lock()
         self.scalers = {}
         self.commodities = []
         self.regions = []
         
+        # Index per series: (komoditas, wilayah) -> (start, stop) baris kontigu
+        self._series_index: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._series_keys: List[Tuple[str, str]] = []
+        # Posisi baris per komoditas, terurut by tanggal (untuk region 'all')
+        self._commodity_rows: Dict[str, np.ndarray] = {}
+        
         # Feature columns sesuai model config (28 features total)
         self.price_columns = ['harga']
         self.weather_columns = ['tavg_final', 'rh_avg_final', 'ff_avg_final']
         self.seasonal_columns = ['dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr']
         
+        # Compact schema: dimensi jadi categorical, flag/dummy jadi int8
+        self.dimension_columns = ['komoditas', 'wilayah', 'kabupaten', 'level_harga']
+        self.flag_columns = [
+            'tavg_flag', 'rh_avg_flag', 'ff_avg_flag', 'imputasi_flag',
+            'dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr', 'is_weekend', 'month'
+        ]
+        # Kolom mentah yang sudah digantikan *_final / fitur turunan
+        self.unused_raw_columns = [
+            'tavg', 'rh_avg', 'ff_avg',
+            'tavg_imputed', 'rh_avg_imputed', 'ff_avg_imputed', 'rr_imputed', 'harga_imputed',
+            'tahun', 'kode_wilayah', 'day_of_year', 'day_of_week'
+        ]
+        
         # Features yang akan dibuat untuk match model config
         self.model_feature_columns = [
             "harga",
@@ -50,17 +104,36 @@ class DataProcessor:
             if not self.dataset_path.exists():
                 raise FileNotFoundError(f"Dataset not found at {self.dataset_path}")
             
-            # Load dataset
-            self.data = pd.read_csv(self.dataset_path)
-            logger.info(f"Raw dataset loaded: {len(self.data)} rows, {len(self.data.columns)} columns")
+            self.fingerprint = self._dataset_fingerprint()
+            
+            if self.sql_store is not None:
+                return self._load_sql_store()
+            
+            # Warm start: pakai feature cache jika fingerprint masih cocok
+            cached = self._load_feature_cache() if self.cache_dir else None
+            
+            if cached is not None:
+                self.data = cached
+            else:
+                # Load dataset
+                self.data = pd.read_csv(self.dataset_path)
+                logger.info(f"Raw dataset loaded: {len(self.data)} rows, {len(self.data.columns)} columns")
+                
+                # Data preprocessing
+                self.data = self._preprocess_data(self.data)
+                
+                if self.cache_dir:
+                    self._save_feature_cache(self.data)
             
-            # Data preprocessing
-            self.data = self._preprocess_data(self.data)
+            if self.compact_schema:
+                self.data = self._apply_compact_schema(self.data)
             
             # Extract unique commodities and regions
             self.commodities = sorted(self.data['komoditas'].unique().tolist())
             self.regions = sorted(self.data['wilayah'].unique().tolist())
             
+            self._build_series_index()
+            
             logger.info(f"Dataset processed successfully: {len(self.data)} rows")
             logger.info(f"Commodities: {self.commodities}")
             logger.info(f"Regions: {self.regions}")
@@ -71,6 +144,203 @@ class DataProcessor:
             logger.error(f"Error loading dataset: {str(e)}")
             raise
     
+    def _load_sql_store(self) -> None:
+        """Load (atau build) SQLite store untuk fingerprint dataset saat ini"""
+        store = self.sql_store
+        
+        if store.get_meta('fingerprint') != self.fingerprint:
+            cached = self._load_feature_cache() if self.cache_dir else None
+            if cached is None:
+                cached = self._preprocess_data(pd.read_csv(self.dataset_path))
+                if self.cache_dir:
+                    self._save_feature_cache(cached)
+            store.build(cached, self.fingerprint)
+            del cached
+        
+        # Append yang sudah tersimpan di database ikut dihitung di versi
+        self.revision = int(store.get_meta('revision') or 0)
+        series = self._load_sql_dimensions()
+        
+        logger.info(f"SQLite store ready: {self.memory_footprint['rows']} rows, "
+                    f"{len(series)} series (version {self.data_version})")
+        return None
+    
+    def _load_sql_dimensions(self) -> List[Tuple[str, str, int]]:
+        """Daftar komoditas/wilayah dan footprint dari isi SQLite store"""
+        series = self.sql_store.series_counts()
+        self.commodities = sorted({commodity for commodity, _, _ in series})
+        self.regions = sorted({region for _, region, _ in series})
+        self.memory_footprint = {
+            'storage_backend': 'sqlite',
+            'database_mb': self.sql_store.size_mb(),
+            'rows': sum(count for _, _, count in series)
+        }
+        return series
+    
+    def stored_revision(self) -> Optional[int]:
+        """
+        Revisi append di meta table SQLite; bisa sudah dinaikkan worker lain.
+        None untuk backend memory, atau jika database sudah dibangun ulang
+        untuk fingerprint lain (itu ditangani reload_data).
+        """
+        if self.sql_store is None or self.sql_store.get_meta('fingerprint') != self.fingerprint:
+            return None
+        revision = self.sql_store.get_meta('revision')
+        return int(revision) if revision is not None else None
+    
+    def with_revision(self, revision: int) -> 'DataProcessor':
+        """
+        Snapshot baru untuk revisi SQLite yang ditulis worker lain. Dimensi
+        dibaca ulang dari database dan cache scaler dikosongkan karena series
+        yang berubah tidak diketahui. Processor ini tidak diubah.
+        """
+        snapshot = copy.copy(self)
+        snapshot.revision = revision
+        snapshot._drop_scalers(self.sql_store.revision_commodities(self.revision, revision))
+        snapshot._load_sql_dimensions()
+        return snapshot
+    
+    def changed_commodities(self, since_revision: int) -> Optional[List[str]]:
+        """
+        Komoditas yang di-append antara since_revision dan revisi snapshot
+        ini, termasuk append dari worker lain (backend SQLite). None jika
+        log revisi tidak lengkap; caller harus rebuild penuh.
+        """
+        if self.sql_store is not None:
+            return self.sql_store.revision_commodities(since_revision, self.revision)
+        
+        commodities = [self._revision_log.get(revision)
+                       for revision in range(since_revision + 1, self.revision + 1)]
+        return None if None in commodities else sorted(set(commodities))
+    
+    def _drop_scalers(self, commodities: Optional[List[str]]):
+        """Buang scaler ter-cache untuk komoditas (None = semua); di-fit ulang saat dipakai"""
+        if commodities is None:
+            self.scalers = {}
+            return
+        prefixes = tuple(f"{commodity}_" for commodity in commodities)
+        self.scalers = {key: scaler for key, scaler in self.scalers.items() if not key.startswith(prefixes)}
+    
+    @property
+    def data_version(self) -> Optional[str]:
+        """Versi data saat ini: fingerprint dataset + revisi append"""
+        if self.fingerprint is None:
+            return None
+        return f"{self.fingerprint}-{self.revision}"
+    
+    def _dataset_fingerprint(self) -> str:
+        """Fingerprint dataset (size, mtime, content hash) + versi feature pipeline"""
+        stat = self.dataset_path.stat()
+        content_hash = hashlib.sha256()
+        with open(self.dataset_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                content_hash.update(chunk)
+        
+        # Source module ini ikut di-hash supaya perubahan kode feature
+        # engineering juga meng-invalidate cache
+        code_hash = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+        
+        key = ':'.join([
+            str(stat.st_size), str(stat.st_mtime_ns), content_hash.hexdigest(),
+            FEATURE_PIPELINE_VERSION, code_hash
+        ])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    
+    def _feature_cache_path(self) -> Path:
+        """Directory cache untuk fingerprint dataset saat ini"""
+        return self.cache_dir / f"{self.dataset_path.stem}-{self.fingerprint}"
+    
+    def _load_feature_cache(self) -> Optional[pd.DataFrame]:
+        """Load processed frame dari columnar cache (.npy per kolom, memory-mapped)"""
+        cache_path = self._feature_cache_path()
+        manifest_file = cache_path / "manifest.json"
+        
+        if not manifest_file.exists():
+            logger.info(f"Feature cache miss for fingerprint {self.fingerprint}")
+            return None
+        
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            
+            if manifest.get('fingerprint') != self.fingerprint:
+                return None
+            
+            columns = {}
+            for spec in manifest['columns']:
+                values = np.load(cache_path / spec['file'], mmap_mode='r')
+                
+                if spec['kind'] == 'datetime':
+                    columns[spec['name']] = values.view('datetime64[ns]')
+                elif spec['kind'] == 'category':
+                    categories = np.asarray(spec['categories'] + [np.nan], dtype=object)
+                    # Code -1 (missing) menunjuk ke elemen terakhir (NaN)
+                    columns[spec['name']] = categories[values]
+                else:
+                    columns[spec['name']] = values
+            
+            data = pd.DataFrame(columns, columns=[spec['name'] for spec in manifest['columns']])
+            logger.info(f"Feature cache hit: {len(data)} rows loaded from {cache_path}")
+            return data
+            
+        except Exception as e:
+            logger.warning(f"Feature cache unreadable, rebuilding: {str(e)}")
+            return None
+    
+    def _save_feature_cache(self, data: pd.DataFrame) -> bool:
+        """Persist processed frame sebagai columnar cache keyed by fingerprint"""
+        cache_path = self._feature_cache_path()
+        tmp_path = cache_path.with_name(f"{cache_path.name}.tmp-{os.getpid()}")
+        
+        try:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            tmp_path.mkdir(parents=True)
+            
+            specs = []
+            for i, column in enumerate(data.columns):
+                series = data[column]
+                spec = {'name': column, 'file': f"col_{i:03d}.npy"}
+                
+                if pd.api.types.is_datetime64_any_dtype(series):
+                    spec['kind'] = 'datetime'
+                    values = series.to_numpy(dtype='datetime64[ns]').view('i8')
+                elif series.dtype == object:
+                    codes, categories = pd.factorize(series)
+                    spec['kind'] = 'category'
+                    spec['categories'] = [str(c) for c in categories]
+                    values = codes.astype(np.int32)
+                else:
+                    spec['kind'] = 'numeric'
+                    values = series.to_numpy()
+                
+                np.save(tmp_path / spec['file'], values)
+                specs.append(spec)
+            
+            manifest = {
+                'fingerprint': self.fingerprint,
+                'pipeline_version': FEATURE_PIPELINE_VERSION,
+                'source': str(self.dataset_path),
+                'rows': len(data),
+                'columns': specs
+            }
+            with open(tmp_path / "manifest.json", 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            
+            # Swap atomik lalu hapus cache dengan fingerprint lama
+            shutil.rmtree(cache_path, ignore_errors=True)
+            os.replace(tmp_path, cache_path)
+            for stale in self.cache_dir.glob(f"{self.dataset_path.stem}-*"):
+                if stale != cache_path and '.tmp-' not in stale.name:
+                    shutil.rmtree(stale, ignore_errors=True)
+            
+            logger.info(f"Feature cache written to {cache_path}")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Could not write feature cache: {str(e)}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return False
+    
     def _preprocess_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Preprocess and create 28 features to match model"""
         
@@ -82,12 +352,31 @@ class DataProcessor:
         data = data.dropna(subset=['harga'])
         data = data[data['harga'] > 0]
         
+        # Flags, imputasi cuaca, seasonal dummies dan fitur kalender per baris
+        data = self._add_row_features(data)
+        
+        # Lag, rolling dan change features per commodity-region series
+        data = self._add_series_features(data)
+        
+        logger.info(f"Data preprocessing completed: {len(data)} valid records")
+        logger.info(f"Features created: {len(self.model_feature_columns)} (target: 28)")
+        return data
+    
+    def _add_row_features(self, data: pd.DataFrame,
+                          weather_means: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """
+        Fitur yang hanya bergantung pada baris itu sendiri (flag cuaca,
+        imputasi, dummy seasonal, fitur kalender). weather_means dipakai untuk
+        imputasi baris baru saat incremental append.
+        """
+        
         # Handle missing weather values dan create flags
         weather_columns = ['tavg_final', 'rh_avg_final', 'ff_avg_final']
         for col in weather_columns:
             if col in data.columns:
                 data[f'{col.replace("_final", "")}_flag'] = data[col].isna().astype(int)
-                data[col] = data[col].fillna(data[col].mean())
+                fill_value = weather_means.get(col) if weather_means else None
+                data[col] = data[col].fillna(data[col].mean() if fill_value is None else fill_value)
             else:
                 # Create dummy columns if not exist
                 data[col] = 25.0  # Default temperature/humidity
@@ -116,59 +405,480 @@ class DataProcessor:
         # Weekend indicator
         data['is_weekend'] = (data['day_of_week'] >= 5).astype(int)
         
-        # Create lag features dan rolling features per commodity-region group
-        processed_groups = []
-        for (commodity, region), group in data.groupby(['komoditas', 'wilayah']):
-            group = group.sort_values('tanggal').copy()
-            
-            # Lag features
-            group['harga_lag_1'] = group['harga'].shift(1)
-            group['harga_lag_3'] = group['harga'].shift(3)
-            group['harga_lag_7'] = group['harga'].shift(7)
-            group['harga_lag_14'] = group['harga'].shift(14)
-            
-            # Rolling features
-            group['harga_rolling_mean_7'] = group['harga'].rolling(window=7, min_periods=1).mean()
-            group['harga_rolling_std_7'] = group['harga'].rolling(window=7, min_periods=1).std().fillna(0)
-            group['harga_rolling_mean_14'] = group['harga'].rolling(window=14, min_periods=1).mean()
-            group['harga_rolling_std_14'] = group['harga'].rolling(window=14, min_periods=1).std().fillna(0)
-            group['harga_rolling_mean_30'] = group['harga'].rolling(window=30, min_periods=1).mean()
-            group['harga_rolling_std_30'] = group['harga'].rolling(window=30, min_periods=1).std().fillna(0)
-            
-            # Change features
-            group['harga_change_1d'] = group['harga'].pct_change(1).fillna(0)
-            group['harga_change_7d'] = group['harga'].pct_change(7).fillna(0)
-            
-            processed_groups.append(group)
+        return data
+    
+    def _apply_compact_schema(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Downcast frame ke layout compact: categorical untuk dimensi, float32
+        untuk fitur numerik, int8 untuk flag/dummy, drop kolom mentah yang
+        tidak dipakai. Footprint sebelum/sesudah disimpan di memory_footprint.
+        """
+        before_bytes = int(data.memory_usage(deep=True).sum())
+        
+        data = data.drop(columns=[col for col in self.unused_raw_columns if col in data.columns])
+        
+        for col in data.columns:
+            if col in self.dimension_columns:
+                data[col] = data[col].astype('category')
+            elif col in self.flag_columns:
+                data[col] = data[col].astype(np.int8)
+            elif col != 'tanggal' and pd.api.types.is_numeric_dtype(data[col]) \
+                    and not pd.api.types.is_bool_dtype(data[col]):
+                data[col] = data[col].astype(np.float32)
+        
+        after_bytes = int(data.memory_usage(deep=True).sum())
+        
+        self.memory_footprint = {
+            'before_mb': round(before_bytes / 1024 ** 2, 2),
+            'after_mb': round(after_bytes / 1024 ** 2, 2),
+            'reduction_pct': round((1 - after_bytes / before_bytes) * 100, 1) if before_bytes else 0.0,
+            'columns': len(data.columns)
+        }
+        logger.info(
+            f"Compact schema applied: {self.memory_footprint['before_mb']} MB -> "
+            f"{self.memory_footprint['after_mb']} MB ({self.memory_footprint['reduction_pct']}% smaller)"
+        )
+        return data
+    
+    def _add_series_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Hitung lag/rolling/change features untuk semua series sekaligus.
+        Frame harus sudah terurut by (komoditas, wilayah, tanggal); satu
+        grouped pass menggantikan loop per group + pd.concat dengan hasil
+        yang identik.
+        """
         
-        # Combine all groups
-        data = pd.concat(processed_groups, ignore_index=True)
+        # Baris dengan key kosong tidak masuk groupby mana pun
+        data = data.dropna(subset=['komoditas', 'wilayah']).reset_index(drop=True)
+        
+        grouped = data.groupby(['komoditas', 'wilayah'], sort=False)['harga']
+        
+        # Lag features
+        for lag in [1, 3, 7, 14]:
+            data[f'harga_lag_{lag}'] = grouped.shift(lag)
+        
+        # Rolling features (window di-reset pada setiap batas series)
+        for window in [7, 14, 30]:
+            rolling = grouped.rolling(window=window, min_periods=1)
+            data[f'harga_rolling_mean_{window}'] = rolling.mean().droplevel([0, 1])
+            data[f'harga_rolling_std_{window}'] = rolling.std().droplevel([0, 1]).fillna(0)
+        
+        # Change features (sama dengan Series.pct_change: harga / shift - 1)
+        for periods, name in [(1, 'harga_change_1d'), (7, 'harga_change_7d')]:
+            data[name] = (data['harga'] / grouped.shift(periods) - 1).fillna(0)
         
         # Fill NaN values in lag features dengan forward fill
         lag_columns = ['harga_lag_1', 'harga_lag_3', 'harga_lag_7', 'harga_lag_14']
         for col in lag_columns:
-            data[col] = data[col].fillna(method='ffill').fillna(data['harga'])
+            data[col] = data[col].ffill().fillna(data['harga'])
         
-        logger.info(f"Data preprocessing completed: {len(data)} valid records")
-        logger.info(f"Features created: {len(self.model_feature_columns)} (target: 28)")
         return data
     
+    def _build_series_index(self):
+        """
+        Build index row range per (komoditas, wilayah) dari frame yang sudah
+        terurut by (komoditas, wilayah, tanggal), plus urutan baris by tanggal
+        per komoditas untuk query region 'all'
+        """
+        commodities = self.data['komoditas'].to_numpy()
+        regions = self.data['wilayah'].to_numpy()
+        dates = self.data['tanggal'].to_numpy()
+        n_rows = len(self.data)
+        
+        # Batas series = baris di mana komoditas atau wilayah berubah
+        is_start = np.ones(n_rows, dtype=bool)
+        is_start[1:] = (commodities[1:] != commodities[:-1]) | (regions[1:] != regions[:-1])
+        starts = np.flatnonzero(is_start)
+        stops = np.append(starts[1:], n_rows)
+        
+        self._series_index = {
+            (commodities[start], regions[start]): (int(start), int(stop))
+            for start, stop in zip(starts, stops)
+        }
+        self._series_keys = sorted(self._series_index)
+        
+        # Komoditas juga kontigu karena merupakan sort key pertama
+        commodity_ranges = {}
+        for (commodity, _), (start, stop) in self._series_index.items():
+            first, _last = commodity_ranges.get(commodity, (start, stop))
+            commodity_ranges[commodity] = (first, stop)
+        
+        self._commodity_rows = {
+            commodity: start + np.argsort(dates[start:stop], kind='stable')
+            for commodity, (start, stop) in commodity_ranges.items()
+        }
+        
+        logger.info(f"Series index built: {len(self._series_index)} series")
+    
     def get_commodity_data(self, commodity: str, region: str = None) -> pd.DataFrame:
-        """Get data for specific commodity and region"""
+        """
+        Get data for specific commodity and region, terurut by tanggal.
+        Untuk satu region hasilnya adalah slice kontigu (tanpa copy) dari
+        frame utama; perlakukan sebagai read-only.
+        """
+        if self.sql_store is not None:
+            return self.sql_store.query(commodity, region)
+        
         if self.data is None:
             raise ValueError("Data not loaded. Call load_data() first.")
         
-        filtered_data = self.data[self.data['komoditas'] == commodity].copy()
-        
         if region and region != 'all':
-            filtered_data = filtered_data[filtered_data['wilayah'] == region]
+            bounds = self._series_index.get((commodity, region))
+            if bounds is None:
+                return self.data.iloc[0:0]
+            return self.data.iloc[bounds[0]:bounds[1]]
+        
+        rows = self._commodity_rows.get(commodity)
+        if rows is None:
+            return self.data.iloc[0:0]
+        return self.data.take(rows)
+    
+    def query_data(self, commodity: Optional[str] = None, region: Optional[str] = None,
+                   start_date=None, end_date=None, columns: Optional[List[str]] = None,
+                   limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Filter komoditas/wilayah dan range tanggal, terurut by (tanggal,
+        komoditas, wilayah). Dengan limit, hanya `limit` baris terakhir yang
+        dikembalikan. Dengan columns, hanya kolom tersebut yang di-copy.
+        Pada backend SQLite seluruh operasi dieksekusi oleh engine.
+        
+        Range tanggal dicari dengan searchsorted pada kolom tanggal tiap
+        series (sudah terurut), lalu range series di-merge by tanggal;
+        hanya baris hasil yang di-copy dari frame utama.
+        """
+        if self.sql_store is not None:
+            return self.sql_store.query(commodity, region, start_date, end_date,
+                                        columns=columns, limit=limit)
+        
+        if self.data is None:
+            raise ValueError("Data not loaded. Call load_data() first.")
+        
+        dates = self.data['tanggal'].to_numpy()
+        start_ts = pd.to_datetime(start_date).to_datetime64() if start_date else None
+        end_ts = pd.to_datetime(end_date).to_datetime64() if end_date else None
+        
+        ranges = []
+        for key in self._matching_series(commodity, region):
+            low, high = self._date_bounds(key, dates, start_ts, end_ts)
+            if limit:
+                # `limit` baris terakhir hasil paling banyak memuat `limit` baris per series
+                low = max(low, high - limit)
+            if low < high:
+                ranges.append(np.arange(low, high))
+        
+        if not ranges:
+            rows = np.array([], dtype=np.int64)
+        elif len(ranges) == 1:
+            rows = ranges[0]
+        else:
+            # K-way merge: range series (urut key, masing-masing urut tanggal)
+            # di-merge stabil by tanggal, sehingga tie terurut by (komoditas, wilayah)
+            rows = np.concatenate(ranges)
+            rows = rows[np.argsort(dates[rows], kind='stable')]
+        
+        if limit and len(rows) > limit:
+            rows = rows[-limit:]
+        
+        return self._take(rows, columns)
+    
+    def _date_bounds(self, key: Tuple[str, str], dates: np.ndarray,
+                     start_ts: Optional[np.datetime64] = None,
+                     end_ts: Optional[np.datetime64] = None) -> Tuple[int, int]:
+        """Posisi baris [low, high) series `key` di dalam range tanggal (searchsorted)"""
+        start, stop = self._series_index[key]
+        series_dates = dates[start:stop]
+        low = start + int(np.searchsorted(series_dates, start_ts, 'left')) if start_ts is not None else start
+        high = start + int(np.searchsorted(series_dates, end_ts, 'right')) if end_ts is not None else stop
+        return low, high
+    
+    def query_series(self, series: List[Tuple[str, str]], start_date=None, end_date=None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Baris beberapa series (komoditas, wilayah) sekaligus dalam range
+        tanggal, terurut by (komoditas, wilayah, tanggal). Series yang
+        tidak ada di dataset diabaikan.
+        """
+        if self.sql_store is not None:
+            return self.sql_store.query_series(series, start_date, end_date, columns=columns)
+        
+        if self.data is None:
+            raise ValueError("Data not loaded. Call load_data() first.")
+        
+        dates = self.data['tanggal'].to_numpy()
+        start_ts = pd.to_datetime(start_date).to_datetime64() if start_date else None
+        end_ts = pd.to_datetime(end_date).to_datetime64() if end_date else None
+        
+        ranges = []
+        for key in sorted(set(series)):
+            if key not in self._series_index:
+                continue
+            low, high = self._date_bounds(key, dates, start_ts, end_ts)
+            if low < high:
+                ranges.append(np.arange(low, high))
+        
+        rows = np.concatenate(ranges) if ranges else np.array([], dtype=np.int64)
+        return self._take(rows, columns)
+    
+    def _matching_series(self, commodity: Optional[str] = None,
+                         region: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Key series (terurut) yang cocok dengan filter komoditas/wilayah"""
+        commodity = commodity if commodity and commodity != 'all' else None
+        region = region if region and region != 'all' else None
+        
+        if commodity and region:
+            return [(commodity, region)] if (commodity, region) in self._series_index else []
+        if commodity:
+            keys = []
+            for key in self._series_keys[bisect_left(self._series_keys, (commodity,)):]:
+                if key[0] != commodity:
+                    break
+                keys.append(key)
+            return keys
+        if region:
+            return [key for key in self._series_keys if key[1] == region]
+        return list(self._series_keys)
+    
+    def _take(self, rows: np.ndarray, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Copy baris (posisi) dan kolom terpilih saja dari frame utama"""
+        if not columns:
+            return self.data.take(rows)
+        selected = [col for col in columns if col in self.data.columns]
+        # Take per kolom: jauh lebih cepat daripada iloc[rows, cols] pada frame lebar
+        return pd.DataFrame({col: self.data[col].take(rows) for col in selected},
+                            index=self.data.index.take(rows))
+    
+    def query_page(self, commodity: Optional[str] = None, region: Optional[str] = None,
+                   start_date=None, end_date=None,
+                   after: Optional[Tuple[str, str, pd.Timestamp]] = None,
+                   page_size: int = 500, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Keyset page terurut by (komoditas, wilayah, tanggal): maksimal
+        page_size baris setelah cursor `after`. Series awal dicari dengan
+        bisect pada key series terurut, batas tanggal dengan searchsorted
+        pada kolom tanggal per series; frame tidak difilter ulang per page.
+        """
+        if self.sql_store is not None:
+            return self.sql_store.query_page(commodity, region, start_date, end_date,
+                                             after=after, page_size=page_size, columns=columns)
+        
+        if self.data is None:
+            raise ValueError("Data not loaded. Call load_data() first.")
+        
+        commodity = commodity if commodity and commodity != 'all' else None
+        region = region if region and region != 'all' else None
+        
+        lower = (commodity, region) if commodity and region else (commodity,) if commodity else ()
+        if after is not None and tuple(after[:2]) > lower:
+            lower = tuple(after[:2])
+        
+        dates = self.data['tanggal'].to_numpy()
+        start_ts = pd.to_datetime(start_date).to_datetime64() if start_date else None
+        end_ts = pd.to_datetime(end_date).to_datetime64() if end_date else None
+        
+        ranges = []
+        remaining = page_size
+        for key in self._series_keys[bisect_left(self._series_keys, lower):]:
+            if remaining <= 0 or (commodity and key[0] != commodity):
+                break
+            if region and key[1] != region:
+                if commodity:
+                    break
+                continue
+            
+            low, high = self._date_bounds(key, dates, start_ts, end_ts)
+            if after is not None and key == tuple(after[:2]):
+                start, stop = self._series_index[key]
+                after_ts = pd.Timestamp(after[2]).to_datetime64()
+                low = max(low, start + int(np.searchsorted(dates[start:stop], after_ts, 'right')))
+            
+            if low < high:
+                take = min(high - low, remaining)
+                ranges.append(np.arange(low, low + take))
+                remaining -= take
         
-        return filtered_data.sort_values('tanggal')
+        rows = np.concatenate(ranges) if ranges else np.array([], dtype=np.int64)
+        return self._take(rows, columns)
+    
+    def query_tail(self, rows: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        `rows` baris terakhir setiap series (sama dengan tail(rows) per
+        series), terurut by (komoditas, wilayah, tanggal)
+        """
+        if self.sql_store is not None:
+            return self.sql_store.query_tail(rows, columns=columns)
+        
+        if self.data is None:
+            raise ValueError("Data not loaded. Call load_data() first.")
+        
+        bounds = np.array([self._series_index[key] for key in self._series_keys], dtype=np.int64).reshape(-1, 2)
+        starts = np.maximum(bounds[:, 0], bounds[:, 1] - rows)
+        lengths = bounds[:, 1] - starts
+        # Posisi baris semua tail sekaligus: start series + offset di dalam tail
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self._take(np.repeat(starts, lengths) + offsets, columns)
+    
+    def get_series_catalog(self) -> List[Tuple[str, str, int]]:
+        """(komoditas, wilayah, jumlah baris) per series, terurut"""
+        if self.sql_store is not None:
+            return self.sql_store.series_counts()
+        return [
+            (commodity, region, stop - start)
+            for (commodity, region), (start, stop) in sorted(self._series_index.items())
+        ]
+    
+    @property
+    def row_count(self) -> int:
+        return sum(count for _, _, count in self.get_series_catalog())
+    
+    def with_appended_rows(self, commodity: str, region: str,
+                           rows: pd.DataFrame) -> Tuple['DataProcessor', Dict]:
+        """
+        Incremental append baris harian baru untuk satu (komoditas, wilayah).
+        Hanya tail series yang dihitung ulang: fitur baris baru dihitung dari
+        SERIES_CONTEXT_ROWS baris terakhir + baris baru, dan scaler yang
+        sudah di-cache di-update dengan partial_fit.
+        
+        Processor ini tidak diubah (reader boleh tetap memakainya): frame,
+        series index, scaler dan revisi baru dibangun di snapshot baru yang
+        dikembalikan, untuk di-publish caller dengan satu swap reference.
+        Dengan backend SQLite, baris baru langsung ditulis ke database.
+        Return (snapshot baru, result); snapshot = self jika tidak ada baris baru.
+        """
+        if self.data is None and self.sql_store is None:
+            raise ValueError("Data not loaded. Call load_data() first.")
+        
+        with self._write_lock:
+            new_rows = rows.copy()
+            new_rows['komoditas'] = commodity
+            new_rows['wilayah'] = region
+            new_rows['tanggal'] = pd.to_datetime(new_rows['tanggal'])
+            new_rows = new_rows.dropna(subset=['harga'])
+            new_rows = new_rows[new_rows['harga'] > 0].sort_values('tanggal')
+            
+            history = self.get_commodity_data(commodity, region)
+            received = len(rows)
+            
+            # Append-only: baris dengan tanggal <= tanggal terakhir di-skip
+            if len(history) > 0:
+                new_rows = new_rows[new_rows['tanggal'] > history['tanggal'].iloc[-1]]
+                for col in ['kabupaten', 'level_harga', 'kode_wilayah']:
+                    if col in history.columns and col not in new_rows.columns:
+                        new_rows[col] = history[col].iloc[-1]
+            new_rows = new_rows.drop_duplicates(subset=['tanggal'], keep='last')
+            
+            if new_rows.empty:
+                return self, {'appended': 0, 'skipped': received, 'data_version': self.data_version}
+            
+            # Imputasi cuaca pakai mean dataset saat ini (sama dengan full reprocess)
+            weather_columns = ['tavg_final', 'rh_avg_final', 'ff_avg_final']
+            if self.sql_store is not None:
+                weather_means = self.sql_store.column_means(weather_columns)
+            else:
+                weather_means = {
+                    col: float(self.data[col].mean())
+                    for col in weather_columns if col in self.data.columns
+                }
+            new_rows = self._add_row_features(new_rows.reset_index(drop=True), weather_means)
+            
+            # Hitung lag/rolling/change hanya untuk tail series
+            context = history.iloc[-SERIES_CONTEXT_ROWS:]
+            combined = pd.concat([context, new_rows], ignore_index=True)
+            tail = self._add_series_features(combined).iloc[len(context):]
+            
+            snapshot = copy.copy(self)
+            
+            if self.sql_store is not None:
+                self.sql_store.insert(tail)
+                return snapshot, snapshot._finish_append(commodity, region, tail, received)
+            
+            tail = tail.reindex(columns=self.data.columns)
+            
+            # Sisipkan di akhir range series supaya urutan (komoditas, wilayah, tanggal) terjaga
+            bounds = self._series_index.get((commodity, region))
+            if bounds is not None:
+                insert_at = bounds[1]
+            else:
+                series_keys = sorted(self._series_index)
+                position = bisect_left(series_keys, (commodity, region))
+                insert_at = (self._series_index[series_keys[position]][0]
+                             if position < len(series_keys) else len(self.data))
+            
+            dtypes = self.data.dtypes
+            updated = pd.concat(
+                [self.data.iloc[:insert_at], tail, self.data.iloc[insert_at:]],
+                ignore_index=True
+            )
+            # Kembalikan dtype asli; kolom integer/bool yang tidak diisi oleh
+            # baris baru (NaN) dibiarkan ter-upcast ke float
+            for col, dtype in dtypes.items():
+                if updated[col].dtype == dtype:
+                    continue
+                if isinstance(dtype, pd.CategoricalDtype):
+                    updated[col] = updated[col].astype('category')
+                elif pd.api.types.is_float_dtype(dtype) or not updated[col].hasnans:
+                    updated[col] = updated[col].astype(dtype)
+            
+            snapshot.data = updated
+            snapshot._build_series_index()
+            return snapshot, snapshot._finish_append(commodity, region, tail, received)
+    
+    def _finish_append(self, commodity: str, region: str, tail: pd.DataFrame, received: int) -> Dict:
+        """
+        Update daftar dimensi, scaler ter-cache dan revisi setelah append.
+        Dipanggil pada snapshot baru (shallow copy): semua state yang
+        diubah di-assign ulang, bukan dimutasi, supaya snapshot lama utuh.
+        """
+        self.commodities = sorted(set(self.commodities) | {commodity})
+        self.regions = sorted(set(self.regions) | {region})
+        self.scalers = dict(self.scalers)
+        
+        previous_revision = self.revision
+        if self.sql_store is not None:
+            # Revisi disimpan di database; worker lain mengambilnya lewat
+            # stored_revision (DataService.sync_revision)
+            self.revision = self.sql_store.increment_revision(commodity)
+            if self.revision != previous_revision + 1:
+                # Revisi yang terlewati = append worker lain: dimensi dibaca
+                # ulang dan scaler komoditas tersebut sudah basi
+                self._load_sql_dimensions()
+                self._drop_scalers(self.sql_store.revision_commodities(previous_revision, self.revision - 1))
+        else:
+            self.revision += 1
+            self._revision_log = {**self._revision_log, self.revision: commodity}
+        
+        # Update scaler yang sudah ter-cache untuk series ini (pada copy)
+        new_features = tail.reindex(columns=self.model_feature_columns).fillna(0).values
+        for scaler_key in [f"{commodity}_{region}", f"{commodity}_all", f"{commodity}_None"]:
+            if scaler_key in self.scalers:
+                self.scalers[scaler_key] = copy.deepcopy(self.scalers[scaler_key]).partial_fit(new_features)
+        
+        logger.info(f"Appended {len(tail)} rows to {commodity} - {region} (version {self.data_version})")
+        
+        return {
+            'appended': len(tail),
+            'skipped': received - len(tail),
+            'last_date': tail['tanggal'].iloc[-1].strftime('%Y-%m-%d'),
+            'data_version': self.data_version
+        }
     
     def get_latest_sequence(self, commodity: str, region: str, 
                            sequence_length: int = 30) -> Tuple[np.ndarray, MinMaxScaler]:
         """Get latest sequence for prediction with 28 features"""
         
+        scaler_key = f"{commodity}_{region}"
+        store = self.feature_store
+        if store is not None and store.data_version == self.data_version and store.has_series(commodity, region):
+            # Fast path: window sudah di-scale, zero-copy slice dari memmap
+            window = store.get_window(commodity, region, sequence_length)
+            if window is None:
+                raise ValueError(f"Insufficient data for prediction: "
+                                 f"{store.series_length(commodity, region)} < {sequence_length}")
+            if scaler_key not in self.scalers:
+                self.scalers[scaler_key] = store.get_scaler(commodity, region)
+            
+            X = window.reshape(1, sequence_length, len(store.columns))
+            return X, self.scalers[scaler_key]
+        
         data = self.get_commodity_data(commodity, region)
         
         if len(data) < sequence_length:
@@ -191,7 +901,6 @@ class DataProcessor:
         features = latest_data[feature_columns].fillna(0).values
         
         # Scale features
-        scaler_key = f"{commodity}_{region}"
         if scaler_key not in self.scalers:
             # Fit scaler menggunakan semua data historical
             self.scalers[scaler_key] = MinMaxScaler()
@@ -228,6 +937,7 @@ class DataProcessor:
         missing_cols = [col for col in feature_columns if col not in data.columns]
         if missing_cols:
             logger.warning(f"Missing columns: {missing_cols}")
+            data = data.copy()
             for col in missing_cols:
                 data[col] = 0
         
@@ -252,6 +962,29 @@ class DataProcessor:
     def get_statistics(self, commodity: str, region: str = None) -> Dict:
         """Get statistical summary of commodity data"""
         
+        # Lookup ringkasan yang sudah dihitung jika masih untuk versi data ini
+        summary = self.series_summary
+        if summary is not None and summary[0] == self.data_version:
+            entry = summary[1].get((commodity, region if region and region != 'all' else 'all'))
+            return dict(entry['basic_stats']) if entry is not None else {}
+        
+        if self.sql_store is not None:
+            summary = self.sql_store.summary(commodity, region)
+            if summary['count'] == 0:
+                return {}
+            return {
+                'count': summary['count'],
+                'current_price': float(summary['current']),
+                'avg_price': float(summary['avg']),
+                'min_price': float(summary['min']),
+                'max_price': float(summary['max']),
+                'volatility': float(summary['std'] / summary['avg'] * 100),
+                'date_range': {
+                    'start': summary['start_date'],
+                    'end': summary['end_date']
+                }
+            }
+        
         data = self.get_commodity_data(commodity, region)
         
         if len(data) == 0:
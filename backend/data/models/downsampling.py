@@ -0,0 +1,132 @@
+# backend/data/models/downsampling.py - Server-side downsampling untuk chart
+import pandas as pd
+import numpy as np
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resolution yang didukung: raw (tanpa downsampling), agregat OHLC per
+# periode, atau LTTB (Largest-Triangle-Three-Buckets) dengan target titik
+RESOLUTIONS = ['raw', 'daily', 'weekly', 'monthly', 'lttb']
+
+SERIES_KEYS = ['komoditas', 'wilayah']
+
+# Kolom pendamping: cuaca di-rata-rata, flag event aktif jika ada di periode
+MEAN_COLUMNS = ['tavg_final', 'rh_avg_final', 'ff_avg_final', 'rr']
+FLAG_COLUMNS = ['dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr']
+
+
+def _period_start(dates: pd.Series, resolution: str) -> pd.Series:
+    """Tanggal awal periode untuk setiap baris"""
+    if resolution == 'daily':
+        return dates.dt.normalize()
+    if resolution == 'weekly':
+        return dates.dt.to_period('W').dt.start_time
+    if resolution == 'monthly':
+        return dates.dt.to_period('M').dt.start_time
+    raise ValueError(f"Unsupported aggregate resolution: {resolution}")
+
+
+def aggregate_ohlc(data: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """
+    Agregat OHLC harga per (komoditas, wilayah, periode) dalam satu groupby.
+    Input harus terurut by tanggal. Kolom 'harga' hasil = close, sehingga
+    client yang hanya membaca harga tetap mendapat series yang valid.
+    """
+    if data.empty:
+        return data.assign(open=[], high=[], low=[], close=[], avg=[], count=[])
+
+    frame = data.assign(tanggal=_period_start(data['tanggal'], resolution))
+    for key in SERIES_KEYS:
+        frame[key] = frame[key].astype(object)
+
+    aggregations = {
+        'open': ('harga', 'first'),
+        'high': ('harga', 'max'),
+        'low': ('harga', 'min'),
+        'close': ('harga', 'last'),
+        'avg': ('harga', 'mean'),
+        'count': ('harga', 'size')
+    }
+    aggregations.update({col: (col, 'mean') for col in MEAN_COLUMNS if col in frame.columns})
+    aggregations.update({col: (col, 'max') for col in FLAG_COLUMNS if col in frame.columns})
+
+    result = frame.groupby(SERIES_KEYS + ['tanggal'], sort=False).agg(**aggregations).reset_index()
+    result['harga'] = result['close']
+
+    return result.sort_values(['tanggal'] + SERIES_KEYS, kind='stable').reset_index(drop=True)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Posisi titik terpilih Largest-Triangle-Three-Buckets.
+    Titik pertama dan terakhir selalu dipertahankan; titik tengah dibagi
+    ke threshold - 2 bucket. Rata-rata bucket dihitung sekaligus dengan
+    np.add.reduceat, loop hanya memilih argmax luas segitiga per bucket.
+    """
+    n_points = len(x)
+    if threshold >= n_points or threshold < 3:
+        return np.arange(n_points)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n_points - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n_points - 1], edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y[:n_points - 1], edges[:-1]) / sizes
+    # Bucket "berikutnya" untuk bucket terakhir adalah titik terakhir
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n_points - 1
+
+    anchor = 0
+    for bucket, (start, stop) in enumerate(zip(edges[:-1], edges[1:])):
+        area = np.abs(
+            (x[anchor] - next_x[bucket]) * (y[start:stop] - y[anchor])
+            - (x[anchor] - x[start:stop]) * (next_y[bucket] - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+
+    return selected
+
+
+def lttb_downsample(data: pd.DataFrame, points: int) -> pd.DataFrame:
+    """LTTB per (komoditas, wilayah) pada harga; baris asli yang terpilih dipertahankan"""
+    if data.empty:
+        return data
+
+    days = data['tanggal'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    prices = data['harga'].to_numpy(dtype=np.float64)
+
+    positions: List[np.ndarray] = []
+    for rows in data.groupby(SERIES_KEYS, sort=False, observed=True).indices.values():
+        positions.append(rows[lttb_indices(days[rows], prices[rows], points)])
+
+    return data.iloc[np.sort(np.concatenate(positions))]
+
+
+def downsample(data: pd.DataFrame, resolution: str, points: int = 500) -> pd.DataFrame:
+    """Terapkan resolution pada frame terurut by tanggal"""
+    if resolution == 'raw':
+        return data
+    if resolution == 'lttb':
+        return lttb_downsample(data, points)
+    if resolution in ('daily', 'weekly', 'monthly'):
+        return aggregate_ohlc(data, resolution)
+    raise ValueError(f"Unsupported resolution '{resolution}'. Use one of: {RESOLUTIONS}")
+
+
+def resolution_summary(raw: pd.DataFrame, result: pd.DataFrame, resolution: str, points: int) -> Dict:
+    """Ringkasan downsampling untuk metadata response"""
+    return {
+        'resolution': resolution,
+        'target_points': points if resolution == 'lttb' else None,
+        'raw_points': len(raw),
+        'returned_points': len(result)
+    }
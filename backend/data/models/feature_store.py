@@ -0,0 +1,211 @@
+# backend/data/models/feature_store.py - Memory-mapped model input store
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class FeatureStore:
+    """
+    Offline-built store untuk input LSTM PANGAN-AI.
+    Semua series disimpan dalam satu array float32 kontigu (features.npy,
+    kolom urut model_feature_columns, sudah di-scale per series) plus
+    index.json berisi offset dan parameter scaler per series. File dibuka
+    dengan np.memmap sehingga window inferensi adalah zero-copy slice dan
+    beberapa worker process berbagi page cache yang sama.
+
+    Setiap build ditulis ke direktori versi sendiri; file CURRENT menunjuk
+    ke build aktif dan diganti dengan satu os.replace, sehingga reader
+    selalu memasangkan features.npy dan index.json dari build yang sama.
+    """
+
+    FEATURES_FILE = "features.npy"
+    INDEX_FILE = "index.json"
+    CURRENT_FILE = "CURRENT"
+
+    def __init__(self, store_path: str):
+        self.store_path = Path(store_path)
+        self.features: Optional[np.ndarray] = None
+        self.data_version: Optional[str] = None
+        self.columns = []
+        self._series: Dict[Tuple[str, str], Dict] = {}
+        self._scalers: Dict[Tuple[str, str], MinMaxScaler] = {}
+
+    @classmethod
+    def build(cls, processor, store_path: str) -> 'FeatureStore':
+        """Build store dari DataProcessor yang sudah load_data()"""
+
+        if processor.fingerprint is None:
+            raise ValueError("Data not loaded. Call load_data() first.")
+
+        store_path = Path(store_path)
+        store_path.mkdir(parents=True, exist_ok=True)
+
+        feature_columns = processor.model_feature_columns
+        catalog = processor.get_series_catalog()
+        total_rows = sum(count for _, _, count in catalog)
+
+        # Direktori build belum terlihat reader sampai CURRENT di-swap
+        build_name = f"{processor.data_version}-{uuid.uuid4().hex[:8]}"
+        build_dir = store_path / build_name
+        build_dir.mkdir()
+
+        features = np.lib.format.open_memmap(
+            build_dir / cls.FEATURES_FILE, mode='w+', dtype=np.float32,
+            shape=(total_rows, len(feature_columns))
+        )
+
+        series_index = []
+        start = 0
+        for commodity, region, count in catalog:
+            stop = start + count
+            series = processor.get_commodity_data(commodity, region)
+            values = series.reindex(columns=feature_columns).fillna(0).values
+
+            # Scaler per series, sama dengan DataProcessor.get_latest_sequence
+            scaler = MinMaxScaler().fit(values)
+            features[start:stop] = scaler.transform(values)
+
+            series_index.append({
+                'commodity': commodity,
+                'region': region,
+                'start': start,
+                'stop': stop,
+                'data_min': scaler.data_min_.tolist(),
+                'data_max': scaler.data_max_.tolist()
+            })
+            start = stop
+
+        features.flush()
+        del features
+
+        index = {
+            'data_version': processor.data_version,
+            'columns': list(feature_columns),
+            'rows': total_rows,
+            'series': series_index
+        }
+        with open(build_dir / cls.INDEX_FILE, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+
+        # Publish: satu os.replace pointer CURRENT (atomik)
+        previous = cls._current_build(store_path)
+        current_tmp = store_path / f"{cls.CURRENT_FILE}.tmp-{os.getpid()}"
+        current_tmp.write_text(build_name, encoding='utf-8')
+        os.replace(current_tmp, store_path / cls.CURRENT_FILE)
+        cls._remove_stale_builds(store_path, keep={build_name, previous})
+
+        logger.info(f"Feature store built: {len(series_index)} series, {total_rows} rows at {store_path}")
+
+        store = cls(store_path)
+        store.open()
+        return store
+
+    @classmethod
+    def _current_build(cls, store_path: Path) -> Optional[str]:
+        """Nama direktori build aktif menurut CURRENT, None jika belum ada"""
+        try:
+            return (store_path / cls.CURRENT_FILE).read_text(encoding='utf-8').strip() or None
+        except OSError:
+            return None
+
+    @classmethod
+    def _remove_stale_builds(cls, store_path: Path, keep: set):
+        """
+        Hapus build lama. Build sebelumnya tetap disimpan karena reader
+        mungkin baru saja membaca CURRENT lama; memmap yang sudah terbuka
+        tetap valid walaupun filenya dihapus.
+        """
+        for path in store_path.iterdir():
+            if path.is_dir() and path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+            elif path.name in (cls.FEATURES_FILE, cls.INDEX_FILE):
+                # Layout lama (file langsung di store_path)
+                path.unlink(missing_ok=True)
+
+    def open(self) -> bool:
+        """Open store (memory-mapped, read-only) dari build yang ditunjuk CURRENT"""
+        build_name = self._current_build(self.store_path)
+        if build_name is None:
+            return False
+
+        index_file = self.store_path / build_name / self.INDEX_FILE
+        features_file = self.store_path / build_name / self.FEATURES_FILE
+
+        if not index_file.exists() or not features_file.exists():
+            return False
+
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+
+            features = np.load(features_file, mmap_mode='r')
+            if features.shape != (index['rows'], len(index['columns'])):
+                logger.warning("Feature store shape does not match its index, ignoring store")
+                return False
+
+            self.features = features
+            self.data_version = index['data_version']
+            self.columns = index['columns']
+            self._series = {
+                (entry['commodity'], entry['region']): entry for entry in index['series']
+            }
+            self._scalers = {}
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not open feature store: {str(e)}")
+            return False
+
+    def has_series(self, commodity: str, region: str) -> bool:
+        return (commodity, region) in self._series
+
+    def series_length(self, commodity: str, region: str) -> int:
+        entry = self._series.get((commodity, region))
+        return entry['stop'] - entry['start'] if entry else 0
+
+    def get_window(self, commodity: str, region: str, sequence_length: int) -> Optional[np.ndarray]:
+        """Window terakhir (sequence_length, n_features) sebagai view ke memmap"""
+        entry = self._series.get((commodity, region))
+        if entry is None or entry['stop'] - entry['start'] < sequence_length:
+            return None
+        return self.features[entry['stop'] - sequence_length:entry['stop']]
+
+    def get_scaler(self, commodity: str, region: str) -> Optional[MinMaxScaler]:
+        """MinMaxScaler series, direkonstruksi dari data_min/data_max yang disimpan"""
+        key = (commodity, region)
+        entry = self._series.get(key)
+        if entry is None:
+            return None
+
+        if key not in self._scalers:
+            # Fit pada [min, max] menghasilkan parameter yang identik
+            bounds = np.array([entry['data_min'], entry['data_max']])
+            self._scalers[key] = MinMaxScaler().fit(bounds)
+        return self._scalers[key]
+
+
+if __name__ == "__main__":
+    # Offline build: python -m data.models.feature_store (dari direktori backend)
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+    from config.settings import settings
+    from data.models.data_processor import DataProcessor
+
+    processor = DataProcessor(
+        settings.dataset_path,
+        cache_dir=settings.feature_cache_path if settings.feature_cache_enabled else None,
+        compact_schema=settings.compact_schema,
+        sqlite_path=settings.sqlite_path if settings.storage_backend == 'sqlite' else None
+    )
+    processor.load_data()
+    FeatureStore.build(processor, settings.feature_store_path)
@@ -1,8 +1,5 @@
 # backend/data/models/lstm_model.py - FIXED VERSION
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout
 from sklearn.preprocessing import MinMaxScaler
 from typing import Dict, List, Tuple, Optional
 import logging
@@ -13,6 +10,18 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# TensorFlow di-import lazily lewat _import_tensorflow() supaya import module
+# ini murah dan endpoint data bisa melayani request sebelum TF selesai load
+tf = None
+
+def _import_tensorflow():
+    """Import TensorFlow sekali, saat model pertama kali dibutuhkan"""
+    global tf
+    if tf is None:
+        import tensorflow
+        tf = tensorflow
+    return tf
+
 class LSTMPredictor:
     """
     LSTM-based price prediction model for PANGAN-AI
@@ -45,6 +54,9 @@ class LSTMPredictor:
         try:
             # Load main model with custom objects handling
             if self.main_model_file.exists():
+                tf = _import_tensorflow()
+                load_model = tf.keras.models.load_model
+                
                 # Define custom objects untuk backward compatibility
                 custom_objects = {
                     'mse': tf.keras.losses.MeanSquaredError(),
@@ -137,13 +149,16 @@ class LSTMPredictor:
             logger.error(f"Error creating fallback scaler: {str(e)}")
             self.main_scaler = None
     
-    def _create_lstm_model(self, input_shape: Tuple[int, int]) -> Sequential:
+    def _create_lstm_model(self, input_shape: Tuple[int, int]) -> "tf.keras.Sequential":
         """
         Create LSTM model architecture sesuai dengan diagram di proposal
         Input: (sequence_length, n_features)
         """
         
-        model = Sequential([
+        tf = _import_tensorflow()
+        from tensorflow.keras.layers import LSTM, Dense, Dropout
+        
+        model = tf.keras.Sequential([
             # LSTM Layer 1 - 64 units dengan return sequences
             LSTM(64, return_sequences=True, input_shape=input_shape),
             Dropout(0.2),
@@ -328,6 +343,9 @@ class LSTMPredictor:
         
         try:
             if model_file.exists() and scaler_file.exists():
+                tf = _import_tensorflow()
+                load_model = tf.keras.models.load_model
+                
                 # Load model with error handling
                 custom_objects = {
                     'mse': tf.keras.losses.MeanSquaredError(),
@@ -0,0 +1,601 @@
+# backend/data/models/series_statistics.py - Statistik semua series dalam satu grouped pass
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Series agregat nasional per komoditas (rata-rata harga harian antar wilayah)
+ALL_REGIONS = 'all'
+
+MONTH_NAMES = [
+    'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni',
+    'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember'
+]
+QUARTER_NAMES = ['Q1', 'Q2', 'Q3', 'Q4']
+
+# Event musiman -> kolom dummy dataset
+EVENT_COLUMNS = {
+    'ramadan': 'dum_ramadan',
+    'idul_fitri': 'dum_idulfitri',
+    'natal_tahun_baru': 'dum_natal_newyr'
+}
+
+# Kolom cuaca untuk korelasi harga-cuaca
+WEATHER_COLUMNS = ['tavg_final', 'rh_avg_final', 'ff_avg_final', 'rr']
+
+# Window ringkasan harga terbaru (jumlah baris terakhir, sama dengan tail(n))
+SUMMARY_WINDOWS = {'last_7_days': 7, 'last_30_days': 30}
+
+# Window trend (hari kalender sebelum tanggal terakhir series)
+TREND_WINDOWS = {'short_term': 7, 'medium_term': 30}
+RECENT_WINDOW_DAYS = 30
+
+# Seasonal: periode (bulan/kuartal per tahun) dihitung jika punya minimal
+# 5 observasi; analisis tersedia jika minimal 6 bulan kalender punya data.
+# Event dihitung jika minimal 5 return harian jatuh di hari event.
+MIN_PERIOD_OBSERVATIONS = 5
+MIN_SEASONAL_MONTHS = 6
+MIN_EVENT_OBSERVATIONS = 5
+
+
+def volatility_category(volatility) -> np.ndarray:
+    """Kategori volatilitas (%) sesuai threshold ranking /volatility-comparison"""
+    volatility = np.asarray(volatility, dtype=np.float64)
+    return np.select(
+        [volatility <= 10, volatility <= 20, volatility <= 30],
+        ['Low', 'Medium', 'High'],
+        'Very High'
+    )
+
+
+def with_national_series(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame harga (terurut by komoditas, wilayah, tanggal) ditambah satu
+    series wilayah 'all' per komoditas: harga = rata-rata antar wilayah,
+    flag event (dum_*) = aktif jika aktif di salah satu wilayah. Hasil tidak
+    di-sort ulang: setiap series tetap berupa blok kontigu terurut by tanggal.
+    """
+    flags = [column for column in EVENT_COLUMNS.values() if column in data.columns]
+    frame = data[['komoditas', 'wilayah', 'tanggal', 'harga'] + flags].astype(
+        {'komoditas': object, 'wilayah': object}
+    )
+    aggregations = {'harga': 'mean', **{column: 'max' for column in flags}}
+    national = frame.groupby(['komoditas', 'tanggal'], sort=True).agg(aggregations).reset_index()
+    national['wilayah'] = ALL_REGIONS
+    return pd.concat([frame, national[frame.columns]], ignore_index=True)
+
+
+class _SeriesBlocks:
+    """Layout blok kontigu per series dari frame terurut by (komoditas, wilayah, tanggal)"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        commodities = frame['komoditas'].to_numpy(dtype=object)
+        regions = frame['wilayah'].to_numpy(dtype=object)
+
+        self.prices = frame['harga'].to_numpy(dtype=np.float64)
+        self.days = frame['tanggal'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+        # Awal blok series: baris di mana komoditas atau wilayah berubah
+        self.is_start = np.ones(len(frame), dtype=bool)
+        self.is_start[1:] = (commodities[1:] != commodities[:-1]) | (regions[1:] != regions[:-1])
+        self.starts = np.flatnonzero(self.is_start)
+        self.last = np.append(self.starts[1:], len(frame)) - 1
+        self.counts = self.last - self.starts + 1
+        self.codes = np.cumsum(self.is_start) - 1
+        self.n_series = len(self.starts)
+        self.keys = list(zip(commodities[self.starts], regions[self.starts]))
+
+    def returns(self, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return antar observasi berurutan di dalam series; valid jika kedua baris ada di mask"""
+        previous = np.empty_like(self.prices)
+        previous[0] = np.nan
+        previous[1:] = self.prices[:-1]
+        valid = mask & ~self.is_start & (previous != 0)
+        valid[1:] &= mask[:-1]
+        returns = np.divide(self.prices - previous, previous, out=np.zeros_like(self.prices), where=valid)
+        return returns, valid
+
+    def date_range(self, i: int) -> Dict[str, str]:
+        dates = self.frame['tanggal']
+        return {
+            'start': pd.Timestamp(dates.iat[self.starts[i]]).strftime('%Y-%m-%d'),
+            'end': pd.Timestamp(dates.iat[self.last[i]]).strftime('%Y-%m-%d')
+        }
+
+
+def _grouped_moments(values: np.ndarray, groups: np.ndarray, mask: np.ndarray,
+                     n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(count, mean, sample std) per group untuk baris mask, dua-pass via bincount"""
+    count = np.bincount(groups, weights=mask.astype(np.float64), minlength=n_groups)
+    total = np.bincount(groups, weights=np.where(mask, values, 0.0), minlength=n_groups)
+    mean = np.divide(total, count, out=np.full(n_groups, np.nan), where=count > 0)
+    deviation = np.where(mask, values - mean[groups], 0.0)
+    sum_sq = np.bincount(groups, weights=deviation * deviation, minlength=n_groups)
+    std = np.sqrt(np.divide(sum_sq, count - 1, out=np.full(n_groups, np.nan), where=count > 1))
+    return count, mean, std
+
+
+def _volatility(blocks: _SeriesBlocks, mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """Metrik volatilitas (%) per series untuk baris mask"""
+    prices, codes, n_series = blocks.prices, blocks.codes, blocks.n_series
+    count, mean, std = _grouped_moments(prices, codes, mask, n_series)
+
+    high = np.maximum.reduceat(np.where(mask, prices, -np.inf), blocks.starts)
+    low = np.minimum.reduceat(np.where(mask, prices, np.inf), blocks.starts)
+
+    returns, valid = blocks.returns(mask)
+    _, _, returns_std = _grouped_moments(returns, codes, valid, n_series)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coefficient_of_variation = std / mean * 100
+        range_volatility = (high - low) / mean * 100
+
+    return {
+        'data_points': count,
+        'coefficient_of_variation': coefficient_of_variation,
+        'daily_returns_volatility': returns_std * 100,
+        'range_volatility': np.where(count > 0, range_volatility, np.nan),
+        # Volatilitas utama = coefficient of variation (definisi yang sama
+        # dengan perhitungan volatility di dashboard frontend)
+        'final_volatility': coefficient_of_variation
+    }
+
+
+def _trend(blocks: _SeriesBlocks, window_days: int) -> Dict[str, np.ndarray]:
+    """
+    Perubahan harga terakhir vs harga pada (atau sebelum) window_days hari
+    sebelumnya; satu searchsorted untuk semua series pada key (series, hari)
+    """
+    prices, days, last, n_series = blocks.prices, blocks.days, blocks.last, blocks.n_series
+    keys = blocks.codes.astype(np.int64) * (1 << 32) + days
+    targets = np.arange(n_series, dtype=np.int64) * (1 << 32) + days[last] - window_days
+    base_rows = np.searchsorted(keys, targets, 'right') - 1
+    available = base_rows >= blocks.starts
+
+    base = prices[np.maximum(base_rows, 0)]
+    change = np.divide(prices[last] - base, base, out=np.zeros(n_series),
+                       where=available & (base != 0)) * 100
+    return {'available': available, 'change_percent': change, 'base_price': base}
+
+
+def _calendar_volatility(blocks: _SeriesBlocks, period_index: np.ndarray,
+                         n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Volatilitas per bucket kalender (bulan atau kuartal) per series:
+    coefficient of variation per (series, periode absolut), lalu dirata-rata
+    antar tahun per (series, periode % n_buckets).
+    Return (volatility [series x n_buckets], observasi [series x n_buckets]).
+    """
+    n_series = blocks.n_series
+    first_period = int(period_index.min())
+    periods = period_index - first_period
+    n_periods = int(periods.max()) + 1
+
+    groups = blocks.codes.astype(np.int64) * n_periods + periods
+    everything = np.ones(len(periods), dtype=bool)
+    count, mean, std = _grouped_moments(blocks.prices, groups, everything, n_series * n_periods)
+
+    valid = count >= MIN_PERIOD_OBSERVATIONS
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period_cv = np.where(valid, std / mean * 100, 0.0)
+
+    group_ids = np.arange(n_series * n_periods)
+    buckets = (group_ids // n_periods) * n_buckets + (first_period + group_ids % n_periods) % n_buckets
+    size = n_series * n_buckets
+    cv_sum = np.bincount(buckets, weights=period_cv, minlength=size)
+    cv_count = np.bincount(buckets, weights=valid.astype(np.float64), minlength=size)
+    observations = np.bincount(buckets, weights=count, minlength=size)
+
+    volatility = np.divide(cv_sum, cv_count, out=np.full(size, np.nan), where=cv_count > 0)
+    return volatility.reshape(n_series, n_buckets), observations.reshape(n_series, n_buckets)
+
+
+def _event_volatility(blocks: _SeriesBlocks) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Volatilitas return harian (%) pada hari event vs hari normal (tanpa event
+    apapun) per series, plus selisih rata-rata harga event vs normal
+    """
+    frame, codes, n_series = blocks.frame, blocks.codes, blocks.n_series
+    flags = {
+        event: frame[column].to_numpy() == 1
+        for event, column in EVENT_COLUMNS.items() if column in frame.columns
+    }
+    if not flags:
+        return {}
+
+    everything = np.ones(len(frame), dtype=bool)
+    returns, valid = blocks.returns(everything)
+    normal = ~np.logical_or.reduce(list(flags.values()))
+
+    _, _, normal_std = _grouped_moments(returns, codes, valid & normal, n_series)
+    _, normal_price, _ = _grouped_moments(blocks.prices, codes, normal, n_series)
+
+    events = {}
+    for event, flag in flags.items():
+        count, _, event_std = _grouped_moments(returns, codes, valid & flag, n_series)
+        _, event_price, _ = _grouped_moments(blocks.prices, codes, flag, n_series)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            events[event] = {
+                'observations': count,
+                'volatility': event_std * 100,
+                'normal_volatility': normal_std * 100,
+                'volatility_ratio': event_std / normal_std,
+                'price_change_pct': (event_price - normal_price) / normal_price * 100
+            }
+    return events
+
+
+def _number(value, digits: int = 2) -> float:
+    """Float JSON-safe (NaN/inf -> 0.0)"""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else 0.0
+
+
+def _trend_summary(change: float, window_days: int) -> Dict:
+    direction = 'increasing' if change > 2 else 'decreasing' if change < -2 else 'stable'
+    magnitude = abs(change)
+    strength = 'strong' if magnitude > 15 else 'moderate' if magnitude > 5 else 'weak'
+    return {
+        'change_percent': _number(change),
+        'direction': direction,
+        'strength': strength,
+        'period_days': window_days
+    }
+
+
+def compute_enhanced_statistics(data: pd.DataFrame) -> Dict[Tuple[str, str], Dict]:
+    """
+    Basic stats, volatilitas dan trend untuk semua (komoditas, wilayah)
+    plus series nasional (komoditas, 'all'), dihitung sekaligus dengan
+    reduksi NumPy per grup. Input: kolom tanggal, komoditas, wilayah,
+    harga, terurut by (komoditas, wilayah, tanggal).
+    """
+    if data.empty:
+        return {}
+
+    blocks = _SeriesBlocks(with_national_series(data))
+    prices, days, codes, last, n_series = (
+        blocks.prices, blocks.days, blocks.codes, blocks.last, blocks.n_series
+    )
+
+    everything = np.ones(len(prices), dtype=bool)
+    recent = days >= (days[last] - (RECENT_WINDOW_DAYS - 1))[codes]
+
+    _, mean_all, std_all = _grouped_moments(prices, codes, everything, n_series)
+    _, recent_mean, _ = _grouped_moments(prices, codes, recent, n_series)
+    volatility = {
+        'all_period': _volatility(blocks, everything),
+        f'last_{RECENT_WINDOW_DAYS}_days': _volatility(blocks, recent)
+    }
+    trends = {name: _trend(blocks, window) for name, window in TREND_WINDOWS.items()}
+
+    low = np.minimum.reduceat(prices, blocks.starts)
+    high = np.maximum.reduceat(prices, blocks.starts)
+
+    categories = {period: volatility_category(np.nan_to_num(values['final_volatility']))
+                  for period, values in volatility.items()}
+
+    results = {}
+    for i, key in enumerate(blocks.keys):
+        volatility_analysis = {
+            period: {
+                'final_volatility': _number(values['final_volatility'][i]),
+                'volatility_category': str(categories[period][i]),
+                'coefficient_of_variation': _number(values['coefficient_of_variation'][i]),
+                'daily_returns_volatility': _number(values['daily_returns_volatility'][i]),
+                'range_volatility': _number(values['range_volatility'][i]),
+                'data_points': int(values['data_points'][i])
+            }
+            for period, values in volatility.items()
+        }
+
+        trend_analysis = {'available': bool(trends['short_term']['available'][i])}
+        for name, window in TREND_WINDOWS.items():
+            if trends[name]['available'][i]:
+                trend_analysis[name] = _trend_summary(trends[name]['change_percent'][i], window)
+
+        results[key] = {
+            'basic_stats': {
+                'current_price': _number(prices[last[i]]),
+                'avg_price_all': _number(mean_all[i]),
+                f'avg_price_{RECENT_WINDOW_DAYS}d': _number(recent_mean[i]),
+                'min_price': _number(low[i]),
+                'max_price': _number(high[i]),
+                'std_price': _number(std_all[i]),
+                'data_points': int(blocks.counts[i]),
+                'date_range': blocks.date_range(i)
+            },
+            'volatility_analysis': volatility_analysis,
+            'trend_analysis': trend_analysis
+        }
+
+    logger.info(f"Enhanced statistics computed for {n_series} series")
+    return results
+
+
+def _bucket_summary(names: List[str], volatility: np.ndarray, categories: np.ndarray,
+                    observations: np.ndarray) -> Dict[str, Dict]:
+    """{nama bulan/kuartal: volatility, category, observations} untuk bucket yang terisi"""
+    return {
+        names[bucket]: {
+            'volatility': _number(volatility[bucket]),
+            'category': str(categories[bucket]),
+            'observations': int(observations[bucket])
+        }
+        for bucket in np.flatnonzero(~np.isnan(volatility))
+    }
+
+
+def compute_seasonal_volatility(data: pd.DataFrame) -> Dict[Tuple[str, str], Dict]:
+    """
+    Volatilitas musiman untuk semua (komoditas, wilayah) plus series
+    nasional (komoditas, 'all'): volatilitas per bulan dan per kuartal,
+    rasio volatilitas event (Ramadan, Idul Fitri, Natal/Tahun Baru dari
+    kolom dum_*) terhadap hari normal, dan bulan paling/kurang volatil.
+    Input: kolom tanggal, komoditas, wilayah, harga (plus dum_* jika ada),
+    terurut by (komoditas, wilayah, tanggal).
+    """
+    if data.empty:
+        return {}
+
+    blocks = _SeriesBlocks(with_national_series(data))
+
+    # Bulan sejak epoch (Januari 1970 = 0): bulan kalender = index % 12,
+    # kuartal kalender = (index // 3) % 4
+    month_index = blocks.days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    monthly, monthly_observations = _calendar_volatility(blocks, month_index, 12)
+    quarterly, quarterly_observations = _calendar_volatility(blocks, month_index // 3, 4)
+    events = _event_volatility(blocks)
+
+    monthly_categories = volatility_category(np.nan_to_num(monthly))
+    quarterly_categories = volatility_category(np.nan_to_num(quarterly))
+
+    results = {}
+    for i, key in enumerate(blocks.keys):
+        observed_months = np.flatnonzero(~np.isnan(monthly[i]))
+        if len(observed_months) < MIN_SEASONAL_MONTHS:
+            results[key] = {
+                'available': False,
+                'reason': f"Need at least {MIN_SEASONAL_MONTHS} months with "
+                          f"{MIN_PERIOD_OBSERVATIONS}+ observations, found {len(observed_months)}",
+                'data_points': int(blocks.counts[i]),
+                'date_range': blocks.date_range(i)
+            }
+            continue
+
+        monthly_volatility = _bucket_summary(
+            MONTH_NAMES, monthly[i], monthly_categories[i], monthly_observations[i]
+        )
+        quarterly_volatility = _bucket_summary(
+            QUARTER_NAMES, quarterly[i], quarterly_categories[i], quarterly_observations[i]
+        )
+        event_volatility = {
+            event: {
+                'volatility': _number(values['volatility'][i]),
+                'normal_volatility': _number(values['normal_volatility'][i]),
+                'volatility_ratio': _number(values['volatility_ratio'][i], 3),
+                'price_change_pct': _number(values['price_change_pct'][i]),
+                'observations': int(values['observations'][i])
+            }
+            for event, values in events.items()
+            if values['observations'][i] >= MIN_EVENT_OBSERVATIONS
+            and np.isfinite(values['volatility_ratio'][i])
+        }
+
+        ranked = observed_months[np.argsort(-monthly[i][observed_months], kind='stable')]
+        describe = {
+            month: {
+                'month': MONTH_NAMES[month],
+                'volatility': monthly_volatility[MONTH_NAMES[month]]['volatility'],
+                'category': monthly_volatility[MONTH_NAMES[month]]['category']
+            }
+            for month in observed_months
+        }
+        observed_quarters = np.flatnonzero(~np.isnan(quarterly[i]))
+        peak_quarter = observed_quarters[np.argmax(quarterly[i][observed_quarters])]
+
+        results[key] = {
+            'available': True,
+            'monthly_volatility': monthly_volatility,
+            'quarterly_volatility': quarterly_volatility,
+            'event_volatility': event_volatility,
+            'seasonal_patterns': {
+                'highest_volatility_months': [describe[month] for month in ranked[:3]],
+                'lowest_volatility_months': [describe[month] for month in ranked[::-1][:3]],
+                'highest_volatility_quarter': QUARTER_NAMES[peak_quarter],
+                'high_impact_events': sorted(
+                    [event for event, values in event_volatility.items() if values['volatility_ratio'] > 1],
+                    key=lambda event: -event_volatility[event]['volatility_ratio']
+                )
+            },
+            'data_points': int(blocks.counts[i]),
+            'date_range': blocks.date_range(i)
+        }
+
+    logger.info(f"Seasonal volatility computed for {blocks.n_series} series")
+    return results
+
+
+def _pooled_series(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame series ditambah satu blok (komoditas, 'all') per komoditas berisi
+    semua baris wilayah komoditas itu terurut by tanggal (stable), yaitu
+    baris yang sama dan urutan yang sama dengan get_commodity_data(commodity)
+    """
+    frame = data.astype({'komoditas': object, 'wilayah': object})
+    pooled = frame.sort_values(['komoditas', 'tanggal'], kind='stable')
+    pooled['wilayah'] = ALL_REGIONS
+    return pd.concat([frame, pooled], ignore_index=True)
+
+
+def _grouped_correlation(x: np.ndarray, y: np.ndarray, groups: np.ndarray,
+                         n_groups: int) -> np.ndarray:
+    """Pearson correlation per group atas pasangan tanpa NaN (seperti Series.corr)"""
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    count = np.bincount(groups, weights=valid.astype(np.float64), minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = np.bincount(groups, weights=np.where(valid, x, 0.0), minlength=n_groups) / count
+        mean_y = np.bincount(groups, weights=np.where(valid, y, 0.0), minlength=n_groups) / count
+    dx = np.where(valid, x - mean_x[groups], 0.0)
+    dy = np.where(valid, y - mean_y[groups], 0.0)
+    covariance = np.bincount(groups, weights=dx * dy, minlength=n_groups)
+    variance_x = np.bincount(groups, weights=dx * dx, minlength=n_groups)
+    variance_y = np.bincount(groups, weights=dy * dy, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return covariance / np.sqrt(variance_x * variance_y)
+
+
+def _float(value, default: float = 0.0) -> float:
+    value = float(value)
+    return value if np.isfinite(value) else default
+
+
+def compute_series_summary(data: pd.DataFrame) -> Dict[Tuple[str, str], Dict]:
+    """
+    Ringkasan harga per (komoditas, wilayah) plus (komoditas, 'all') =
+    gabungan semua baris wilayah (semantik get_commodity_data(commodity)):
+    basic stats, window baris terakhir, rata-rata bulanan, efek event,
+    korelasi cuaca dan statistik historis untuk perbandingan prediksi.
+    Input: kolom tanggal, komoditas, wilayah, harga (plus dum_* dan kolom
+    cuaca jika ada), terurut by (komoditas, wilayah, tanggal).
+    """
+    if data.empty:
+        return {}
+
+    blocks = _SeriesBlocks(_pooled_series(data))
+    frame, prices, codes, n_series = blocks.frame, blocks.prices, blocks.codes, blocks.n_series
+    starts, last, counts = blocks.starts, blocks.last, blocks.counts
+
+    everything = np.ones(len(prices), dtype=bool)
+    _, mean, std = _grouped_moments(prices, codes, everything, n_series)
+    low = np.minimum.reduceat(prices, starts)
+    high = np.maximum.reduceat(prices, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        population_std = std * np.sqrt((counts - 1) / counts)
+
+    # Window tail(n): posisi baris dihitung dari akhir blok series
+    from_end = last[codes] - np.arange(len(prices))
+    windows = {}
+    for name, size in SUMMARY_WINDOWS.items():
+        window_count, window_mean, window_std = _grouped_moments(prices, codes, from_end < size, n_series)
+        first = prices[np.maximum(last - size + 1, starts)]
+        windows[name] = (window_count, window_mean, window_std, prices[last] - first)
+
+    # Rata-rata harga per bulan kalender (1-12)
+    months = frame['tanggal'].dt.month.to_numpy() - 1
+    month_count, month_mean, _ = _grouped_moments(prices, codes * 12 + months, everything, n_series * 12)
+    month_count = month_count.reshape(n_series, 12)
+    month_mean = month_mean.reshape(n_series, 12)
+
+    # Efek event: rata-rata harga hari event vs hari non-Ramadan
+    effects = {}
+    if 'dum_ramadan' in frame.columns:
+        ramadan = frame['dum_ramadan'].to_numpy()
+        normal_count, normal_mean, _ = _grouped_moments(prices, codes, ramadan == 0, n_series)
+        for effect, column, label in [('ramadan_effect', 'dum_ramadan', 'ramadan_avg'),
+                                      ('idul_fitri_effect', 'dum_idulfitri', 'idul_fitri_avg')]:
+            if column in frame.columns:
+                event_count, event_mean, _ = _grouped_moments(
+                    prices, codes, frame[column].to_numpy() == 1, n_series
+                )
+                effects[effect] = (label, event_count, event_mean, normal_count, normal_mean)
+
+    correlations = {
+        column: _grouped_correlation(frame[column].to_numpy(dtype=np.float64), prices, codes, n_series)
+        for column in WEATHER_COLUMNS if column in frame.columns
+    }
+
+    results = {}
+    for i, key in enumerate(blocks.keys):
+        trend_analysis = {}
+        for name, (window_count, window_mean, window_std, change) in windows.items():
+            trend_analysis[name] = {
+                'avg_price': _float(window_mean[i]),
+                'price_change': float(change[i]) if window_count[i] > 1 else 0,
+                'volatility': _float(window_std[i]) if window_count[i] > 1 else 0
+            }
+
+        seasonal_patterns = {
+            'monthly_avg': {
+                int(month) + 1: float(month_mean[i][month]) for month in np.flatnonzero(month_count[i])
+            }
+        }
+        for effect, (label, event_count, event_mean, normal_count, normal_mean) in effects.items():
+            if event_count[i] > 0 and normal_count[i] > 0:
+                seasonal_patterns[effect] = {
+                    label: float(event_mean[i]),
+                    'normal_avg': float(normal_mean[i]),
+                    'price_increase_pct': float((event_mean[i] - normal_mean[i]) / normal_mean[i] * 100)
+                }
+
+        results[key] = {
+            'basic_stats': {
+                'count': int(counts[i]),
+                'current_price': float(prices[last[i]]),
+                'avg_price': float(mean[i]),
+                'min_price': float(low[i]),
+                'max_price': float(high[i]),
+                'volatility': _float(std[i] / mean[i] * 100),
+                'date_range': blocks.date_range(i)
+            },
+            'trend_analysis': trend_analysis,
+            'seasonal_patterns': seasonal_patterns,
+            'weather_correlation': {
+                column: float(values[i]) for column, values in correlations.items() if np.isfinite(values[i])
+            },
+            # Statistik historis dengan std populasi (ddof=0), untuk perbandingan prediksi
+            'historical_stats': {
+                'mean': float(mean[i]),
+                'std': _float(population_std[i]),
+                'max': float(high[i]),
+                'min': float(low[i])
+            }
+        }
+
+    logger.info(f"Series summary computed for {n_series} series")
+    return results
+
+
+def window_price_changes(data: pd.DataFrame, recent_window: int = 7,
+                         previous_window: int = 7) -> pd.DataFrame:
+    """
+    Perubahan rata-rata harga `recent_window` baris terakhir vs
+    `previous_window` baris sebelumnya untuk semua series sekaligus
+    (semantik tail(recent + previous).head(previous) per series). Input:
+    tail per series (mis. DataProcessor.query_tail) dengan kolom tanggal,
+    komoditas, wilayah, harga, terurut by (komoditas, wilayah, tanggal).
+    Series dengan kurang dari recent_window baris tidak diikutkan.
+    """
+    columns = ['komoditas', 'wilayah', 'tanggal', 'current_price',
+               'recent_avg', 'previous_avg', 'change_pct']
+    if data.empty:
+        return pd.DataFrame(columns=columns)
+
+    blocks = _SeriesBlocks(data)
+    codes, starts, last = blocks.codes, blocks.starts, blocks.last
+    positions = np.arange(len(blocks.prices))
+
+    # Tail terakhir (recent + previous) baris; previous = baris awal tail tersebut
+    in_tail = positions > last[codes] - (recent_window + previous_window)
+    tail_start = np.maximum(starts, last - (recent_window + previous_window) + 1)
+    recent = positions > last[codes] - recent_window
+    previous = in_tail & (positions < tail_start[codes] + previous_window)
+
+    _, recent_avg, _ = _grouped_moments(blocks.prices, codes, recent, blocks.n_series)
+    _, previous_avg, _ = _grouped_moments(blocks.prices, codes, previous, blocks.n_series)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (recent_avg - previous_avg) / previous_avg * 100
+
+    eligible = blocks.counts >= recent_window
+    return pd.DataFrame({
+        'komoditas': [key[0] for key in blocks.keys],
+        'wilayah': [key[1] for key in blocks.keys],
+        'tanggal': data['tanggal'].to_numpy()[last],
+        'current_price': blocks.prices[last],
+        'recent_avg': recent_avg,
+        'previous_avg': previous_avg,
+        'change_pct': change
+    })[eligible].reset_index(drop=True)
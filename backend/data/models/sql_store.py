@@ -0,0 +1,311 @@
+# backend/data/models/sql_store.py - Embedded SQLite storage backend
+import pandas as pd
+import numpy as np
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class SQLiteStore:
+    """
+    Embedded (file-based, tanpa server) storage untuk processed dataset.
+    Filter komoditas/wilayah, range tanggal, ordering dan limit dieksekusi
+    oleh SQLite memakai index (komoditas, wilayah, level_harga, tanggal),
+    sehingga worker tidak perlu menyimpan seluruh frame di memory.
+    Tanggal disimpan sebagai TEXT ISO 'YYYY-MM-DD' (urutan leksikografis
+    sama dengan urutan kronologis).
+    """
+
+    TABLE = "prices"
+    META_TABLE = "meta"
+    CHUNK_SIZE = 50000
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._columns: Optional[List[str]] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Satu connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path))
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Build & metadata
+    # ------------------------------------------------------------------
+
+    def build(self, data: pd.DataFrame, fingerprint: str):
+        """Tulis processed frame ke database baru (atomik via file sementara)"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.with_name(f"{self.db_path.name}.tmp-{os.getpid()}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        table = data.copy()
+        for col in table.columns:
+            if pd.api.types.is_datetime64_any_dtype(table[col]):
+                table[col] = table[col].dt.strftime('%Y-%m-%d')
+            elif isinstance(table[col].dtype, pd.CategoricalDtype):
+                table[col] = table[col].astype(object)
+
+        conn = sqlite3.connect(str(tmp_path))
+        try:
+            table.to_sql(self.TABLE, conn, index=False, chunksize=self.CHUNK_SIZE)
+            conn.execute(
+                f"CREATE INDEX idx_{self.TABLE}_series ON {self.TABLE} "
+                f"(komoditas, wilayah, level_harga, tanggal)"
+            )
+            conn.execute(f"CREATE INDEX idx_{self.TABLE}_tanggal ON {self.TABLE} (tanggal)")
+            conn.execute(f"CREATE TABLE {self.META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+            conn.executemany(
+                f"INSERT INTO {self.META_TABLE} (key, value) VALUES (?, ?)",
+                [('fingerprint', fingerprint), ('revision', '0')]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        os.replace(tmp_path, self.db_path)
+        self._local = threading.local()
+        self._columns = None
+        logger.info(f"SQLite store built: {len(table)} rows at {self.db_path}")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        if not self.db_path.exists():
+            return None
+        try:
+            row = self._connection().execute(
+                f"SELECT value FROM {self.META_TABLE} WHERE key = ?", (key,)
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+
+    def increment_revision(self, commodity: str) -> int:
+        """
+        Naikkan revisi append secara atomik dan return nilai barunya.
+        Komoditas yang di-append dicatat per revisi ('revision:<n>') supaya
+        worker lain bisa refresh incremental (revision_commodities).
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                f"UPDATE {self.META_TABLE} SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'"
+            )
+            row = conn.execute(
+                f"SELECT value FROM {self.META_TABLE} WHERE key = 'revision'"
+            ).fetchone()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.META_TABLE} (key, value) VALUES (?, ?)",
+                (f"revision:{int(row[0])}", commodity)
+            )
+        return int(row[0])
+
+    def revision_commodities(self, since: int, until: int) -> Optional[List[str]]:
+        """Komoditas yang di-append pada revisi (since, until]; None jika log tidak lengkap"""
+        if until <= since:
+            return []
+        keys = [f"revision:{revision}" for revision in range(since + 1, until + 1)]
+        placeholders = ", ".join("?" * len(keys))
+        rows = self._connection().execute(
+            f"SELECT value FROM {self.META_TABLE} WHERE key IN ({placeholders})", keys
+        ).fetchall()
+        if len(rows) != len(keys):
+            return None
+        return sorted({row[0] for row in rows})
+
+    @property
+    def columns(self) -> List[str]:
+        if self._columns is None:
+            cursor = self._connection().execute(f"PRAGMA table_info({self.TABLE})")
+            self._columns = [row[1] for row in cursor.fetchall()]
+        return self._columns
+
+    def size_mb(self) -> float:
+        return round(self.db_path.stat().st_size / 1024 ** 2, 2) if self.db_path.exists() else 0.0
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _where(self, commodity: Optional[str] = None, region: Optional[str] = None,
+               start_date: Optional[Union[date, str]] = None,
+               end_date: Optional[Union[date, str]] = None,
+               after: Optional[Tuple] = None) -> Tuple[str, List]:
+        clauses, params = [], []
+        if commodity and commodity != 'all':
+            clauses.append("komoditas = ?")
+            params.append(commodity)
+        if region and region != 'all':
+            clauses.append("wilayah = ?")
+            params.append(region)
+        if start_date:
+            clauses.append("tanggal >= ?")
+            params.append(pd.to_datetime(start_date).strftime('%Y-%m-%d'))
+        if end_date:
+            clauses.append("tanggal <= ?")
+            params.append(pd.to_datetime(end_date).strftime('%Y-%m-%d'))
+        if after:
+            # Keyset cursor (komoditas, wilayah, tanggal)
+            clauses.append("(komoditas, wilayah, tanggal) > (?, ?, ?)")
+            params.extend([after[0], after[1], pd.to_datetime(after[2]).strftime('%Y-%m-%d')])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(self, commodity: Optional[str] = None, region: Optional[str] = None,
+              start_date: Optional[Union[date, str]] = None,
+              end_date: Optional[Union[date, str]] = None,
+              columns: Optional[List[str]] = None,
+              limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Query baris terurut by tanggal. Dengan limit, yang dikembalikan
+        adalah `limit` baris terakhir (sama dengan tail(limit)).
+        """
+        if columns:
+            selected = [col for col in columns if col in self.columns]
+        else:
+            selected = list(self.columns)
+        select = ", ".join(f'"{col}"' for col in selected)
+        where, params = self._where(commodity, region, start_date, end_date)
+
+        if limit:
+            sql = (f"SELECT {select} FROM (SELECT * FROM {self.TABLE} {where} "
+                   f"ORDER BY tanggal DESC, komoditas DESC, wilayah DESC LIMIT ?) "
+                   f"ORDER BY tanggal, komoditas, wilayah")
+            params = params + [int(limit)]
+        else:
+            sql = f"SELECT {select} FROM {self.TABLE} {where} ORDER BY tanggal, komoditas, wilayah"
+
+        data = pd.read_sql_query(sql, self._connection(), params=params)
+        if 'tanggal' in data.columns:
+            data['tanggal'] = pd.to_datetime(data['tanggal'])
+        return data
+
+    def query_page(self, commodity: Optional[str] = None, region: Optional[str] = None,
+                   start_date: Optional[Union[date, str]] = None,
+                   end_date: Optional[Union[date, str]] = None,
+                   after: Optional[Tuple] = None,
+                   page_size: int = 500,
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Keyset page terurut by (komoditas, wilayah, tanggal)"""
+        selected = [col for col in columns if col in self.columns] if columns else list(self.columns)
+        select = ", ".join(f'"{col}"' for col in selected)
+        where, params = self._where(commodity, region, start_date, end_date, after=after)
+        sql = (f"SELECT {select} FROM {self.TABLE} {where} "
+               f"ORDER BY komoditas, wilayah, tanggal LIMIT ?")
+        data = pd.read_sql_query(sql, self._connection(), params=params + [int(page_size)])
+        if 'tanggal' in data.columns:
+            data['tanggal'] = pd.to_datetime(data['tanggal'])
+        return data
+
+    def query_series(self, series: List[Tuple[str, str]],
+                     start_date: Optional[Union[date, str]] = None,
+                     end_date: Optional[Union[date, str]] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Baris beberapa series (komoditas, wilayah) terurut by (komoditas, wilayah, tanggal)"""
+        selected = [col for col in columns if col in self.columns] if columns else list(self.columns)
+        select = ", ".join(f'"{col}"' for col in selected)
+        series = sorted(set(series))
+        if not series:
+            return pd.DataFrame(columns=selected)
+        
+        where, params = self._where(start_date=start_date, end_date=end_date)
+        values = ", ".join("(?, ?)" for _ in series)
+        series_clause = f"(komoditas, wilayah) IN (VALUES {values})"
+        where = f"{where} AND {series_clause}" if where else f"WHERE {series_clause}"
+        params = params + [value for key in series for value in key]
+        
+        sql = f"SELECT {select} FROM {self.TABLE} {where} ORDER BY komoditas, wilayah, tanggal"
+        data = pd.read_sql_query(sql, self._connection(), params=params)
+        if 'tanggal' in data.columns:
+            data['tanggal'] = pd.to_datetime(data['tanggal'])
+        return data
+
+    def query_tail(self, rows: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """`rows` baris terakhir per series terurut by (komoditas, wilayah, tanggal)"""
+        selected = [col for col in columns if col in self.columns] if columns else list(self.columns)
+        select = ", ".join(f'"{col}"' for col in selected)
+        keys = ", ".join(f'"{col}"' for col in ['komoditas', 'wilayah', 'tanggal'] if col not in selected)
+        inner = f"{select}, {keys}" if keys else select
+
+        sql = (f"SELECT {select} FROM (SELECT {inner}, ROW_NUMBER() OVER "
+               f"(PARTITION BY komoditas, wilayah ORDER BY tanggal DESC) AS row_from_end "
+               f"FROM {self.TABLE}) WHERE row_from_end <= ? ORDER BY komoditas, wilayah, tanggal")
+        data = pd.read_sql_query(sql, self._connection(), params=[int(rows)])
+        if 'tanggal' in data.columns:
+            data['tanggal'] = pd.to_datetime(data['tanggal'])
+        return data
+
+    def summary(self, commodity: Optional[str] = None, region: Optional[str] = None) -> Dict:
+        """Agregat harga (count/avg/min/max/std/current/date range) di dalam engine"""
+        where, params = self._where(commodity, region)
+        conn = self._connection()
+
+        count, avg, min_price, max_price, start, end = conn.execute(
+            f"SELECT COUNT(*), AVG(harga), MIN(harga), MAX(harga), MIN(tanggal), MAX(tanggal) "
+            f"FROM {self.TABLE} {where}", params
+        ).fetchone()
+        if not count:
+            return {'count': 0}
+
+        # Sample std dua-pass (SQLite tidak punya STDEV)
+        sum_sq = conn.execute(
+            f"SELECT SUM((harga - ?) * (harga - ?)) FROM {self.TABLE} {where}",
+            [avg, avg] + params
+        ).fetchone()[0]
+        std = float(np.sqrt(sum_sq / (count - 1))) if count > 1 else float('nan')
+
+        current = conn.execute(
+            f"SELECT harga FROM {self.TABLE} {where} "
+            f"ORDER BY tanggal DESC, komoditas DESC, wilayah DESC LIMIT 1", params
+        ).fetchone()[0]
+
+        return {
+            'count': count,
+            'avg': avg,
+            'min': min_price,
+            'max': max_price,
+            'std': std,
+            'current': current,
+            'start_date': start,
+            'end_date': end
+        }
+
+    def column_means(self, columns: List[str]) -> Dict[str, float]:
+        columns = [col for col in columns if col in self.columns]
+        if not columns:
+            return {}
+        select = ", ".join(f'AVG("{col}")' for col in columns)
+        values = self._connection().execute(f"SELECT {select} FROM {self.TABLE}").fetchone()
+        return {col: float(value) for col, value in zip(columns, values) if value is not None}
+
+    def series_counts(self) -> List[Tuple[str, str, int]]:
+        """(komoditas, wilayah, jumlah baris) per series, terurut"""
+        cursor = self._connection().execute(
+            f"SELECT komoditas, wilayah, COUNT(*) FROM {self.TABLE} "
+            f"GROUP BY komoditas, wilayah ORDER BY komoditas, wilayah"
+        )
+        return [(commodity, region, int(count)) for commodity, region, count in cursor.fetchall()]
+
+    def insert(self, data: pd.DataFrame):
+        """Append baris (kolom mengikuti tabel)"""
+        table = data.reindex(columns=self.columns)
+        table['tanggal'] = pd.to_datetime(table['tanggal']).dt.strftime('%Y-%m-%d')
+        table = table.astype(object).where(table.notna(), None)
+
+        placeholders = ", ".join("?" for _ in self.columns)
+        names = ", ".join(f'"{col}"' for col in self.columns)
+        conn = self._connection()
+        conn.executemany(
+            f"INSERT INTO {self.TABLE} ({names}) VALUES ({placeholders})",
+            table.itertuples(index=False, name=None)
+        )
+        conn.commit()
@@ -1,16 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from services.ai_service import AIService
+from services.container import get_ai_service
 from utils.validators import ChatRequest, AIInsightRequest
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize AI service (singleton pattern)
-ai_service = AIService()
-
 @router.post("/insights")
-async def generate_insights(request: AIInsightRequest):
+async def generate_insights(
+    request: AIInsightRequest,
+    ai_service: AIService = Depends(get_ai_service)
+):
     """
     Generate AI insights from prediction data
     
@@ -52,7 +53,10 @@ async def generate_insights(request: AIInsightRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/chat")
-async def chat_with_ai(request: ChatRequest):
+async def chat_with_ai(
+    request: ChatRequest,
+    ai_service: AIService = Depends(get_ai_service)
+):
     """
     Natural language chat interface with AI
     
@@ -83,7 +87,9 @@ async def chat_with_ai(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/status")
-async def get_ai_status():
+async def get_ai_status(
+    ai_service: AIService = Depends(get_ai_service)
+):
     """Get comprehensive AI service status"""
     try:
         status = ai_service.get_ai_service_status()
@@ -107,7 +113,8 @@ async def quick_insight(
     commodity: str,
     current_price: float,
     predicted_price: float,
-    days_ahead: int = 7
+    days_ahead: int = 7,
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Quick insight generation untuk simple prediction data"""
     try:
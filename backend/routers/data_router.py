@@ -1,27 +1,33 @@
 # File: backend/routers/enhanced_data_router.py
 # Enhanced API router yang terintegrasi dengan existing backend structure
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional, List
 from datetime import datetime, timedelta, date
 import logging
 
-# Import existing services (menggunakan singleton pattern yang sama)
+# Import existing services (instance di-share lewat service container)
 from services.data_service import DataService
+from services.container import get_data_service
+from utils.validators import PriceIngestRequest
+from utils.exporters import (
+    ARROW_MEDIA_TYPE, EXPORT_FORMATS, ExportDependencyError, ensure_arrow_support,
+    ensure_parquet_support, export_filename, frame_to_arrow_ipc, stream_export
+)
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize enhanced service (akan menggunakan existing DataService di dalamnya)
-enhanced_service = DataService()
-
 @router.get("/enhanced-statistics/{commodity}")
 async def get_enhanced_statistics(
     commodity: str,
     region: str = Query("all", description="Region filter"),
     include_seasonal: bool = Query(True, description="Include seasonal analysis"),
-    period_days: int = Query(365, description="Analysis period in days")
+    period_days: int = Query(365, description="Analysis period in days"),
+    enhanced_service: DataService = Depends(get_data_service)
 ):
     """
     Get enhanced commodity statistics dengan volatility dan seasonal analysis
@@ -88,7 +94,8 @@ async def get_enhanced_statistics(
 async def get_seasonal_volatility(
     commodity: str,
     region: str = Query("all", description="Region filter"),
-    analysis_type: str = Query("comprehensive", description="Type of analysis")
+    analysis_type: str = Query("comprehensive", description="Type of analysis"),
+    enhanced_service: DataService = Depends(get_data_service)
 ):
     """
     Get detailed seasonal volatility analysis
@@ -108,18 +115,15 @@ async def get_seasonal_volatility(
                     detail=f"Commodity '{commodity}' not found"
                 )
         
-        # Get commodity data menggunakan existing data processor
-        data = enhanced_service.data_processor.get_commodity_data(commodity, region)
+        # Lookup tabel seasonal yang sudah dihitung untuk versi dataset aktif
+        seasonal_result = enhanced_service.get_seasonal_volatility(commodity, region)
         
-        if data.empty:
+        if 'data_points' not in seasonal_result:
             raise HTTPException(
                 status_code=404,
                 detail=f"No data found for commodity: {commodity} in region: {region}"
             )
         
-        # Perform seasonal analysis
-        seasonal_result = enhanced_service.analyze_seasonal_volatility(data)
-        
         if not seasonal_result.get('available', False):
             raise HTTPException(
                 status_code=422,
@@ -151,11 +155,8 @@ async def get_seasonal_volatility(
                     "commodity": commodity,
                     "region": region,
                     "analysis_type": analysis_type,
-                    "data_points": len(data),
-                    "date_range": {
-                        "start": data['tanggal'].min().isoformat() if 'tanggal' in data.columns else None,
-                        "end": data['tanggal'].max().isoformat() if 'tanggal' in data.columns else None
-                    },
+                    "data_points": seasonal_result['data_points'],
+                    "date_range": seasonal_result['date_range'],
                     "data_source": "DataService"
                 }
             }
@@ -174,7 +175,8 @@ async def get_seasonal_volatility(
 async def compare_volatility(
     commodities: List[str] = Query(..., description="List of commodities to compare"),
     region: str = Query("all", description="Region filter"),
-    metric: str = Query("final_volatility", description="Volatility metric to compare")
+    metric: str = Query("final_volatility", description="Volatility metric to compare"),
+    enhanced_service: DataService = Depends(get_data_service)
 ):
     """
     Compare volatility across multiple commodities
@@ -291,7 +293,8 @@ async def compare_volatility(
 async def get_volatility_alerts(
     threshold: float = Query(20.0, description="Volatility threshold for alerts"),
     region: str = Query("all", description="Region filter"),
-    alert_type: str = Query("all", description="Alert type: high_volatility, price_spike, seasonal_risk")
+    alert_type: str = Query("all", description="Alert type: high_volatility, price_spike, seasonal_risk"),
+    enhanced_service: DataService = Depends(get_data_service)
 ):
     """
     Get volatility alerts and warnings
@@ -422,7 +425,8 @@ async def forecast_seasonal_volatility(
     commodity: str,
     region: str = "all",
     forecast_months: int = 6,
-    include_events: bool = True
+    include_events: bool = True,
+    enhanced_service: DataService = Depends(get_data_service)
 ):
     """
     Forecast seasonal volatility for upcoming months
@@ -442,18 +446,15 @@ async def forecast_seasonal_volatility(
                     detail=f"Commodity '{commodity}' not found"
                 )
         
-        # Get historical data
-        data = enhanced_service.data_processor.get_commodity_data(commodity, region)
+        # Get seasonal analysis (lookup tabel seasonal versi dataset aktif)
+        seasonal_analysis = enhanced_service.get_seasonal_volatility(commodity, region)
         
-        if data.empty:
+        if 'data_points' not in seasonal_analysis:
             raise HTTPException(
                 status_code=404,
                 detail=f"No data found for commodity: {commodity} in region: {region}"
             )
         
-        # Get seasonal analysis
-        seasonal_analysis = enhanced_service.analyze_seasonal_volatility(data)
-        
         if not seasonal_analysis.get('available', False):
             raise HTTPException(
                 status_code=422,
@@ -477,7 +478,7 @@ async def forecast_seasonal_volatility(
                     "region": region,
                     "forecast_months": forecast_months,
                     "includes_events": include_events,
-                    "base_analysis_period": f"{data['tanggal'].min()} to {data['tanggal'].max()}" if 'tanggal' in data.columns else "unknown",
+                    "base_analysis_period": f"{seasonal_analysis['date_range']['start']} to {seasonal_analysis['date_range']['end']}",
                     "data_source": "DataService"
                 }
             }
@@ -492,6 +493,91 @@ async def forecast_seasonal_volatility(
             detail=f"Internal server error: {str(e)}"
         )
 
+@router.post("/ingest")
+async def ingest_daily_prices(
+    request: PriceIngestRequest,
+    enhanced_service: DataService = Depends(get_data_service)
+):
+    """
+    Append harga harian baru untuk satu commodity-region series.
+    Hanya tail series yang dihitung ulang (lag, rolling, change, scaler).
+    
+    Butuh storage_backend "sqlite": baris disimpan di database dan terlihat
+    oleh semua worker. Di backend "memory" endpoint mengembalikan 409
+    (baris hanya ada di satu worker dan hilang saat reload), kecuali
+    memory_ingest_enabled diaktifkan.
+    """
+    if not enhanced_service.ingest_supported:
+        raise HTTPException(
+            status_code=409,
+            detail="Ingest requires storage_backend 'sqlite'; in-memory ingested rows "
+                   "are not persisted and are lost on dataset reload"
+        )
+    
+    try:
+        logger.info(f"Ingesting {len(request.records)} records for {request.commodity} - {request.region}")
+        
+        result = enhanced_service.ingest_daily_prices(
+            commodity=request.commodity,
+            region=request.region,
+            records=[record.model_dump() for record in request.records]
+        )
+        
+        if not result.get('success', False):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ingestion failed: {result.get('error', 'Unknown error')}"
+            )
+        
+        return JSONResponse(status_code=200, content=result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error ingesting daily prices: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.post("/reload")
+async def reload_dataset(
+    background_tasks: BackgroundTasks,
+    force: bool = Query(False, description="Reload walaupun fingerprint dataset tidak berubah"),
+    wait: bool = Query(False, description="Tunggu sampai reload selesai"),
+    enhanced_service: DataService = Depends(get_data_service)
+):
+    """
+    Hot reload dataset tanpa restart worker.
+    Snapshot baru dibangun di background lalu di-swap secara atomik.
+    """
+    try:
+        logger.info(f"Dataset reload requested (force={force}, wait={wait})")
+        
+        if wait:
+            result = await run_in_threadpool(enhanced_service.reload_data, force)
+            status_code = 200 if result.get('success', False) else 409
+            return JSONResponse(status_code=status_code, content=result)
+        
+        background_tasks.add_task(enhanced_service.reload_data, force)
+        
+        return JSONResponse(
+            status_code=202,
+            content={
+                "success": True,
+                "status": "reload_scheduled",
+                "data_version": enhanced_service.data_version,
+                "last_reload": enhanced_service.last_reload
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error scheduling dataset reload: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
 def _generate_volatility_forecast(seasonal_analysis, forecast_months, include_events):
     """Generate volatility forecast based on seasonal patterns"""
     
@@ -660,4 +746,112 @@ def _generate_forecast_recommendations(monthly_forecast, risk_periods):
             f"({highest_vol_month['adjusted_volatility']:.1f}%)"
         )
     
-    return recommendations
\ No newline at end of file
+    return recommendations
+
+
+@router.get("/export")
+async def export_data(
+    format: str = Query("csv", description="Export format: csv, ndjson, parquet atau arrow"),
+    commodity: Optional[str] = Query(None, description="Commodity filter"),
+    region: Optional[str] = Query(None, description="Region filter"),
+    komoditas: Optional[str] = Query(None, description="Alias commodity (parameter /historical)"),
+    wilayah: Optional[str] = Query(None, description="Alias region (parameter /historical)"),
+    start_date: Optional[date] = Query(None, description="Start date filter"),
+    end_date: Optional[date] = Query(None, description="End date filter"),
+    include_features: bool = Query(False, description="Sertakan engineered features"),
+    enhanced_service: DataService = Depends(get_data_service)
+):
+    """
+    Streaming bulk export data historis (filter sama dengan /historical).
+    Data ditulis chunk per chunk sehingga export jutaan baris tidak
+    di-materialize sekaligus di memory.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format '{format}'. Use one of: {list(EXPORT_FORMATS.keys())}"
+        )
+    
+    if not enhanced_service.data_loaded:
+        raise HTTPException(status_code=503, detail="Data not loaded")
+    
+    try:
+        if format == 'parquet':
+            ensure_parquet_support()
+        elif format == 'arrow':
+            ensure_arrow_support()
+    except ExportDependencyError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    logger.info(f"Export requested: format={format}, commodity={commodity or komoditas}, "
+                f"region={region or wilayah}, include_features={include_features}")
+    
+    chunks = enhanced_service.iter_export_chunks(
+        commodity=commodity or komoditas,
+        region=region or wilayah,
+        start_date=start_date,
+        end_date=end_date,
+        include_features=include_features,
+        chunk_size=settings.export_chunk_size
+    )
+    
+    return StreamingResponse(
+        stream_export(chunks, format),
+        media_type=EXPORT_FORMATS[format][0],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(format)}"'}
+    )
+
+@router.get("/matrix")
+async def get_price_matrix(
+    commodities: List[str] = Query(..., description="List of commodities"),
+    regions: Optional[List[str]] = Query(None, description="List of regions (kosong atau 'all' = semua region)"),
+    start_date: Optional[date] = Query(None, description="Start date filter"),
+    end_date: Optional[date] = Query(None, description="End date filter"),
+    forward_fill: bool = Query(False, description="Isi tanggal kosong dengan harga terakhir series"),
+    format: str = Query("json", pattern="^(json|arrow)$", description="Output format: json atau arrow"),
+    enhanced_service: DataService = Depends(get_data_service)
+):
+    """
+    Matrix harga tanggal x series (komoditas, wilayah) yang sudah di-align,
+    untuk dashboard dan perbandingan region dalam satu request.
+    format=arrow mengembalikan tabel wide (tanggal + satu kolom per series)
+    sebagai Arrow IPC stream; metadata ada di schema metadata key 'pangan_ai'.
+    """
+    if not enhanced_service.data_loaded:
+        raise HTTPException(status_code=503, detail="Data not loaded")
+    
+    if format == "arrow":
+        try:
+            ensure_arrow_support()
+        except ExportDependencyError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    
+    try:
+        matrix, metadata = enhanced_service.get_price_matrix(
+            commodities=commodities,
+            regions=regions,
+            start_date=start_date,
+            end_date=end_date,
+            forward_fill=forward_fill,
+            max_series=settings.matrix_max_series
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Price matrix: {len(metadata['series'])} series x {len(matrix)} dates")
+    
+    if format == "arrow":
+        body = frame_to_arrow_ipc(matrix, metadata={"success": True, "metadata": metadata})
+        return Response(content=body, media_type=ARROW_MEDIA_TYPE)
+    
+    return {
+        "success": True,
+        "data": enhanced_service.build_matrix_payload(matrix, metadata),
+        "metadata": {
+            "not_found": metadata['not_found'],
+            "date_range": metadata['date_range'],
+            "forward_fill": metadata['forward_fill'],
+            "filled_values": metadata['filled_values'],
+            "total_series": len(metadata['series'])
+        }
+    }
@@ -1,16 +1,19 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
 from services.prediction_service import PredictionService
+from services.container import get_prediction_service
 from utils.validators import PredictionRequest
+from utils.exporters import ARROW_MEDIA_TYPE, ExportDependencyError, ensure_arrow_support, frame_to_arrow_ipc
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize prediction service (singleton pattern)
-prediction_service = PredictionService()
-
 @router.post("/")
-async def generate_prediction(request: PredictionRequest):
+async def generate_prediction(
+    request: PredictionRequest,
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
     """
     Generate price prediction for specific commodity and region
     
@@ -39,15 +42,44 @@ async def generate_prediction(request: PredictionRequest):
 
 @router.get("/batch")
 async def batch_predict_all(
-    days_ahead: int = Query(7, ge=1, le=30, description="Number of days to predict")
+    days_ahead: int = Query(7, ge=1, le=30, description="Number of days to predict"),
+    format: str = Query("json", pattern="^(json|arrow)$", description="Response format: json atau arrow"),
+    prediction_service: PredictionService = Depends(get_prediction_service)
 ):
-    """Generate predictions for all available commodity-region pairs"""
+    """
+    Generate predictions for all available commodity-region pairs.
+    format=arrow mengembalikan tabel long (satu baris per hari prediksi)
+    sebagai Arrow IPC stream; summary dan statistik ada di schema metadata.
+    """
+    if format == "arrow":
+        try:
+            ensure_arrow_support()
+        except ExportDependencyError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    
     try:
         result = prediction_service.batch_predict_all_commodities(days_ahead)
         
         if not result.get('success', False):
             raise HTTPException(status_code=500, detail=result.get('error', 'Batch prediction failed'))
         
+        if format == "arrow":
+            failed = {
+                f"{commodity} - {region}": item.get('error')
+                for commodity, regions in result['batch_results'].items()
+                for region, item in regions.items() if not item.get('success', False)
+            }
+            body = frame_to_arrow_ipc(
+                prediction_service.batch_predictions_frame(result),
+                metadata={
+                    'batch_summary': result.get('batch_summary'),
+                    'statistics': result.get('statistics'),
+                    'failed': failed,
+                    'generated_at': result.get('generated_at')
+                }
+            )
+            return Response(content=body, media_type=ARROW_MEDIA_TYPE)
+        
         return result
         
     except HTTPException:
@@ -57,7 +89,9 @@ async def batch_predict_all(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/health")
-async def prediction_health_check():
+async def prediction_health_check(
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
     """Health check for prediction service and model status"""
     try:
         health = prediction_service.get_prediction_health_check()
@@ -81,7 +115,8 @@ async def prediction_health_check():
 async def quick_prediction(
     commodity: str,
     region: str,
-    days_ahead: int = Query(7, ge=1, le=30, description="Number of days to predict")
+    days_ahead: int = Query(7, ge=1, le=30, description="Number of days to predict"),
+    prediction_service: PredictionService = Depends(get_prediction_service)
 ):
     """Quick prediction endpoint for specific commodity-region pair"""
     try:
@@ -123,7 +158,9 @@ async def quick_prediction(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/model-info")
-async def get_model_info():
+async def get_model_info(
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
     """Get information about the loaded LSTM model"""
     try:
         model_info = prediction_service.lstm_predictor.get_model_info()
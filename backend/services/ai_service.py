@@ -1,5 +1,5 @@
-import openai
 import json
+import threading
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime
@@ -14,9 +14,12 @@ class AIService:
     """
     
     def __init__(self):
-        self.openai_client = None
-        self.anthropic_client = None
-        self._setup_ai_clients()
+        # Provider SDK (openai/anthropic) baru di-import saat client pertama
+        # kali dipakai, bukan saat service dibuat
+        self._openai_client = None
+        self._anthropic_client = None
+        self._clients_ready = False
+        self._clients_lock = threading.Lock()
         
         # Enhanced AI prompt templates untuk natural generation
         self.insights_template = """Anda adalah ekonom senior ahli pangan Indonesia yang memberikan analisis untuk Kantor Staf Presiden.
@@ -98,13 +101,34 @@ PERTANYAAN USER: {user_message}
 
 Jawab dalam maksimal 100 kata dengan fokus pada value dan insight praktis."""
 
+    @property
+    def openai_client(self):
+        """OpenAI client (lazy)"""
+        self._ensure_ai_clients()
+        return self._openai_client
+    
+    @property
+    def anthropic_client(self):
+        """Anthropic client (lazy)"""
+        self._ensure_ai_clients()
+        return self._anthropic_client
+    
+    def _ensure_ai_clients(self):
+        """Setup AI clients sekali, pada pemakaian pertama"""
+        if self._clients_ready:
+            return
+        with self._clients_lock:
+            if not self._clients_ready:
+                self._setup_ai_clients()
+                self._clients_ready = True
+    
     def _setup_ai_clients(self):
         """Setup AI clients dengan proper version handling"""
         try:
             # Setup OpenAI client (v1.0+ compatible)
             if settings.openai_api_key:
                 import openai
-                self.openai_client = openai.OpenAI(
+                self._openai_client = openai.OpenAI(
                     api_key=settings.openai_api_key,
                     timeout=30.0
                 )
@@ -121,7 +145,7 @@ Jawab dalam maksimal 100 kata dengan fokus pada value dan insight praktis."""
         try:
             if hasattr(settings, 'anthropic_api_key') and settings.anthropic_api_key:
                 import anthropic
-                self.anthropic_client = anthropic.Anthropic(
+                self._anthropic_client = anthropic.Anthropic(
                     api_key=settings.anthropic_api_key
                 )
                 logger.info("✅ Anthropic client initialized")
@@ -0,0 +1,196 @@
+# backend/services/container.py - Shared service instances per worker
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Process-wide container untuk service PANGAN-AI.
+    Dataset dan LSTM model di-load tepat sekali per worker, lalu di-share oleh
+    semua router (via FastAPI dependency) dan fallback endpoints di app.py
+    """
+
+    SERVICE_NAMES = ('data_service', 'ai_service', 'prediction_service')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._services: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self.load_timings: Dict[str, float] = {}
+        self.import_timings: Dict[str, float] = {}
+        self.warmup_state = 'pending'
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    @property
+    def data_service(self):
+        return self._get_or_create('data_service', self._create_data_service)
+
+    @property
+    def ai_service(self):
+        return self._get_or_create('ai_service', self._create_ai_service)
+
+    @property
+    def prediction_service(self):
+        return self._get_or_create('prediction_service', self._create_prediction_service)
+
+    def _create_data_service(self):
+        module = self._timed_import('services.data_service')
+        return module.DataService()
+
+    def _create_ai_service(self):
+        module = self._timed_import('services.ai_service')
+        return module.AIService()
+
+    def _create_prediction_service(self):
+        module = self._timed_import('services.prediction_service')
+        try:
+            # TensorFlow sendiri di-import lazily oleh LSTMPredictor; import di
+            # sini hanya supaya biayanya tercatat terpisah di breakdown
+            self._timed_import('tensorflow')
+        except ImportError as e:
+            logger.warning(f"⚠️ TensorFlow not available, predictions will use mock mode: {str(e)}")
+        return module.PredictionService(data_service=self.data_service, ai_service=self.ai_service)
+
+    def _timed_import(self, module_name: str):
+        """Import module dan catat waktunya (hanya import pertama yang berbiaya)"""
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        if module_name not in self.import_timings:
+            self.import_timings[module_name] = round(time.perf_counter() - start, 3)
+        return module
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Lazy initialisation dengan double-checked locking"""
+        service = self._services.get(name)
+        if service is not None:
+            return service
+
+        with self._lock:
+            service = self._services.get(name)
+            if service is None:
+                start = time.perf_counter()
+                try:
+                    service = factory()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+
+                self.load_timings[name] = round(time.perf_counter() - start, 3)
+                self._services[name] = service
+                self._errors.pop(name, None)
+                logger.info(f"⏱️ {name} initialized in {self.load_timings[name]:.2f}s")
+
+        return service
+
+    def try_get(self, name: str) -> Optional[Any]:
+        """Get service by name; None jika inisialisasi gagal (fallback mode)"""
+        if name in self._errors:
+            return None
+        try:
+            return getattr(self, name)
+        except Exception as e:
+            logger.error(f"⚠️ {name} initialization failed: {str(e)}")
+            return None
+
+    def is_loaded(self, name: str) -> bool:
+        """Check apakah service sudah diinisialisasi (tanpa memicu loading)"""
+        return name in self._services
+
+    def startup(self, background_warmup: bool = False):
+        """
+        Load service saat aplikasi start dan report timings.
+        Dengan background_warmup, hanya DataService yang di-load sinkron;
+        AI SDK dan TensorFlow di-load di thread terpisah sehingga endpoint
+        data (dan /health) langsung bisa melayani request.
+        """
+        start = time.perf_counter()
+        data_service = self.try_get('data_service')
+        logger.info(f"⏱️ Data service ready in {time.perf_counter() - start:.2f}s")
+
+        if data_service is not None:
+            data_service.start_dataset_watcher(settings.dataset_watch_interval)
+
+        if background_warmup:
+            self._warmup_thread = threading.Thread(
+                target=self._warmup, name="service-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+        else:
+            self._warmup()
+
+    def _warmup(self):
+        """Load AI dan prediction service (termasuk provider SDK dan TensorFlow)"""
+        self.warmup_state = 'running'
+        start = time.perf_counter()
+
+        ai_service = self.try_get('ai_service')
+        if ai_service is not None:
+            # Trigger import provider SDK sekarang, bukan di request pertama
+            sdk_start = time.perf_counter()
+            ai_service._ensure_ai_clients()
+            self.import_timings['ai_provider_sdks'] = round(time.perf_counter() - sdk_start, 3)
+        self.try_get('prediction_service')
+
+        self.warmup_state = 'done'
+        self.log_timings(time.perf_counter() - start)
+
+    def log_timings(self, warmup_seconds: Optional[float] = None):
+        """Log import-time breakdown dan service load timings"""
+        imports = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in self.import_timings.items())
+        timings = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in self.load_timings.items())
+        logger.info(f"📦 Import breakdown: {imports}")
+        if warmup_seconds is not None:
+            logger.info(f"⏱️ Service warm-up completed in {warmup_seconds:.2f}s ({timings})")
+
+        if self._errors:
+            logger.warning(f"⚠️ Services unavailable: {list(self._errors.keys())}")
+
+    def shutdown(self):
+        """Release service instances"""
+        data_service = self._services.get('data_service')
+        if data_service is not None:
+            data_service.stop_dataset_watcher()
+
+        with self._lock:
+            self._services.clear()
+            self._errors.clear()
+            self.load_timings.clear()
+            self.warmup_state = 'pending'
+        logger.info("🧹 Service container cleared")
+
+    def get_status(self) -> Dict:
+        """Status ringkas untuk health check"""
+        return {
+            'loaded': [name for name in self.SERVICE_NAMES if name in self._services],
+            'failed': dict(self._errors),
+            'warmup_state': self.warmup_state,
+            'load_timings': dict(self.load_timings),
+            'import_timings': dict(self.import_timings)
+        }
+
+
+# Global container instance (satu per worker process)
+container = ServiceContainer()
+
+
+# FastAPI dependencies
+def get_data_service():
+    data_service = container.data_service
+    # Ambil append dari worker lain (backend SQLite) sebelum request diproses
+    data_service.sync_revision()
+    return data_service
+
+
+def get_ai_service():
+    return container.ai_service
+
+
+def get_prediction_service():
+    return container.prediction_service
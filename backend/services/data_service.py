@@ -1,8 +1,13 @@
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, date
+import base64
+import json
 import logging
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Fix import path untuk DataProcessor
@@ -10,6 +15,13 @@ current_dir = Path(__file__).parent.parent  # backend directory
 sys.path.insert(0, str(current_dir))
 
 from data.models.data_processor import DataProcessor
+from data.models.feature_store import FeatureStore
+from data.models.downsampling import downsample, resolution_summary
+from data.models.series_statistics import (
+    ALL_REGIONS, EVENT_COLUMNS, WEATHER_COLUMNS,
+    compute_enhanced_statistics, compute_seasonal_volatility, compute_series_summary,
+    window_price_changes
+)
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -20,21 +32,257 @@ class DataService:
     Provides business logic untuk historical data retrieval dan analysis
     """
     
+    # Kolom export default (tanpa engineered features)
+    EXPORT_COLUMNS = [
+        'tanggal', 'komoditas', 'wilayah', 'kabupaten', 'level_harga', 'harga',
+        'tavg_final', 'rh_avg_final', 'ff_avg_final', 'rr',
+        'dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr'
+    ]
+    
+    # Field response /api/data/historical (parameter `fields=`) -> kolom dataset
+    HISTORICAL_FIELDS = {
+        'tanggal': ['tanggal'],
+        'komoditas': ['komoditas'],
+        'wilayah': ['wilayah'],
+        'level_harga': [],
+        'harga': ['harga'],
+        'cuaca': ['tavg_final', 'rh_avg_final', 'rr', 'ff_avg_final'],
+        'events': ['dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr'],
+        'ohlc': []
+    }
+    
+    # Kolom yang selalu diambil (sorting, cursor, downsampling dan metadata)
+    KEY_COLUMNS = ['tanggal', 'komoditas', 'wilayah', 'harga']
+    
+    # Selisih hari antar observasi berurutan yang dihitung sebagai gap data
+    GAP_THRESHOLD_DAYS = 7
+    
+    # Tabel statistik per series: name -> builder(frame harga terurut).
+    # Semua tabel dibangun dari satu query harga per versi dataset.
+    STATISTICS_TABLES = {
+        'enhanced_statistics': compute_enhanced_statistics,
+        'seasonal_volatility': compute_seasonal_volatility,
+        'series_summary': compute_series_summary
+    }
+    STATISTICS_COLUMNS = KEY_COLUMNS + list(EVENT_COLUMNS.values()) + WEATHER_COLUMNS
+    
+    # Label events per kombinasi flag (bit 0 ramadan, 1 idul fitri, 2 natal/tahun baru)
+    EVENT_COMBINATIONS = [
+        tuple(name for bit, name in enumerate(["ramadan", "idul_fitri", "natal_tahun_baru"]) if code >> bit & 1)
+        or ("normal",)
+        for code in range(8)
+    ]
+    
     def __init__(self):
-        self.data_processor = DataProcessor(settings.dataset_path)
+        # Snapshot aktif. Hot reload membangun DataProcessor baru lalu
+        # mengganti reference ini dalam satu assignment (atomik).
+        self.data_processor = self._create_data_processor()
         self.data_loaded = False
+        self.last_reload: Dict = {}
+        self._reload_lock = threading.Lock()
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        # Tabel statistik turunan untuk satu versi dataset: (data_version, {name: table})
+        self._statistics: Optional[Tuple[str, Dict[str, Dict]]] = None
+        self._statistics_lock = threading.Lock()
         self._initialize_data()
     
+    def _create_data_processor(self) -> DataProcessor:
+        """Create DataProcessor sesuai konfigurasi settings"""
+        return DataProcessor(
+            settings.dataset_path,
+            cache_dir=settings.feature_cache_path if settings.feature_cache_enabled else None,
+            compact_schema=settings.compact_schema,
+            sqlite_path=settings.sqlite_path if settings.storage_backend == 'sqlite' else None
+        )
+    
+    def _attach_feature_store(self, processor: DataProcessor):
+        """Attach memory-mapped feature store; rebuild jika data_version berbeda"""
+        if not settings.feature_store_enabled:
+            return
+        
+        try:
+            store = FeatureStore(settings.feature_store_path)
+            if not store.open() or store.data_version != processor.data_version:
+                logger.info(f"📦 Feature store missing or stale, building for {processor.data_version}")
+                store = FeatureStore.build(processor, settings.feature_store_path)
+            processor.feature_store = store
+        except Exception as e:
+            # Store hanya akselerasi; get_latest_sequence tetap jalan tanpa store
+            logger.warning(f"⚠️ Feature store unavailable: {str(e)}")
+    
     def _initialize_data(self):
         """Initialize data processor dengan loading dataset"""
         try:
             self.data_processor.load_data()
+            self._attach_feature_store(self.data_processor)
+            self._set_statistics(self.data_processor, self._build_statistics(self.data_processor))
             self.data_loaded = True
             logger.info("✅ DataService initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize DataService: {str(e)}")
             self.data_loaded = False
     
+    @property
+    def data_version(self) -> Optional[str]:
+        """Versi snapshot data aktif (untuk cache key), sudah di-sync dengan revisi SQLite"""
+        return self.sync_revision().data_version if self.data_loaded else None
+    
+    def sync_revision(self) -> DataProcessor:
+        """
+        Backend SQLite: ingest di worker lain menaikkan revisi di meta table.
+        Jika revisi berbeda dari snapshot aktif, snapshot baru dibangun dan
+        tabel statistik di-refresh hanya untuk komoditas yang berubah sejak
+        revisi snapshot, lalu di-swap seperti reload_data. Dipanggil per
+        request dari threadpool (response cache, get_data_service); tanpa
+        perubahan biayanya satu query kecil ke meta table.
+        """
+        processor = self.data_processor
+        if not self.data_loaded or processor.sql_store is None:
+            return processor
+        
+        revision = processor.stored_revision()
+        if revision is None or revision == processor.revision:
+            return processor
+        
+        # Reload/ingest sedang berjalan di worker ini: sync di request berikutnya
+        if not self._reload_lock.acquire(blocking=False):
+            return processor
+        
+        try:
+            if self.data_processor is processor:
+                new_processor = processor.with_revision(revision)
+                statistics = self._refreshed_statistics(
+                    new_processor, new_processor.changed_commodities(processor.revision),
+                    processor.data_version
+                )
+                
+                self.data_processor = new_processor
+                with self._statistics_lock:
+                    self._set_statistics(new_processor, statistics)
+                logger.info(f"🔄 Synced SQLite revision: {processor.data_version} -> {new_processor.data_version}")
+            return self.data_processor
+        except Exception as e:
+            logger.warning(f"⚠️ SQLite revision sync failed: {str(e)}")
+            return self.data_processor
+        finally:
+            self._reload_lock.release()
+    
+    def reload_data(self, force: bool = False) -> Dict:
+        """
+        Hot reload dataset: processed frame, series index dan scaler dibangun
+        di DataProcessor baru, lalu snapshot di-swap secara atomik. Request
+        yang sedang berjalan tetap memakai snapshot lama sampai selesai.
+        Backend SQLite: baris hasil ingest tetap ada selama CSV tidak berubah;
+        CSV baru membangun ulang database. Backend memory (hanya dengan
+        memory_ingest_enabled): baris yang belum masuk CSV ikut terbuang.
+        """
+        
+        if not self._reload_lock.acquire(blocking=False):
+            return {'success': False, 'error': 'Reload already in progress'}
+        
+        try:
+            current = self.data_processor
+            previous_version = self.data_version
+            
+            if not force and self.data_loaded and current.fingerprint == current._dataset_fingerprint():
+                return {
+                    'success': True,
+                    'reloaded': False,
+                    'message': 'Dataset unchanged',
+                    'data_version': previous_version
+                }
+            
+            start = time.perf_counter()
+            new_processor = self._create_data_processor()
+            new_processor.load_data()
+            self._attach_feature_store(new_processor)
+            statistics = self._build_statistics(new_processor)
+            
+            # Atomic swap: satu assignment reference
+            self.data_processor = new_processor
+            with self._statistics_lock:
+                self._set_statistics(new_processor, statistics)
+            self.data_loaded = True
+            
+            self.last_reload = {
+                'success': True,
+                'reloaded': True,
+                'previous_version': previous_version,
+                'data_version': new_processor.data_version,
+                'rows': new_processor.row_count,
+                'duration_seconds': round(time.perf_counter() - start, 3),
+                'reloaded_at': datetime.now().isoformat()
+            }
+            logger.info(f"🔄 Dataset reloaded: {previous_version} -> {new_processor.data_version} "
+                        f"in {self.last_reload['duration_seconds']:.2f}s")
+            return self.last_reload
+            
+        except Exception as e:
+            # Snapshot lama tetap dipakai jika reload gagal
+            logger.error(f"❌ Dataset reload failed: {str(e)}")
+            self.last_reload = {
+                'success': False,
+                'error': str(e),
+                'data_version': self.data_version,
+                'reloaded_at': datetime.now().isoformat()
+            }
+            return self.last_reload
+        
+        finally:
+            self._reload_lock.release()
+    
+    def start_dataset_watcher(self, interval_seconds: int):
+        """Poll file dataset dan reload otomatis jika berubah"""
+        if interval_seconds <= 0 or self._watcher_thread is not None:
+            return
+        
+        self._watcher_stop.clear()
+        self._watcher_thread = threading.Thread(
+            target=self._watch_dataset, args=(interval_seconds,),
+            name="dataset-watcher", daemon=True
+        )
+        self._watcher_thread.start()
+        logger.info(f"👀 Watching {settings.dataset_path} every {interval_seconds}s")
+    
+    def stop_dataset_watcher(self):
+        """Stop dataset watcher thread"""
+        if self._watcher_thread is None:
+            return
+        self._watcher_stop.set()
+        self._watcher_thread.join(timeout=5)
+        self._watcher_thread = None
+    
+    def _watch_dataset(self, interval_seconds: int):
+        """Loop watcher: reload setelah size/mtime berubah dan stabil satu interval"""
+        dataset_path = Path(settings.dataset_path)
+        
+        def file_state():
+            try:
+                stat = dataset_path.stat()
+                return (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                return None
+        
+        last_state = file_state()
+        pending_state = None
+        
+        while not self._watcher_stop.wait(interval_seconds):
+            state = file_state()
+            if state is None or state == last_state:
+                pending_state = None
+                continue
+            
+            # Tunggu file selesai ditulis (state sama di dua poll berturut-turut)
+            if state != pending_state:
+                pending_state = state
+                continue
+            
+            result = self.reload_data()
+            if result.get('success', False):
+                last_state = state
+                pending_state = None
+    
     def get_available_commodities(self) -> List[str]:
         """Get list of available commodities"""
         if not self.data_loaded:
@@ -47,6 +295,73 @@ class DataService:
             return []
         return self.data_processor.regions
     
+    @property
+    def ingest_supported(self) -> bool:
+        """
+        Ingest hanya persist dengan backend SQLite. Backend memory menyimpan
+        baris baru di satu worker saja dan hilang saat reload, sehingga
+        hanya diizinkan lewat settings.memory_ingest_enabled.
+        """
+        return settings.storage_backend == 'sqlite' or settings.memory_ingest_enabled
+    
+    def ingest_daily_prices(self, commodity: str, region: str, records: List[Dict]) -> Dict:
+        """
+        Append harga harian baru untuk satu commodity-region series.
+        Fitur dan scaler hanya di-update untuk tail series tersebut,
+        tanpa full reprocess dataset. Hasil append dibangun di snapshot
+        DataProcessor baru lalu di-swap seperti reload_data; ingest dan
+        reload diserialisasi lewat _reload_lock.
+        """
+        
+        if not self.ingest_supported:
+            return {
+                'success': False,
+                'error': "Ingest requires storage_backend 'sqlite' (memory backend does not persist rows)"
+            }
+        
+        if not self.data_loaded:
+            return {'success': False, 'error': 'Data not loaded'}
+        
+        if not records:
+            return {'success': False, 'error': 'No records provided'}
+        
+        try:
+            # Field cuaca opsional (None) membuat kolom object dtype; paksa
+            # numerik supaya imputasi dan insert ke SQLite tetap float
+            rows = pd.DataFrame(records)
+            for col in WEATHER_COLUMNS:
+                if col in rows.columns:
+                    rows[col] = pd.to_numeric(rows[col], errors='coerce').astype('float64')
+            
+            with self._reload_lock:
+                current = self.data_processor
+                previous_version = current.data_version
+                new_processor, result = current.with_appended_rows(commodity, region, rows)
+                
+                if new_processor is not current:
+                    # Revisi bisa melompat jika worker lain ikut ingest:
+                    # refresh semua komoditas yang berubah sejak snapshot lama
+                    statistics = self._refreshed_statistics(
+                        new_processor, new_processor.changed_commodities(current.revision),
+                        previous_version
+                    )
+                    
+                    # Atomic swap: frame, series index dan scaler baru sekaligus
+                    self.data_processor = new_processor
+                    with self._statistics_lock:
+                        self._set_statistics(new_processor, statistics)
+            
+            return {
+                'success': True,
+                'commodity': commodity,
+                'region': region,
+                **result
+            }
+            
+        except Exception as e:
+            logger.error(f"Error ingesting daily prices: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
     def get_historical_data(self, 
                            commodity: Optional[str] = None,
                            region: Optional[str] = None,
@@ -76,67 +391,17 @@ class DataService:
             }
         
         try:
-            # Start dengan semua data
-            data = self.data_processor.data.copy()
-            
-            # Apply filters
-            if commodity and commodity != 'all':
-                data = data[data['komoditas'] == commodity]
-            
-            if region and region != 'all':
-                data = data[data['wilayah'] == region]
-            
-            if start_date:
-                data = data[data['tanggal'] >= pd.to_datetime(start_date)]
-            
-            if end_date:
-                data = data[data['tanggal'] <= pd.to_datetime(end_date)]
-            
-            # Sort by date
-            data = data.sort_values('tanggal')
-            
-            # Apply limit
-            if len(data) > limit:
-                data = data.tail(limit)
-            
-            # Prepare response data
-            records = []
-            for _, row in data.iterrows():
-                records.append({
-                    'tanggal': row['tanggal'].strftime('%Y-%m-%d'),
-                    'komoditas': row['komoditas'],
-                    'wilayah': row['wilayah'],
-                    'harga': float(row['harga']),
-                    'tavg': float(row.get('tavg_final', 0)),
-                    'rh_avg': float(row.get('rh_avg_final', 0)),
-                    'ff_avg': float(row.get('ff_avg_final', 0)),
-                    'curah_hujan': float(row.get('rr', 0)),
-                    'ramadan': bool(row.get('dum_ramadan', 0)),
-                    'idul_fitri': bool(row.get('dum_idulfitri', 0)),
-                    'natal_newyear': bool(row.get('dum_natal_newyr', 0))
-                })
-            
-            # Calculate metadata
-            metadata = {
-                'total_records': len(records),
-                'filtered_records': len(data),
-                'date_range': {
-                    'start': data['tanggal'].min().strftime('%Y-%m-%d') if len(data) > 0 else None,
-                    'end': data['tanggal'].max().strftime('%Y-%m-%d') if len(data) > 0 else None
-                },
-                'commodities': data['komoditas'].unique().tolist() if len(data) > 0 else [],
-                'regions': data['wilayah'].unique().tolist() if len(data) > 0 else [],
-                'price_stats': {
-                    'min': float(data['harga'].min()) if len(data) > 0 else 0,
-                    'max': float(data['harga'].max()) if len(data) > 0 else 0,
-                    'avg': float(data['harga'].mean()) if len(data) > 0 else 0,
-                    'current': float(data['harga'].iloc[-1]) if len(data) > 0 else 0
-                }
-            }
+            data, metadata = self.get_historical_frame(
+                commodity=commodity,
+                region=region,
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit
+            )
             
             return {
                 'success': True,
-                'data': records,
+                'data': self._build_records(data),
                 'metadata': metadata
             }
             
@@ -149,146 +414,674 @@ class DataService:
                 'metadata': {}
             }
     
-    def get_commodity_statistics(self, commodity: str, region: Optional[str] = None) -> Dict:
-        """Get detailed statistics untuk specific commodity"""
+    def get_historical_frame(self,
+                             commodity: Optional[str] = None,
+                             region: Optional[str] = None,
+                             start_date: Optional[date] = None,
+                             end_date: Optional[date] = None,
+                             limit: int = 1000,
+                             resolution: str = 'raw',
+                             points: int = 500,
+                             columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Filtered historical frame (terurut by tanggal) beserta metadata-nya.
+        Dengan resolution selain 'raw', seluruh range terfilter di-downsample
+        per series (agregat OHLC daily/weekly/monthly atau LTTB dengan target
+        `points` titik) dan limit tidak dipakai; metadata tetap dari data raw.
+        Dengan columns (lihat historical_columns) hanya kolom tersebut yang
+        diambil dari data layer.
+        """
         
-        if not self.data_loaded:
-            return {'success': False, 'error': 'Data not loaded'}
+        # Filter, projection, sort by date dan limit dieksekusi di data layer
+        data = self.data_processor.query_data(
+            commodity=commodity,
+            region=region,
+            start_date=start_date,
+            end_date=end_date,
+            columns=columns,
+            limit=limit if resolution == 'raw' else None
+        )
+        metadata = self._historical_metadata(data)
         
-        try:
-            stats = self.data_processor.get_statistics(commodity, region)
-            
-            # Enhanced statistics
-            data = self.data_processor.get_commodity_data(commodity, region)
-            
-            if len(data) == 0:
-                return {'success': False, 'error': 'No data found'}
+        if resolution != 'raw':
+            downsampled = downsample(data, resolution, points)
+            metadata['downsampling'] = resolution_summary(data, downsampled, resolution, points)
+            data = downsampled
+        
+        return data, metadata
+    
+    def get_historical_page(self,
+                            commodity: Optional[str] = None,
+                            region: Optional[str] = None,
+                            start_date: Optional[date] = None,
+                            end_date: Optional[date] = None,
+                            cursor: Optional[str] = None,
+                            page_size: int = 500,
+                            columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Keyset pagination terurut by (komoditas, wilayah, tanggal).
+        Cursor adalah (komoditas, wilayah, tanggal) baris terakhir page
+        sebelumnya; ValueError jika cursor tidak valid.
+        """
+        
+        after = self.decode_cursor(cursor) if cursor else None
+        
+        # Ambil satu baris ekstra untuk tahu apakah masih ada page berikutnya
+        data = self.data_processor.query_page(
+            commodity=commodity,
+            region=region,
+            start_date=start_date,
+            end_date=end_date,
+            after=after,
+            page_size=page_size + 1,
+            columns=columns
+        )
+        has_more = len(data) > page_size
+        data = data.iloc[:page_size]
+        
+        metadata = self._historical_metadata(data)
+        metadata['pagination'] = {
+            'page_size': page_size,
+            'cursor': cursor,
+            'next_cursor': self.encode_cursor(data.iloc[-1]) if has_more else None,
+            'has_more': has_more
+        }
+        
+        return data, metadata
+    
+    def iter_export_chunks(self,
+                           commodity: Optional[str] = None,
+                           region: Optional[str] = None,
+                           start_date: Optional[date] = None,
+                           end_date: Optional[date] = None,
+                           include_features: bool = False,
+                           chunk_size: int = 50000) -> Iterator[pd.DataFrame]:
+        """
+        Stream data terfilter per chunk, terurut by (komoditas, wilayah, tanggal).
+        Chunk diambil via keyset pagination dari satu snapshot, sehingga
+        hasil penuh tidak pernah di-materialize sekaligus. Selalu yield
+        minimal satu chunk (mungkin kosong) supaya header/schema tetap ada.
+        """
+        
+        processor = self.data_processor  # satu snapshot untuk seluruh export
+        columns = None if include_features else self.EXPORT_COLUMNS
+        after = None
+        first = True
+        
+        while True:
+            chunk = processor.query_page(
+                commodity=commodity,
+                region=region,
+                start_date=start_date,
+                end_date=end_date,
+                after=after,
+                page_size=chunk_size,
+                columns=columns
+            )
+            if first or len(chunk) > 0:
+                yield chunk
+            first = False
             
-            # Calculate additional metrics
-            data_30d = data.tail(30)  # Last 30 days
-            data_7d = data.tail(7)    # Last 7 days
+            if len(chunk) < chunk_size:
+                break
             
-            enhanced_stats = {
-                'success': True,
-                'basic_stats': stats,
-                'trend_analysis': {
-                    'last_7_days': {
-                        'avg_price': float(data_7d['harga'].mean()) if len(data_7d) > 0 else 0,
-                        'price_change': float(data_7d['harga'].iloc[-1] - data_7d['harga'].iloc[0]) if len(data_7d) > 1 else 0,
-                        'volatility': float(data_7d['harga'].std()) if len(data_7d) > 1 else 0
-                    },
-                    'last_30_days': {
-                        'avg_price': float(data_30d['harga'].mean()) if len(data_30d) > 0 else 0,
-                        'price_change': float(data_30d['harga'].iloc[-1] - data_30d['harga'].iloc[0]) if len(data_30d) > 1 else 0,
-                        'volatility': float(data_30d['harga'].std()) if len(data_30d) > 1 else 0
-                    }
-                },
-                'seasonal_patterns': self._analyze_seasonal_patterns(data),
-                'weather_correlation': self._analyze_weather_correlation(data)
+            last = chunk.iloc[-1]
+            after = (str(last['komoditas']), str(last['wilayah']), last['tanggal'])
+    
+    def get_price_matrix(self,
+                         commodities: List[str],
+                         regions: Optional[List[str]] = None,
+                         start_date: Optional[date] = None,
+                         end_date: Optional[date] = None,
+                         forward_fill: bool = False,
+                         max_series: Optional[int] = None) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Matrix harga tanggal x series untuk beberapa (komoditas, wilayah).
+        Baris = union tanggal yang punya data, kolom = series terurut by
+        (komoditas, wilayah); sel kosong NaN, atau nilai terakhir series
+        tersebut jika forward_fill. Matrix diisi dengan satu scatter numpy
+        (tanpa pivot per series). ValueError jika jumlah series melebihi
+        max_series.
+        """
+        processor = self.data_processor  # satu snapshot untuk seluruh query
+        catalog = [(commodity, region) for commodity, region, _ in processor.get_series_catalog()]
+        
+        # Matching case-insensitive; region kosong / 'all' = semua region
+        commodity_names = {commodity.lower(): commodity for commodity, _ in catalog}
+        region_names = {region.lower(): region for _, region in catalog}
+        wanted_commodities = {commodity_names[name.lower()] for name in commodities if name.lower() in commodity_names}
+        all_regions = not regions or any(region.lower() == 'all' for region in regions)
+        wanted_regions = set() if all_regions else {
+            region_names[name.lower()] for name in regions if name.lower() in region_names
+        }
+        
+        series = [
+            key for key in catalog
+            if key[0] in wanted_commodities and (all_regions or key[1] in wanted_regions)
+        ]
+        if max_series is not None and len(series) > max_series:
+            raise ValueError(f"Too many series requested ({len(series)}); maximum is {max_series}")
+        
+        data = processor.query_series(
+            series, start_date=start_date, end_date=end_date,
+            columns=['tanggal', 'komoditas', 'wilayah', 'harga']
+        )
+        
+        dates, date_codes = np.unique(data['tanggal'].to_numpy(dtype='datetime64[ns]'), return_inverse=True)
+        
+        # Baris terurut by (komoditas, wilayah, tanggal): kolom matrix per
+        # blok series cukup di-lookup sekali per blok
+        commodity_values = data['komoditas'].to_numpy(dtype=object)
+        region_values = data['wilayah'].to_numpy(dtype=object)
+        is_start = np.ones(len(data), dtype=bool)
+        is_start[1:] = (commodity_values[1:] != commodity_values[:-1]) | (region_values[1:] != region_values[:-1])
+        starts = np.flatnonzero(is_start)
+        column_of = {key: position for position, key in enumerate(series)}
+        series_codes = np.repeat(
+            np.array([column_of[(commodity_values[start], region_values[start])] for start in starts], dtype=np.int64),
+            np.diff(np.append(starts, len(data)))
+        )
+        
+        values = np.full((len(dates), len(series)), np.nan)
+        values[date_codes.reshape(-1), series_codes] = data['harga'].to_numpy(dtype=np.float64)
+        observed = ~np.isnan(values)
+        
+        if forward_fill and values.size:
+            # Posisi observasi terakhir per kolom, lalu gather sekali
+            last = np.where(observed, np.arange(len(dates))[:, None], 0)
+            np.maximum.accumulate(last, axis=0, out=last)
+            values = values[last, np.arange(len(series))]
+        
+        matrix = pd.DataFrame(values, columns=[self.series_label(key) for key in series])
+        matrix.insert(0, 'tanggal', pd.DatetimeIndex(dates))
+        
+        observations = observed.sum(axis=0)
+        metadata = {
+            'series': [
+                {
+                    'key': self.series_label(key),
+                    'komoditas': key[0],
+                    'wilayah': key[1],
+                    'observations': int(count)
+                }
+                for key, count in zip(series, observations.tolist())
+            ],
+            'not_found': {
+                'commodities': [name for name in commodities if name.lower() not in commodity_names],
+                'regions': [] if all_regions else [
+                    name for name in regions if name.lower() not in region_names
+                ]
+            },
+            'date_range': {
+                'start': pd.Timestamp(dates[0]).strftime('%Y-%m-%d') if len(dates) else None,
+                'end': pd.Timestamp(dates[-1]).strftime('%Y-%m-%d') if len(dates) else None,
+                'dates': len(dates)
+            },
+            'forward_fill': forward_fill,
+            'filled_values': int(np.count_nonzero(~np.isnan(values)) - observed.sum()) if forward_fill else 0
+        }
+        
+        return matrix, metadata
+    
+    @staticmethod
+    def series_label(key: Tuple[str, str]) -> str:
+        """Nama kolom series di matrix: 'Komoditas | Wilayah'"""
+        return f"{key[0]} | {key[1]}"
+    
+    def build_matrix_payload(self, matrix: pd.DataFrame, metadata: Dict) -> Dict:
+        """Payload JSON matrix: array tanggal + array nilai per series (NaN -> null)"""
+        values = matrix.drop(columns=['tanggal']).to_numpy(dtype=np.float64)
+        cells = values.astype(object)
+        cells[np.isnan(values)] = None
+        
+        return {
+            'dates': matrix['tanggal'].dt.strftime('%Y-%m-%d').tolist(),
+            'series': [
+                {**info, 'values': column}
+                for info, column in zip(metadata['series'], cells.T.tolist())
+            ]
+        }
+    
+    @staticmethod
+    def encode_cursor(row: pd.Series) -> str:
+        """Opaque cursor (base64 JSON) dari baris terakhir sebuah page"""
+        key = [str(row['komoditas']), str(row['wilayah']), row['tanggal'].strftime('%Y-%m-%d')]
+        return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str, pd.Timestamp]:
+        try:
+            commodity, region, tanggal = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return str(commodity), str(region), pd.Timestamp(tanggal)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
+    def parse_fields(self, fields: Optional[str]) -> Optional[List[str]]:
+        """
+        Parse parameter `fields` (comma-separated) menjadi list field
+        berurutan kanonik; None jika tidak diisi. ValueError untuk field
+        yang tidak dikenal.
+        """
+        if fields is None or not fields.strip():
+            return None
+        
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = sorted(requested - set(self.HISTORICAL_FIELDS))
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {unknown}. Available: {list(self.HISTORICAL_FIELDS)}"
+            )
+        return [name for name in self.HISTORICAL_FIELDS if name in requested]
+    
+    def default_fields(self, include_weather: bool = True, include_events: bool = True) -> List[str]:
+        """Field response ketika `fields` tidak diisi (perilaku lama)"""
+        excluded = set()
+        if not include_weather:
+            excluded.add('cuaca')
+        if not include_events:
+            excluded.add('events')
+        return [name for name in self.HISTORICAL_FIELDS if name not in excluded]
+    
+    def historical_columns(self, fields: List[str]) -> List[str]:
+        """Kolom dataset yang dibutuhkan untuk field response (plus kolom kunci)"""
+        columns = list(self.KEY_COLUMNS)
+        if 'level_harga' in fields:
+            # Output columnar membawa kolom level_harga dataset
+            columns.append('level_harga')
+        for name in fields:
+            columns.extend(self.HISTORICAL_FIELDS[name])
+        return list(dict.fromkeys(columns))
+    
+    def _historical_metadata(self, data: pd.DataFrame) -> Dict:
+        """Metadata response historical (date range, dimensi, statistik harga)"""
+        
+        has_data = len(data) > 0
+        metadata = {
+            'total_records': len(data),
+            'filtered_records': len(data),
+            'date_range': {
+                'start': data['tanggal'].min().strftime('%Y-%m-%d') if has_data else None,
+                'end': data['tanggal'].max().strftime('%Y-%m-%d') if has_data else None
+            },
+            'commodities': data['komoditas'].unique().tolist() if has_data else [],
+            'regions': data['wilayah'].unique().tolist() if has_data else [],
+            'price_stats': {
+                'min': float(data['harga'].min()) if has_data else 0,
+                'max': float(data['harga'].max()) if has_data else 0,
+                'avg': float(data['harga'].mean()) if has_data else 0,
+                'current': float(data['harga'].iloc[-1]) if has_data else 0
             }
+        }
+        
+        return metadata
+    
+    def build_columnar_frame(self, data: pd.DataFrame, include_weather: bool = True,
+                             include_events: bool = True,
+                             fields: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Subset kolom untuk output columnar (Arrow): kolom dataset apa adanya,
+        tanpa membangun record per baris
+        """
+        if fields is None:
+            fields = self.default_fields(include_weather, include_events)
+        
+        columns = [name for name in ['tanggal', 'komoditas', 'wilayah', 'level_harga', 'harga']
+                   if name in fields]
+        if 'cuaca' in fields:
+            columns += ['tavg_final', 'rh_avg_final', 'ff_avg_final', 'rr']
+        if 'events' in fields:
+            columns += ['dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr']
+        if 'ohlc' in fields:
+            # Kolom agregat OHLC (resolution daily/weekly/monthly)
+            columns += ['open', 'high', 'low', 'close', 'avg', 'count']
+        
+        return data[[col for col in columns if col in data.columns]]
+    
+    @staticmethod
+    def _float_column(data: pd.DataFrame, column: str, default: float = 0.0) -> List[float]:
+        if column not in data.columns:
+            return [float(default)] * len(data)
+        return data[column].astype(float).tolist()
+    
+    @staticmethod
+    def _bool_column(data: pd.DataFrame, column: str) -> List[bool]:
+        if column not in data.columns:
+            return [False] * len(data)
+        return data[column].astype(bool).tolist()
+    
+    def _build_records(self, data: pd.DataFrame) -> List[Dict]:
+        """Build response records column-wise (satu konversi per kolom, tanpa iterrows)"""
+        
+        columns = {
+            'tanggal': data['tanggal'].dt.strftime('%Y-%m-%d').tolist(),
+            'komoditas': data['komoditas'].astype(object).tolist(),
+            'wilayah': data['wilayah'].astype(object).tolist(),
+            'harga': self._float_column(data, 'harga'),
+            'tavg': self._float_column(data, 'tavg_final'),
+            'rh_avg': self._float_column(data, 'rh_avg_final'),
+            'ff_avg': self._float_column(data, 'ff_avg_final'),
+            'curah_hujan': self._float_column(data, 'rr'),
+            'ramadan': self._bool_column(data, 'dum_ramadan'),
+            'idul_fitri': self._bool_column(data, 'dum_idulfitri'),
+            'natal_newyear': self._bool_column(data, 'dum_natal_newyr')
+        }
+        
+        keys = list(columns.keys())
+        return [dict(zip(keys, values)) for values in zip(*columns.values())]
+    
+    def build_api_records(self, data: pd.DataFrame, level_harga: str = "Konsumen",
+                          include_weather: bool = True, include_events: bool = True,
+                          fields: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Build records format /api/data/historical (blok cuaca dan list events)
+        langsung dari kolom frame. Dengan fields, hanya field tersebut yang
+        dikonversi dan di-serialize.
+        """
+        if fields is None:
+            fields = self.default_fields(include_weather, include_events)
+        
+        # Field skalar: hanya kolom yang diminta yang dikonversi
+        scalar_columns = {
+            "tanggal": lambda: data['tanggal'].dt.strftime('%Y-%m-%d').tolist(),
+            "komoditas": lambda: data['komoditas'].astype(object).tolist(),
+            "wilayah": lambda: data['wilayah'].astype(object).tolist(),
+            "level_harga": lambda: [level_harga] * len(data),
+            "harga": lambda: self._float_column(data, 'harga')
+        }
+        keys = [name for name in scalar_columns if name in fields]
+        records = [
+            dict(zip(keys, values))
+            for values in zip(*(scalar_columns[name]() for name in keys))
+        ] if keys else [{} for _ in range(len(data))]
+        
+        if 'cuaca' in fields:
+            weather = zip(
+                self._float_column(data, 'tavg_final'),
+                self._float_column(data, 'rh_avg_final'),
+                self._float_column(data, 'rr'),
+                self._float_column(data, 'ff_avg_final')
+            )
+            for record, (suhu, kelembaban, curah_hujan, angin) in zip(records, weather):
+                record["cuaca"] = {
+                    "suhu_rata": suhu,
+                    "kelembaban": kelembaban,
+                    "curah_hujan": curah_hujan,
+                    "kecepatan_angin": angin
+                }
+        
+        if 'events' in fields:
+            # Kombinasi flag di-encode jadi kode 0-7, lalu di-lookup
+            codes = np.zeros(len(data), dtype=np.int8)
+            for bit, column in enumerate(['dum_ramadan', 'dum_idulfitri', 'dum_natal_newyr']):
+                codes |= np.asarray(self._bool_column(data, column), dtype=np.int8) << bit
             
-            return enhanced_stats
-            
+            for record, code in zip(records, codes.tolist()):
+                record["events"] = list(self.EVENT_COMBINATIONS[code])
+        
+        if 'ohlc' in fields and 'open' in data.columns:
+            # Frame hasil agregat OHLC (resolution daily/weekly/monthly)
+            ohlc = zip(
+                data['open'].astype(float).tolist(),
+                data['high'].astype(float).tolist(),
+                data['low'].astype(float).tolist(),
+                data['close'].astype(float).tolist(),
+                data['avg'].astype(float).tolist(),
+                data['count'].astype(int).tolist()
+            )
+            for record, (open_, high, low, close, avg, count) in zip(records, ohlc):
+                record["ohlc"] = {
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "avg": avg,
+                    "count": count
+                }
+        
+        return records
+    
+    def _get_current_timestamp(self) -> str:
+        return datetime.now().isoformat()
+    
+    def _series_prices(self, processor: DataProcessor,
+                       series: Optional[List[Tuple[str, str]]] = None) -> pd.DataFrame:
+        """Harga (dan flag event) series terpilih, default semua, terurut by (komoditas, wilayah, tanggal)"""
+        if series is None:
+            series = [(commodity, region) for commodity, region, _ in processor.get_series_catalog()]
+        return processor.query_series(series, columns=self.STATISTICS_COLUMNS)
+    
+    def _build_statistics(self, processor: DataProcessor) -> Optional[Tuple[str, Dict[str, Dict]]]:
+        """Bangun semua tabel statistik untuk snapshot processor; None jika gagal"""
+        try:
+            start = time.perf_counter()
+            prices = self._series_prices(processor)
+            tables = {name: builder(prices) for name, builder in self.STATISTICS_TABLES.items()}
+            logger.info(f"📊 Statistics tables built for {processor.data_version} "
+                        f"in {time.perf_counter() - start:.2f}s")
+            return processor.data_version, tables
         except Exception as e:
-            logger.error(f"Error getting commodity statistics: {str(e)}")
-            return {'success': False, 'error': str(e)}
+            # Statistik bisa dibangun ulang saat lookup pertama
+            logger.warning(f"⚠️ Statistics precompute failed: {str(e)}")
+            return None
     
-    def _analyze_seasonal_patterns(self, data: pd.DataFrame) -> Dict:
-        """Analyze seasonal patterns dalam price data"""
+    def _set_statistics(self, processor: DataProcessor,
+                        statistics: Optional[Tuple[str, Dict[str, Dict]]]):
+        """Simpan tabel statistik; ringkasan series juga di-attach ke processor (get_statistics)"""
+        self._statistics = statistics
+        processor.series_summary = (
+            (statistics[0], statistics[1]['series_summary']) if statistics is not None else None
+        )
+    
+    def _statistics_table(self, name: str) -> Dict:
+        """
+        Tabel statistik `name` untuk snapshot aktif. Normalnya sudah
+        dihitung saat load/reload/ingest; dibangun ulang jika versinya basi.
+        """
+        processor = self.data_processor
+        
+        with self._statistics_lock:
+            if self._statistics is None or self._statistics[0] != processor.data_version:
+                statistics = self._build_statistics(processor)
+                if statistics is None:
+                    raise RuntimeError("Statistics tables unavailable")
+                self._set_statistics(processor, statistics)
+            return self._statistics[1][name]
+    
+    def _refreshed_statistics(self, processor: DataProcessor, commodities: Optional[List[str]],
+                              previous_version: Optional[str]) -> Optional[Tuple[str, Dict[str, Dict]]]:
+        """
+        Tabel statistik untuk snapshot setelah append: hanya series milik
+        komoditas yang berubah sejak previous_version (semua wilayah + series
+        nasionalnya) yang dihitung ulang, sisanya dipakai dari tabel versi
+        sebelumnya. commodities None (log revisi tidak lengkap) = rebuild
+        penuh. None jika tabel lama tidak ada/basi (dibangun saat lookup).
+        """
+        if commodities is None:
+            return self._build_statistics(processor)
+        
+        statistics = self._statistics
+        if statistics is None or statistics[0] != previous_version:
+            return None
         
         try:
-            seasonal_stats = {}
-            
-            # Monthly patterns
-            monthly_avg = data.groupby('month')['harga'].mean()
-            seasonal_stats['monthly_avg'] = {
-                int(month): float(price) for month, price in monthly_avg.items()
-            }
+            start = time.perf_counter()
+            changed = set(commodities)
+            series = [(c, r) for c, r, _ in processor.get_series_catalog() if c in changed]
+            prices = self._series_prices(processor, series)
             
-            # Ramadan effect
-            ramadan_data = data[data.get('dum_ramadan', 0) == 1]
-            normal_data = data[data.get('dum_ramadan', 0) == 0]
+            tables = {}
+            for name, table in statistics[1].items():
+                refreshed = {key: value for key, value in table.items() if key[0] not in changed}
+                refreshed.update(self.STATISTICS_TABLES[name](prices))
+                tables[name] = refreshed
             
-            if len(ramadan_data) > 0 and len(normal_data) > 0:
-                seasonal_stats['ramadan_effect'] = {
-                    'ramadan_avg': float(ramadan_data['harga'].mean()),
-                    'normal_avg': float(normal_data['harga'].mean()),
-                    'price_increase_pct': float((ramadan_data['harga'].mean() - normal_data['harga'].mean()) / normal_data['harga'].mean() * 100)
-                }
+            logger.info(f"📊 Statistics refreshed for {', '.join(sorted(changed))} ({len(series)} series) "
+                        f"in {time.perf_counter() - start:.3f}s")
+            return processor.data_version, tables
+        except Exception as e:
+            logger.warning(f"⚠️ Incremental statistics refresh failed: {str(e)}")
+            return None
+    
+    def get_enhanced_commodity_statistics(self, commodity: str, region: Optional[str] = None) -> Dict:
+        """
+        Basic stats, volatility analysis, trend dan pola volatilitas bulanan
+        untuk satu (commodity, region); region None/'all' = series nasional
+        (rata-rata harian antar wilayah). Semua series dihitung sekaligus
+        per versi dataset, sehingga request hanya berupa lookup.
+        """
+        
+        if not self.data_loaded:
+            return {'success': False, 'error': 'Data not loaded'}
+        
+        try:
+            region = region if region and region != 'all' else ALL_REGIONS
+            stats = self._statistics_table('enhanced_statistics').get((commodity, region))
+            seasonal = self._statistics_table('seasonal_volatility').get((commodity, region))
+            if stats is None:
+                return {'success': False, 'error': f'No data found for {commodity} in {region}'}
             
-            # Idul Fitri effect
-            idul_fitri_data = data[data.get('dum_idulfitri', 0) == 1]
-            if len(idul_fitri_data) > 0 and len(normal_data) > 0:
-                seasonal_stats['idul_fitri_effect'] = {
-                    'idul_fitri_avg': float(idul_fitri_data['harga'].mean()),
-                    'normal_avg': float(normal_data['harga'].mean()),
-                    'price_increase_pct': float((idul_fitri_data['harga'].mean() - normal_data['harga'].mean()) / normal_data['harga'].mean() * 100)
+            # Copy top-level supaya caller boleh pop/menambah key
+            return {
+                'success': True,
+                'commodity': commodity,
+                'region': region,
+                **stats,
+                'seasonal_analysis': {
+                    key: value for key, value in seasonal.items()
+                    if key in ('available', 'reason', 'monthly_volatility', 'seasonal_patterns')
                 }
-            
-            return seasonal_stats
+            }
             
         except Exception as e:
-            logger.error(f"Error analyzing seasonal patterns: {str(e)}")
-            return {}
+            logger.error(f"Error getting enhanced statistics: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
+    def get_seasonal_volatility(self, commodity: str, region: Optional[str] = None) -> Dict:
+        """
+        Volatilitas bulanan/kuartalan, rasio volatilitas event dan bulan
+        paling volatil untuk satu (commodity, region) dari tabel seasonal
+        yang sudah dihitung untuk versi dataset aktif; region None/'all' =
+        series nasional. Return {'available': False, 'reason': ...} jika
+        series tidak ada atau datanya kurang.
+        """
+        
+        if not self.data_loaded:
+            return {'available': False, 'reason': 'Data not loaded'}
+        
+        region = region if region and region != 'all' else ALL_REGIONS
+        seasonal = self._statistics_table('seasonal_volatility').get((commodity, region))
+        if seasonal is None:
+            return {'available': False, 'reason': f'No data found for {commodity} in {region}'}
+        return dict(seasonal)
     
-    def _analyze_weather_correlation(self, data: pd.DataFrame) -> Dict:
-        """Analyze correlation between weather dan price"""
+    def analyze_seasonal_volatility(self, data: pd.DataFrame) -> Dict:
+        """
+        Seasonal volatility untuk frame arbitrer (satu komoditas). Jika frame
+        berisi beberapa wilayah, hasilnya untuk series nasional (rata-rata
+        harian antar wilayah). Untuk series dataset, pakai
+        get_seasonal_volatility (lookup tanpa hitung ulang).
+        """
+        
+        if data.empty:
+            return {'available': False, 'reason': 'No data'}
+        
+        commodities = data['komoditas'].unique()
+        if len(commodities) > 1:
+            return {'available': False, 'reason': 'Expected data for a single commodity'}
+        
+        regions = data['wilayah'].unique()
+        region = regions[0] if len(regions) == 1 else ALL_REGIONS
+        
+        prices = data.sort_values(['wilayah', 'tanggal'], kind='stable')
+        return compute_seasonal_volatility(prices)[(commodities[0], region)]
+    
+    def get_series_summary(self, commodity: str, region: Optional[str] = None) -> Optional[Dict]:
+        """
+        Ringkasan harga (basic stats, window tail 7/30 baris, rata-rata bulanan,
+        efek event, korelasi cuaca, statistik historis) satu series dari tabel
+        versi dataset aktif; region None/'all' = gabungan semua wilayah.
+        None jika series tidak ada.
+        """
+        
+        if not self.data_loaded:
+            return None
+        
+        region = region if region and region != 'all' else ALL_REGIONS
+        return self._statistics_table('series_summary').get((commodity, region))
+    
+    def get_commodity_statistics(self, commodity: str, region: Optional[str] = None) -> Dict:
+        """Get detailed statistics untuk specific commodity (lookup tabel ringkasan series)"""
+        
+        if not self.data_loaded:
+            return {'success': False, 'error': 'Data not loaded'}
         
         try:
-            correlations = {}
+            summary = self.get_series_summary(commodity, region)
             
-            weather_columns = ['tavg_final', 'rh_avg_final', 'ff_avg_final', 'rr']
-            
-            for col in weather_columns:
-                if col in data.columns:
-                    correlation = data['harga'].corr(data[col])
-                    if not pd.isna(correlation):
-                        correlations[col] = float(correlation)
+            if summary is None:
+                return {'success': False, 'error': 'No data found'}
             
-            return correlations
+            return {
+                'success': True,
+                'basic_stats': summary['basic_stats'],
+                'trend_analysis': summary['trend_analysis'],
+                'seasonal_patterns': summary['seasonal_patterns'],
+                'weather_correlation': summary['weather_correlation']
+            }
             
         except Exception as e:
-            logger.error(f"Error analyzing weather correlation: {str(e)}")
-            return {}
+            logger.error(f"Error getting commodity statistics: {str(e)}")
+            return {'success': False, 'error': str(e)}
     
-    def get_price_alerts(self, threshold_pct: float = 20.0) -> List[Dict]:
-        """Get price alerts for significant price changes"""
+    def get_price_alerts(self, threshold_pct: Optional[float] = None,
+                         critical_pct: Optional[float] = None,
+                         recent_window: Optional[int] = None,
+                         previous_window: Optional[int] = None) -> List[Dict]:
+        """
+        Get price alerts for significant price changes: rata-rata
+        recent_window baris terakhir vs previous_window baris sebelumnya,
+        dihitung untuk semua series sekaligus dari tail per series.
+        Default parameter (None) dari settings (price_alert_*); window harus
+        >= 1 baris dan threshold >= 0, selain itu ValueError.
+        """
+        
+        threshold_pct = settings.price_alert_threshold_pct if threshold_pct is None else threshold_pct
+        critical_pct = settings.price_alert_critical_pct if critical_pct is None else critical_pct
+        recent_window = settings.price_alert_recent_window if recent_window is None else recent_window
+        previous_window = settings.price_alert_previous_window if previous_window is None else previous_window
+        
+        if recent_window < 1 or previous_window < 1:
+            raise ValueError(f"Alert windows must be positive: recent_window={recent_window}, "
+                             f"previous_window={previous_window}")
+        if threshold_pct < 0 or critical_pct < 0:
+            raise ValueError(f"Alert thresholds must not be negative: threshold_pct={threshold_pct}, "
+                             f"critical_pct={critical_pct}")
         
         if not self.data_loaded:
             return []
         
         try:
-            alerts = []
+            processor = self.data_processor  # satu snapshot per request
+            tail = processor.query_tail(recent_window + previous_window, columns=self.KEY_COLUMNS)
+            changes = window_price_changes(tail, recent_window, previous_window)
             
-            for commodity in self.get_available_commodities():
-                for region in self.get_available_regions():
-                    data = self.data_processor.get_commodity_data(commodity, region)
-                    
-                    if len(data) < 7:
-                        continue
-                    
-                    # Compare last 7 days average vs previous 7 days
-                    recent_7d = data.tail(7)['harga'].mean()
-                    previous_7d = data.tail(14).head(7)['harga'].mean()
-                    
-                    if previous_7d > 0:
-                        change_pct = (recent_7d - previous_7d) / previous_7d * 100
-                        
-                        if abs(change_pct) >= threshold_pct:
-                            alert_type = 'INCREASE' if change_pct > 0 else 'DECREASE'
-                            severity = 'CRITICAL' if abs(change_pct) >= 30 else 'WARNING'
-                            
-                            alerts.append({
-                                'commodity': commodity,
-                                'region': region,
-                                'alert_type': alert_type,
-                                'severity': severity,
-                                'change_pct': round(change_pct, 2),
-                                'current_price': float(data['harga'].iloc[-1]),
-                                'previous_avg': round(previous_7d, 0),
-                                'recent_avg': round(recent_7d, 0),
-                                'date': data['tanggal'].iloc[-1].strftime('%Y-%m-%d')
-                            })
+            magnitude = changes['change_pct'].abs()
+            changes = changes[(changes['previous_avg'] > 0) & (magnitude >= threshold_pct)]
+            
+            alerts = [
+                {
+                    'commodity': row.komoditas,
+                    'region': row.wilayah,
+                    'alert_type': 'INCREASE' if row.change_pct > 0 else 'DECREASE',
+                    'severity': 'CRITICAL' if abs(row.change_pct) >= critical_pct else 'WARNING',
+                    'change_pct': round(row.change_pct, 2),
+                    'current_price': float(row.current_price),
+                    'previous_avg': round(row.previous_avg, 0),
+                    'recent_avg': round(row.recent_avg, 0),
+                    'date': row.tanggal.strftime('%Y-%m-%d')
+                }
+                for row in changes.itertuples(index=False)
+            ]
             
             # Sort by severity dan change magnitude
             alerts.sort(key=lambda x: (x['severity'] == 'CRITICAL', abs(x['change_pct'])), reverse=True)
@@ -306,7 +1099,16 @@ class DataService:
             return {'success': False, 'error': 'Data not loaded'}
         
         try:
-            data = self.data_processor.data
+            processor = self.data_processor  # satu snapshot per request
+            data = processor.data
+            if data is None:
+                # Backend SQLite: ambil hanya kolom yang dibutuhkan report
+                data = processor.query_data(columns=[
+                    'tanggal', 'komoditas', 'wilayah', 'harga',
+                    'tavg_final', 'rh_avg_final', 'ff_avg_final', 'rr'
+                ])
+            
+            data_gaps = self._identify_data_gaps(data)
             
             quality_report = {
                 'success': True,
@@ -327,7 +1129,12 @@ class DataService:
                         'rainfall': int(data['rr'].isna().sum())
                     }
                 },
-                'data_gaps': self._identify_data_gaps(data)
+                'data_gaps': data_gaps['gaps'],
+                'gap_summary': data_gaps['summary'],
+                'memory_footprint': processor.memory_footprint or {
+                    'current_mb': round(data.memory_usage(deep=True).sum() / 1024 ** 2, 2),
+                    'compact_schema': False
+                }
             }
             
             return quality_report
@@ -336,35 +1143,96 @@ class DataService:
             logger.error(f"Error generating data quality report: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def _identify_data_gaps(self, data: pd.DataFrame) -> List[Dict]:
-        """Identify gaps dalam time series data"""
+    def _identify_data_gaps(self, data: pd.DataFrame, min_gap_days: Optional[int] = None) -> Dict:
+        """
+        Inventaris lengkap gap (> min_gap_days hari antar observasi berurutan)
+        untuk semua series sekaligus: satu lexsort by (komoditas, wilayah,
+        tanggal) lalu satu diff tanggal yang di-mask di batas series.
+        Return {'gaps': [...], 'summary': {...}}.
+        """
         
-        gaps = []
+        min_gap_days = self.GAP_THRESHOLD_DAYS if min_gap_days is None else min_gap_days
+        empty = {
+            'gaps': [],
+            'summary': {
+                'threshold_days': min_gap_days,
+                'series_checked': 0,
+                'series_with_gaps': 0,
+                'total_gaps': 0,
+                'total_missing_days': 0,
+                'longest_gap': None,
+                'by_series': []
+            }
+        }
         
         try:
-            for commodity in data['komoditas'].unique():
-                for region in data['wilayah'].unique():
-                    subset = data[(data['komoditas'] == commodity) & (data['wilayah'] == region)]
-                    subset = subset.sort_values('tanggal')
-                    
-                    if len(subset) < 2:
-                        continue
-                    
-                    # Check for gaps > 7 days
-                    for i in range(1, len(subset)):
-                        gap_days = (subset.iloc[i]['tanggal'] - subset.iloc[i-1]['tanggal']).days
-                        
-                        if gap_days > 7:
-                            gaps.append({
-                                'commodity': commodity,
-                                'region': region,
-                                'gap_start': subset.iloc[i-1]['tanggal'].strftime('%Y-%m-%d'),
-                                'gap_end': subset.iloc[i]['tanggal'].strftime('%Y-%m-%d'),
-                                'gap_days': gap_days
-                            })
-            
-            return gaps[:10]  # Return top 10 gaps
+            if data.empty:
+                return empty
+            
+            commodity_codes, commodities = pd.factorize(data['komoditas'], sort=True)
+            region_codes, regions = pd.factorize(data['wilayah'], sort=True)
+            series_codes = commodity_codes.astype(np.int64) * len(regions) + region_codes
+            days = data['tanggal'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+            
+            order = np.lexsort((days, series_codes))
+            series_codes = series_codes[order]
+            days = days[order]
+            
+            # Grouped diff: selisih hari dengan baris sebelumnya di series yang sama
+            gap_days = np.diff(days)
+            is_gap = (series_codes[1:] == series_codes[:-1]) & (gap_days > min_gap_days)
+            ends = np.flatnonzero(is_gap) + 1
+            
+            gap_series = series_codes[ends]
+            gap_lengths = gap_days[ends - 1]
+            gap_starts = np.datetime_as_string(days[ends - 1].astype('datetime64[D]'))
+            gap_ends = np.datetime_as_string(days[ends].astype('datetime64[D]'))
+            gap_commodities = np.asarray(commodities)[gap_series // len(regions)]
+            gap_regions = np.asarray(regions)[gap_series % len(regions)]
+            
+            gaps = [
+                {
+                    'commodity': str(commodity),
+                    'region': str(region),
+                    'gap_start': str(start),
+                    'gap_end': str(end),
+                    'gap_days': int(length)
+                }
+                for commodity, region, start, end, length
+                in zip(gap_commodities, gap_regions, gap_starts, gap_ends, gap_lengths)
+            ]
+            
+            # Ringkasan per series (gap sudah terurut by series, lalu tanggal)
+            by_series = []
+            if gaps:
+                first = np.flatnonzero(np.r_[True, gap_series[1:] != gap_series[:-1]])
+                gap_counts = np.diff(np.append(first, len(gaps)))
+                longest = np.maximum.reduceat(gap_lengths, first)
+                missing = np.add.reduceat(gap_lengths - 1, first)
+                by_series = [
+                    {
+                        'commodity': gaps[index]['commodity'],
+                        'region': gaps[index]['region'],
+                        'gap_count': int(count),
+                        'longest_gap_days': int(longest_days),
+                        'missing_days': int(missing_days)
+                    }
+                    for index, count, longest_days, missing_days in zip(first, gap_counts, longest, missing)
+                ]
+            
+            return {
+                'gaps': gaps,
+                'summary': {
+                    'threshold_days': min_gap_days,
+                    'series_checked': int(len(np.unique(series_codes))),
+                    'series_with_gaps': len(by_series),
+                    'total_gaps': len(gaps),
+                    'total_missing_days': int((gap_lengths - 1).sum()),
+                    'longest_gap': gaps[int(np.argmax(gap_lengths))] if gaps else None,
+                    'by_series': by_series
+                }
+            }
             
         except Exception as e:
             logger.error(f"Error identifying data gaps: {str(e)}")
-            return []
\ No newline at end of file
+            return empty
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 import numpy as np
+import pandas as pd
 from data.models.lstm_model import LSTMPredictor
 from data.models.data_processor import DataProcessor
 from services.data_service import DataService
@@ -17,13 +18,19 @@ class PredictionService:
     Orchestrates LSTM model predictions dan AI-generated analysis
     """
     
-    def __init__(self):
+    def __init__(self, data_service: Optional[DataService] = None,
+                 ai_service: Optional[AIService] = None):
         self.lstm_predictor = LSTMPredictor(settings.model_path, settings.scaler_path)
-        self.data_service = DataService()
-        self.data_processor = self.data_service.data_processor
-        self.ai_service = AIService()  # Initialize AI service untuk dynamic content
+        # Pakai instance yang di-share (service container) jika tersedia
+        self.data_service = data_service or DataService()
+        self.ai_service = ai_service or AIService()  # AI service untuk dynamic content
         self._validate_model_readiness()
     
+    @property
+    def data_processor(self) -> DataProcessor:
+        """Snapshot data aktif dari DataService (ikut berganti saat hot reload)"""
+        return self.data_service.data_processor
+    
     def _validate_model_readiness(self):
         """Validate model dan data readiness"""
         
@@ -88,8 +95,10 @@ class PredictionService:
                     'predictions': []
                 }
             
+            processor = self.data_processor  # satu snapshot per request
+            
             # Get latest sequence untuk prediction
-            latest_sequence, scaler = self.data_processor.get_latest_sequence(
+            latest_sequence, scaler = processor.get_latest_sequence(
                 commodity, region, sequence_length=30
             )
             
@@ -102,7 +111,7 @@ class PredictionService:
                 return prediction_result
             
             # Get current price dan historical stats
-            current_data = self.data_processor.get_commodity_data(commodity, region)
+            current_data = processor.get_commodity_data(commodity, region)
             current_price = float(current_data['harga'].iloc[-1]) if len(current_data) > 0 else 0
             
             # Enhanced prediction analysis dengan AI integration
@@ -485,27 +494,26 @@ class PredictionService:
         """Enhanced historical comparison with seasonal analysis"""
         
         try:
-            # Get historical data
-            data = self.data_processor.get_commodity_data(commodity, region)
+            # Statistik historis dari tabel ringkasan series (versi dataset aktif)
+            summary = self.data_service.get_series_summary(commodity, region)
             
-            if len(data) < 30:
+            if summary is None or summary['basic_stats']['count'] < 30:
                 return {
                     'comparison_available': False,
                     'message': 'Insufficient historical data for comparison'
                 }
             
-            # Calculate historical statistics
-            historical_prices = data['harga'].astype(float).tolist()
-            historical_mean = float(np.mean(historical_prices))
-            historical_std = float(np.std(historical_prices))
-            historical_max = float(np.max(historical_prices))
-            historical_min = float(np.min(historical_prices))
+            historical = summary['historical_stats']
+            historical_mean = historical['mean']
+            historical_std = historical['std']
+            historical_max = historical['max']
+            historical_min = historical['min']
             
             # Seasonal comparison jika data sufficient
             current_month = datetime.now().month
-            if len(data) >= 365:  # At least 1 year data
-                seasonal_data = data[data['tanggal'].dt.month == current_month]
-                seasonal_mean = float(np.mean(seasonal_data['harga'])) if len(seasonal_data) > 0 else historical_mean
+            if summary['basic_stats']['count'] >= 365:  # At least 1 year data
+                monthly_avg = summary['seasonal_patterns']['monthly_avg']
+                seasonal_mean = monthly_avg.get(current_month, historical_mean)
             else:
                 seasonal_mean = historical_mean
             
@@ -635,6 +643,41 @@ class PredictionService:
                 'error': str(e)
             }
     
+    def batch_predictions_frame(self, batch_result: Dict) -> pd.DataFrame:
+        """
+        Flatten hasil batch prediction ke tabel long (satu baris per
+        commodity-region-hari prediksi) untuk output columnar (Arrow)
+        """
+        columns = {
+            'commodity': [], 'region': [], 'base_date': [], 'tanggal': [], 'horizon': [],
+            'predicted_price': [], 'price_change': [], 'price_change_pct': [],
+            'current_price': [], 'risk_level': [], 'confidence_level': []
+        }
+        
+        for commodity, regions in batch_result.get('batch_results', {}).items():
+            for region, result in regions.items():
+                if not result.get('success', False):
+                    continue
+                
+                predictions = result.get('predictions', [])
+                n_days = len(predictions)
+                columns['commodity'] += [commodity] * n_days
+                columns['region'] += [region] * n_days
+                columns['base_date'] += [result.get('base_date')] * n_days
+                columns['tanggal'] += result.get('prediction_dates', [None] * n_days)
+                columns['horizon'] += list(range(1, n_days + 1))
+                columns['predicted_price'] += predictions
+                columns['price_change'] += result.get('price_changes', [None] * n_days)
+                columns['price_change_pct'] += result.get('price_changes_pct', [None] * n_days)
+                columns['current_price'] += [result.get('current_price')] * n_days
+                columns['risk_level'] += [result.get('risk_assessment', {}).get('risk_level')] * n_days
+                columns['confidence_level'] += [result.get('summary', {}).get('confidence_level')] * n_days
+        
+        frame = pd.DataFrame(columns)
+        frame['base_date'] = pd.to_datetime(frame['base_date'])
+        frame['tanggal'] = pd.to_datetime(frame['tanggal'])
+        return frame
+    
     def _generate_batch_summary(self, results: Dict, successful: int, total: int) -> Dict:
         """Generate AI-powered batch summary"""
         try:
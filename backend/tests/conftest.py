@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Backend directory di sys.path supaya import `data.models...` jalan dari pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.models.data_processor import DataProcessor
+
+
+@pytest.fixture(scope="session")
+def make_processor(tmp_path_factory):
+    """Factory DataProcessor ter-load untuk backend 'memory', 'compact' atau 'sqlite'"""
+
+    def make(dataset_path, backend: str) -> DataProcessor:
+        sqlite_path = None
+        if backend == 'sqlite':
+            sqlite_path = str(tmp_path_factory.mktemp("sqlite") / "pangan_ai.sqlite")
+        processor = DataProcessor(
+            str(dataset_path),
+            compact_schema=backend == 'compact',
+            sqlite_path=sqlite_path
+        )
+        processor.load_data()
+        return processor
+
+    return make
@@ -0,0 +1,95 @@
+# Regression: _identify_data_gaps (satu lexsort + diff) vs loop per series
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.data_service import DataService
+
+# (komoditas, wilayah) -> range tanggal yang dihapus (gap yang diharapkan)
+REMOVED = {
+    ('Cabai Rawit Merah', 'Kota Bandung'): [('2024-02-01', '2024-02-10'), ('2024-05-01', '2024-05-07')],
+    ('Cabai Rawit Merah', 'Kabupaten Bogor'): [('2024-03-01', '2024-03-06')],  # 7 hari: bukan gap
+    ('Bawang Merah', 'Kota Bandung'): [('2024-01-02', '2024-01-31')],
+    ('Bawang Merah', 'Kabupaten Garut'): [],
+}
+
+
+@pytest.fixture(scope="module")
+def gap_frame():
+    """Series harian 2024 dengan range tanggal yang dihapus, urutan baris diacak"""
+    dates = pd.date_range('2024-01-01', '2024-06-30', freq='D')
+    frames = []
+    for (commodity, region), removed in REMOVED.items():
+        keep = np.ones(len(dates), dtype=bool)
+        for start, end in removed:
+            keep &= ~((dates >= start) & (dates <= end))
+        frames.append(pd.DataFrame({
+            'tanggal': dates[keep],
+            'komoditas': commodity,
+            'wilayah': region,
+            'harga': 50000.0
+        }))
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def reference_gaps(data: pd.DataFrame, min_gap_days: int):
+    """Loop per series sebelum vektorisasi (seluruh gap, bukan hanya 10 pertama)"""
+    gaps = []
+    for (commodity, region), group in data.groupby(['komoditas', 'wilayah'], observed=True):
+        dates = group['tanggal'].sort_values().reset_index(drop=True)
+        for i in range(1, len(dates)):
+            gap = (dates.iloc[i] - dates.iloc[i - 1]).days
+            if gap > min_gap_days:
+                gaps.append({
+                    'commodity': commodity,
+                    'region': region,
+                    'gap_start': dates.iloc[i - 1].strftime('%Y-%m-%d'),
+                    'gap_end': dates.iloc[i].strftime('%Y-%m-%d'),
+                    'gap_days': gap
+                })
+    return gaps
+
+
+def identify(data, min_gap_days=None):
+    return DataService.__new__(DataService)._identify_data_gaps(data, min_gap_days)
+
+
+def test_gaps_match_series_loop(gap_frame):
+    result = identify(gap_frame)
+
+    assert result['gaps'] == reference_gaps(gap_frame, DataService.GAP_THRESHOLD_DAYS)
+    assert [(gap['commodity'], gap['region'], gap['gap_days']) for gap in result['gaps']] == [
+        ('Bawang Merah', 'Kota Bandung', 31),
+        ('Cabai Rawit Merah', 'Kota Bandung', 11),
+        ('Cabai Rawit Merah', 'Kota Bandung', 8),
+    ]
+
+    summary = result['summary']
+    assert summary['series_checked'] == 4
+    assert summary['series_with_gaps'] == 2
+    assert summary['total_gaps'] == 3
+    assert summary['total_missing_days'] == 30 + 10 + 7
+    assert summary['longest_gap']['gap_days'] == 31
+    assert [(s['region'], s['gap_count'], s['longest_gap_days'], s['missing_days'])
+            for s in summary['by_series']] == [('Kota Bandung', 1, 31, 30), ('Kota Bandung', 2, 11, 17)]
+
+
+def test_gaps_threshold(gap_frame):
+    # Threshold 5: range 6 hari di Kabupaten Bogor (selisih 7) ikut jadi gap
+    result = identify(gap_frame, min_gap_days=5)
+
+    assert result['gaps'] == reference_gaps(gap_frame, 5)
+    assert result['summary']['total_gaps'] == 4
+
+
+def test_gaps_categorical_input(gap_frame):
+    categorical = gap_frame.astype({'komoditas': 'category', 'wilayah': 'category'})
+
+    assert identify(categorical) == identify(gap_frame)
+
+
+def test_gaps_empty_frame(gap_frame):
+    result = identify(gap_frame.iloc[:0])
+
+    assert result['gaps'] == []
+    assert result['summary']['series_checked'] == 0
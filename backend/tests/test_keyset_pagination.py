@@ -0,0 +1,97 @@
+# Keyset pagination /api/data/historical: cursor, has_more dan urutan
+# (komoditas, wilayah, tanggal) yang sama di backend memory dan SQLite
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from services.data_service import DataService
+
+DATASET_PATH = Path(__file__).parent.parent / "data" / "dataset_final.csv"
+KEY_COLUMNS = ['komoditas', 'wilayah', 'tanggal']
+BACKENDS = ['memory', 'compact', 'sqlite']
+
+
+@pytest.fixture(scope="module")
+def processors(make_processor):
+    if not DATASET_PATH.exists():
+        pytest.skip(f"Dataset not found at {DATASET_PATH}")
+    return {backend: make_processor(DATASET_PATH, backend) for backend in BACKENDS}
+
+
+def make_service(processor) -> DataService:
+    """DataService di atas processor yang sudah ter-load (tanpa load dataset dari settings)"""
+    service = DataService.__new__(DataService)
+    service.data_processor = processor
+    service.data_loaded = True
+    return service
+
+
+def walk_pages(service, page_size, **filters):
+    """Ikuti next_cursor sampai has_more False; return (keys semua baris, metadata per page)"""
+    keys, pages = [], []
+    cursor = None
+    while True:
+        data, metadata = service.get_historical_page(cursor=cursor, page_size=page_size, **filters)
+        pages.append(metadata['pagination'])
+        keys.extend(zip(data['komoditas'].astype(str), data['wilayah'].astype(str), data['tanggal']))
+        cursor = metadata['pagination']['next_cursor']
+        if not metadata['pagination']['has_more']:
+            assert cursor is None
+            return keys, pages
+        assert len(data) == page_size
+        assert service.decode_cursor(cursor) == keys[-1]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_walk_covers_dataset_in_order(processors, backend):
+    processor = processors[backend]
+    keys, pages = walk_pages(make_service(processor), page_size=1000)
+
+    assert len(pages) == 7
+    assert [page['has_more'] for page in pages] == [True] * 6 + [False]
+    assert len(keys) == len(set(keys)) == processor.row_count == 6180
+    assert keys == sorted(keys)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_walk_with_filters(processors, backend):
+    processor = processors[backend]
+    filters = dict(region='Kota Bandung', start_date=date(2023, 1, 1), end_date=date(2023, 6, 30))
+    keys, pages = walk_pages(make_service(processor), page_size=50, **filters)
+
+    expected = processor.query_data(**filters, columns=KEY_COLUMNS)
+    expected_keys = sorted(zip(expected['komoditas'].astype(str), expected['wilayah'].astype(str),
+                               expected['tanggal']))
+    assert len(expected_keys) > 50
+    assert keys == expected_keys
+    assert len(pages) == -(-len(expected_keys) // 50)
+
+
+def test_backends_agree_page_by_page(processors):
+    walks = {backend: walk_pages(make_service(processor), page_size=999)
+             for backend, processor in processors.items()}
+
+    memory_keys, memory_pages = walks['memory']
+    for backend, (keys, pages) in walks.items():
+        assert keys == memory_keys, backend
+        assert pages == memory_pages, backend
+
+
+def test_cursor_round_trip():
+    row = pd.Series({'komoditas': 'Cabai Rawit Merah', 'wilayah': 'Kota Bandung',
+                     'tanggal': pd.Timestamp('2024-02-29')})
+    cursor = DataService.encode_cursor(row)
+
+    assert DataService.decode_cursor(cursor) == ('Cabai Rawit Merah', 'Kota Bandung', pd.Timestamp('2024-02-29'))
+    with pytest.raises(ValueError):
+        DataService.decode_cursor('not-a-cursor')
+
+
+def test_last_page_has_no_cursor(processors):
+    service = make_service(processors['memory'])
+    data, metadata = service.get_historical_page(page_size=10000)
+
+    assert len(data) == 6180
+    assert metadata['pagination'] == {'page_size': 10000, 'cursor': None, 'next_cursor': None, 'has_more': False}
@@ -0,0 +1,84 @@
+# Regression: _add_series_features (grouped pass) vs loop per group sebelumnya
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from data.models.data_processor import DataProcessor
+
+DATASET_PATH = Path(__file__).parent.parent / "data" / "dataset_final.csv"
+
+
+def reference_series_features(data: pd.DataFrame) -> pd.DataFrame:
+    """Implementasi loop per commodity-region group sebelum vektorisasi"""
+    processed_groups = []
+    for (commodity, region), group in data.groupby(['komoditas', 'wilayah']):
+        group = group.sort_values('tanggal').copy()
+
+        # Lag features
+        group['harga_lag_1'] = group['harga'].shift(1)
+        group['harga_lag_3'] = group['harga'].shift(3)
+        group['harga_lag_7'] = group['harga'].shift(7)
+        group['harga_lag_14'] = group['harga'].shift(14)
+
+        # Rolling features
+        group['harga_rolling_mean_7'] = group['harga'].rolling(window=7, min_periods=1).mean()
+        group['harga_rolling_std_7'] = group['harga'].rolling(window=7, min_periods=1).std().fillna(0)
+        group['harga_rolling_mean_14'] = group['harga'].rolling(window=14, min_periods=1).mean()
+        group['harga_rolling_std_14'] = group['harga'].rolling(window=14, min_periods=1).std().fillna(0)
+        group['harga_rolling_mean_30'] = group['harga'].rolling(window=30, min_periods=1).mean()
+        group['harga_rolling_std_30'] = group['harga'].rolling(window=30, min_periods=1).std().fillna(0)
+
+        # Change features
+        group['harga_change_1d'] = group['harga'].pct_change(1).fillna(0)
+        group['harga_change_7d'] = group['harga'].pct_change(7).fillna(0)
+
+        processed_groups.append(group)
+
+    data = pd.concat(processed_groups, ignore_index=True)
+
+    lag_columns = ['harga_lag_1', 'harga_lag_3', 'harga_lag_7', 'harga_lag_14']
+    for col in lag_columns:
+        data[col] = data[col].ffill().fillna(data['harga'])
+
+    return data
+
+
+@pytest.fixture(scope="module")
+def row_features():
+    """Frame dataset setelah fitur per baris, sebelum fitur per series"""
+    if not DATASET_PATH.exists():
+        pytest.skip(f"Dataset not found at {DATASET_PATH}")
+
+    processor = DataProcessor(str(DATASET_PATH))
+    captured = {}
+
+    def capture(data):
+        captured['data'] = data.copy()
+        return data
+
+    processor._add_series_features = capture
+    processor._preprocess_data(pd.read_csv(DATASET_PATH))
+    return captured['data']
+
+
+def test_series_features_match_group_loop(row_features):
+    processor = DataProcessor(str(DATASET_PATH))
+
+    result = processor._add_series_features(row_features.copy())
+    expected = reference_series_features(row_features.copy())
+
+    assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_series_features_match_group_loop_shuffled(row_features):
+    # Urutan input tidak terurut: loop lama sort per group, versi baru
+    # mengandalkan sort (komoditas, wilayah, tanggal) di _preprocess_data
+    shuffled = row_features.sample(frac=1, random_state=0)
+    ordered = shuffled.sort_values(['komoditas', 'wilayah', 'tanggal']).reset_index(drop=True)
+
+    result = DataProcessor(str(DATASET_PATH))._add_series_features(ordered)
+    expected = reference_series_features(shuffled)
+
+    assert_frame_equal(result, expected, check_exact=True)
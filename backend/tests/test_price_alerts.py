@@ -0,0 +1,145 @@
+# Regression: price alerts satu pass (query_tail + window_price_changes)
+# vs loop per commodity-region pair sebelumnya
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from data.models.series_statistics import window_price_changes
+from services.data_service import DataService
+
+DATASET_PATH = Path(__file__).parent.parent / "data" / "dataset_final.csv"
+KEY_COLUMNS = DataService.KEY_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def alerts_dataset(tmp_path_factory):
+    """
+    Dataset asli + komoditas kedua dengan harga berbeda dan series pendek:
+    Kota Bandung 10 baris (< recent + previous), Kabupaten Bogor 5 baris
+    (< recent, tidak diikutkan)
+    """
+    if not DATASET_PATH.exists():
+        pytest.skip(f"Dataset not found at {DATASET_PATH}")
+
+    raw = pd.read_csv(DATASET_PATH)
+    second = raw.sort_values('tanggal').copy()
+    second['komoditas'] = 'Bawang Merah'
+    second['harga'] = (second['harga'] * (1 + 0.3 * np.sin(np.arange(len(second)) / 3))).round(0)
+    short = {'Kota Bandung': 10, 'Kabupaten Bogor': 5}
+    second = pd.concat([
+        group.tail(short.get(region, len(group)))
+        for region, group in second.groupby('wilayah')
+    ])
+
+    path = tmp_path_factory.mktemp("alerts") / "dataset.csv"
+    pd.concat([raw, second], ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="module", params=['memory', 'compact', 'sqlite'])
+def processor(request, alerts_dataset, make_processor):
+    return make_processor(alerts_dataset, request.param)
+
+
+def reference_alerts(processor, threshold_pct, critical_pct, recent_window, previous_window):
+    """Implementasi loop per pair sebelum get_price_alerts satu pass"""
+    alerts = []
+    for commodity in processor.commodities:
+        for region in processor.regions:
+            data = processor.get_commodity_data(commodity, region)
+
+            if len(data) < recent_window:
+                continue
+
+            recent = data.tail(recent_window)['harga'].mean()
+            previous = data.tail(recent_window + previous_window).head(previous_window)['harga'].mean()
+
+            if previous > 0:
+                change_pct = (recent - previous) / previous * 100
+
+                if abs(change_pct) >= threshold_pct:
+                    alerts.append({
+                        'commodity': commodity,
+                        'region': region,
+                        'alert_type': 'INCREASE' if change_pct > 0 else 'DECREASE',
+                        'severity': 'CRITICAL' if abs(change_pct) >= critical_pct else 'WARNING',
+                        'change_pct': round(change_pct, 2),
+                        'current_price': float(data['harga'].iloc[-1]),
+                        'previous_avg': round(previous, 0),
+                        'recent_avg': round(recent, 0),
+                        'date': data['tanggal'].iloc[-1].strftime('%Y-%m-%d')
+                    })
+
+    alerts.sort(key=lambda x: (x['severity'] == 'CRITICAL', abs(x['change_pct'])), reverse=True)
+    return alerts
+
+
+def make_service(processor) -> DataService:
+    """DataService di atas processor yang sudah ter-load (tanpa load dataset dari settings)"""
+    service = DataService.__new__(DataService)
+    service.data_processor = processor
+    service.data_loaded = True
+    return service
+
+
+@pytest.mark.parametrize("rows", [1, 7, 14, 10000])
+def test_query_tail_matches_groupby_tail(processor, rows):
+    series = [(commodity, region) for commodity, region, _ in processor.get_series_catalog()]
+    full = processor.query_series(series, columns=KEY_COLUMNS)
+    expected = full.groupby(['komoditas', 'wilayah'], sort=False, observed=True).tail(rows)
+
+    result = processor.query_tail(rows, columns=KEY_COLUMNS)
+
+    assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+@pytest.mark.parametrize("recent_window, previous_window", [(7, 7), (3, 10)])
+def test_window_price_changes_match_tail_head(processor, recent_window, previous_window):
+    tail = processor.query_tail(recent_window + previous_window, columns=KEY_COLUMNS)
+    changes = window_price_changes(tail, recent_window, previous_window)
+    result = {(row.komoditas, row.wilayah): row for row in changes.itertuples(index=False)}
+
+    expected_keys = []
+    for commodity, region, count in processor.get_series_catalog():
+        if count < recent_window:
+            continue
+        expected_keys.append((commodity, region))
+
+        data = processor.get_commodity_data(commodity, region)
+        row = result[(commodity, region)]
+        assert row.recent_avg == pytest.approx(data.tail(recent_window)['harga'].mean(), rel=1e-12)
+        assert row.previous_avg == pytest.approx(
+            data.tail(recent_window + previous_window).head(previous_window)['harga'].mean(), rel=1e-12
+        )
+        assert row.current_price == data['harga'].iloc[-1]
+        assert row.tanggal == data['tanggal'].iloc[-1]
+
+    assert list(result) == expected_keys
+
+
+@pytest.mark.parametrize("threshold_pct", [0, 5, 20])
+@pytest.mark.parametrize("recent_window, previous_window", [(7, 7), (3, 10)])
+def test_price_alerts_match_pair_loop(processor, threshold_pct, recent_window, previous_window):
+    result = make_service(processor).get_price_alerts(
+        threshold_pct=threshold_pct, critical_pct=30,
+        recent_window=recent_window, previous_window=previous_window
+    )
+    expected = reference_alerts(processor, threshold_pct, 30, recent_window, previous_window)
+
+    assert result == expected
+    if threshold_pct == 0:
+        # Threshold 0 tidak lagi diganti default; series < recent_window tetap di-skip
+        alerted = {(alert['commodity'], alert['region']) for alert in result}
+        assert (('Bawang Merah', 'Kabupaten Bogor') in alerted) == (recent_window <= 5)
+        assert ('Bawang Merah', 'Kota Bandung') in alerted
+
+
+def test_price_alerts_reject_invalid_windows(processor):
+    service = make_service(processor)
+    with pytest.raises(ValueError):
+        service.get_price_alerts(recent_window=0)
+    with pytest.raises(ValueError):
+        service.get_price_alerts(threshold_pct=-1)
@@ -0,0 +1,143 @@
+import gzip
+from typing import Dict, List, Optional
+import logging
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger(__name__)
+
+# Media type teks yang layak dikompresi (JSON/NDJSON/CSV); Arrow/Parquet sudah biner
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/",
+)
+
+
+def _load_brotli():
+    """Brotli opsional: tanpa package 'brotli' hanya gzip yang dipakai"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {encoding: q-value}"""
+    encodings = {}
+    if not header:
+        return encodings
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+class ResponseCompressor:
+    """
+    Kompresi body response (brotli jika tersedia, lalu gzip) untuk body
+    teks di atas minimum_size. Dipakai bersama oleh CompressionMiddleware
+    dan response cache (yang menyimpan hasil kompresi per entry).
+    """
+
+    def __init__(self, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._brotli = _load_brotli()
+
+    @property
+    def encodings(self) -> List[str]:
+        """Encoding yang didukung, urut preferensi server"""
+        return ["br", "gzip"] if self._brotli is not None else ["gzip"]
+
+    def should_compress(self, media_type: Optional[str], size: int) -> bool:
+        if size < self.minimum_size or not media_type:
+            return False
+        return media_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+    def select_encoding(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Encoding terbaik yang diterima client; None untuk identity"""
+        accepted = parse_accept_encoding(accept_encoding)
+        candidates = [
+            encoding for encoding in self.encodings
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0
+        ]
+        if not candidates:
+            return None
+        # q-value tertinggi menang; seri -> preferensi server
+        return max(candidates, key=lambda encoding: (
+            accepted.get(encoding, accepted.get("*", 0.0)), -self.encodings.index(encoding)
+        ))
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return self._brotli.compress(body, quality=self.brotli_quality)
+        if encoding == "gzip":
+            return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def compress_all(self, body: bytes) -> Dict[str, bytes]:
+        """Body terkompresi untuk setiap encoding yang didukung"""
+        return {encoding: self.compress(body, encoding) for encoding in self.encodings}
+
+
+def merge_vary(headers: MutableHeaders, value: str = "Accept-Encoding"):
+    """Tambahkan value ke header Vary tanpa duplikasi"""
+    existing = [item.strip() for item in headers.get("vary", "").split(",") if item.strip()]
+    if value.lower() not in [item.lower() for item in existing]:
+        existing.append(value)
+    headers["Vary"] = ", ".join(existing)
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """
+    Kompresi response non-streaming di atas threshold sesuai Accept-Encoding.
+    Response streaming (tanpa Content-Length, mis. /api/data/export) dan
+    response yang sudah memiliki Content-Encoding (cache hit precompressed)
+    diteruskan apa adanya.
+    """
+
+    def __init__(self, app, compressor: ResponseCompressor):
+        super().__init__(app)
+        self.compressor = compressor
+
+    async def dispatch(self, request: Request, call_next):
+        encoding = self.compressor.select_encoding(request.headers.get("accept-encoding"))
+        response = await call_next(request)
+
+        if encoding is None or "content-encoding" in response.headers:
+            return response
+
+        content_length = response.headers.get("content-length")
+        if content_length is None:
+            return response
+        if not self.compressor.should_compress(response.headers.get("content-type"), int(content_length)):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        compressed = self.compressor.compress(body, encoding)
+
+        compressed_response = Response(content=compressed, status_code=response.status_code)
+        # Header asli (content-type, ETag, dll.) dipertahankan; content-length dari body baru
+        compressed_response.raw_headers = [
+            (name, value) for name, value in response.raw_headers if name != b"content-length"
+        ] + [(b"content-length", str(len(compressed)).encode("latin-1"))]
+        compressed_response.headers["Content-Encoding"] = encoding
+        merge_vary(compressed_response.headers)
+        return compressed_response
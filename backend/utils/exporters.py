@@ -0,0 +1,183 @@
+import io
+import json
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+# Key schema metadata Arrow untuk metadata response (JSON)
+ARROW_METADATA_KEY = b'pangan_ai'
+
+# Format export yang didukung -> (media type, ekstensi file)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': (ARROW_MEDIA_TYPE, 'arrows')
+}
+
+
+class ExportDependencyError(Exception):
+    """Raised ketika format export membutuhkan package opsional yang tidak terinstall"""
+    pass
+
+
+def _format_dates(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Tanggal sebagai 'YYYY-MM-DD' untuk format teks"""
+    if 'tanggal' in chunk.columns:
+        chunk = chunk.copy()
+        chunk['tanggal'] = chunk['tanggal'].dt.strftime('%Y-%m-%d')
+    return chunk
+
+
+def iter_csv(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunk DataFrame sebagai CSV (header hanya di chunk pertama)"""
+    header = True
+    for chunk in chunks:
+        yield _format_dates(chunk).to_csv(index=False, header=header).encode('utf-8')
+        header = False
+
+
+def iter_ndjson(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunk DataFrame sebagai newline-delimited JSON"""
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        lines = _format_dates(chunk).to_json(orient='records', lines=True, force_ascii=False)
+        if not lines.endswith('\n'):
+            lines += '\n'
+        yield lines.encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """File-like sink yang di-drain per chunk; tell() tetap posisi absolut"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def ensure_parquet_support():
+    """Import pyarrow (opsional); ExportDependencyError jika tidak tersedia"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ExportDependencyError("Parquet export requires the 'pyarrow' package")
+
+
+def ensure_arrow_support():
+    """Import pyarrow IPC (opsional); ExportDependencyError jika tidak tersedia"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        raise ExportDependencyError("Arrow output requires the 'pyarrow' package")
+
+
+def _arrow_table(pa, frame: pd.DataFrame, schema=None):
+    # Konversi kolom per kolom (tanpa objek Python per baris)
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+
+def frame_to_arrow_ipc(frame: pd.DataFrame, metadata: Optional[Dict] = None) -> bytes:
+    """Serialize DataFrame sebagai Arrow IPC stream; metadata disimpan di schema"""
+    pa = ensure_arrow_support()
+
+    table = _arrow_table(pa, frame)
+    if metadata is not None:
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata[ARROW_METADATA_KEY] = json.dumps(metadata, default=str).encode('utf-8')
+        table = table.replace_schema_metadata(schema_metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def iter_arrow(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunk DataFrame sebagai satu Arrow IPC stream (satu batch per chunk)"""
+    pa = ensure_arrow_support()
+
+    sink = _ChunkSink()
+    writer = None
+    schema = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = _arrow_table(pa, chunk)
+                schema = table.schema
+                writer = pa.ipc.new_stream(sink, schema)
+            else:
+                # Schema chunk pertama dipakai untuk semua chunk berikutnya
+                table = _arrow_table(pa, chunk, schema=schema)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+
+def iter_parquet(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """Encode chunk DataFrame sebagai satu file Parquet (satu row group per chunk)"""
+    pa = ensure_parquet_support()
+
+    sink = _ChunkSink()
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pa.parquet.ParquetWriter(sink, table.schema)
+            else:
+                # Schema chunk pertama dipakai untuk semua chunk berikutnya
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.drain()
+
+
+def stream_export(chunks: Iterable[pd.DataFrame], export_format: str) -> Iterator[bytes]:
+    """Pilih encoder sesuai format export"""
+    encoders = {
+        'csv': iter_csv,
+        'ndjson': iter_ndjson,
+        'parquet': iter_parquet,
+        'arrow': iter_arrow
+    }
+    if export_format not in encoders:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return encoders[export_format](chunks)
+
+
+def export_filename(export_format: str) -> str:
+    """Nama file download, sama dengan konvensi frontend"""
+    extension = EXPORT_FORMATS[export_format][1]
+    return f"pangan_data_{datetime.now().strftime('%Y-%m-%d')}.{extension}"
@@ -0,0 +1,217 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import logging
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from utils.compression import ResponseCompressor
+
+logger = logging.getLogger(__name__)
+
+# Endpoint data (GET) yang jawabannya hanya bergantung pada query + versi dataset
+CACHEABLE_PATHS = (
+    "/api/data/commodities",
+    "/api/data/regions",
+    "/api/data/historical",
+    "/api/data/matrix",
+    "/api/data/enhanced-statistics/",
+    "/api/data/seasonal-volatility/",
+    "/api/data/volatility-comparison",
+    "/api/data/volatility-alerts",
+)
+
+
+class CachedResponse:
+    """
+    Body response yang sudah di-render beserta strong ETag-nya.
+    `encoded` menyimpan body yang sudah dikompresi per content-encoding
+    (dihitung sekali saat entry dibuat), sehingga cache hit tidak
+    mengompresi ulang.
+    """
+
+    def __init__(self, body: bytes, status_code: int, media_type: Optional[str],
+                 encoded: Optional[Dict[str, bytes]] = None):
+        self.body = body
+        self.status_code = status_code
+        self.media_type = media_type
+        self.encoded = encoded or {}
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag per representasi (body terkompresi berbeda byte-nya)"""
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(body) for body in self.encoded.values())
+
+
+class ResponseCache:
+    """
+    LRU cache response, dibatasi jumlah entry dan total byte.
+    Key sudah mengandung versi dataset; saat versi berubah seluruh entry
+    lama dibuang sekaligus.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def make_key(path: str, query_items: Sequence[Tuple[str, str]], data_version: str) -> Tuple:
+        """Key = (route, query params ter-normalisasi, versi dataset)"""
+        params = tuple(sorted((name, value) for name, value in query_items if value != ""))
+        return (path, params, data_version)
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            version = key[2]
+            if version != self._version:
+                # Dataset berubah: entry versi lama tidak akan pernah hit lagi
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'data_version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified
+            }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match (weak comparison sesuai RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in [value[2:] if value.startswith("W/") else value for value in candidates]
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Cache response GET endpoint data per (route, query, versi dataset).
+    Request dengan If-None-Match yang cocok langsung dijawab 304 tanpa
+    menyentuh service; cache hit dikembalikan tanpa perhitungan pandas.
+    Jika versi dataset belum tersedia (service belum load) cache di-bypass.
+    Hanya response 200 tanpa Cache-Control no-store yang disimpan.
+    Dengan compressor, body di atas threshold disimpan juga dalam bentuk
+    terkompresi dan dikirim sesuai Accept-Encoding request.
+    """
+
+    def __init__(self, app, cache: ResponseCache, version_provider: Callable[[], Optional[str]],
+                 paths: Sequence[str] = CACHEABLE_PATHS,
+                 compressor: Optional[ResponseCompressor] = None):
+        super().__init__(app)
+        self.cache = cache
+        self.version_provider = version_provider
+        self.paths = tuple(paths)
+        self.compressor = compressor
+
+    def _is_cacheable(self, request: Request) -> bool:
+        if request.method != "GET":
+            return False
+        path = request.url.path
+        return any(path == prefix or (prefix.endswith("/") and path.startswith(prefix))
+                   for prefix in self.paths)
+
+    async def dispatch(self, request: Request, call_next):
+        if not self._is_cacheable(request):
+            return await call_next(request)
+
+        # Provider bisa query SQLite / swap snapshot (sync revisi antar
+        # worker): jalankan di threadpool supaya event loop tidak tertahan
+        data_version = await run_in_threadpool(self.version_provider)
+        if data_version is None:
+            return await call_next(request)
+
+        key = ResponseCache.make_key(request.url.path, request.query_params.multi_items(), data_version)
+        entry = self.cache.get(key)
+
+        if entry is None:
+            response = await call_next(request)
+            # Response fallback/degraded ditandai handler dengan no-store
+            if response.status_code != 200 or "no-store" in response.headers.get("cache-control", ""):
+                return response
+
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            media_type = response.media_type or response.headers.get("content-type")
+            encoded = None
+            if self.compressor is not None and self.compressor.should_compress(media_type, len(body)):
+                encoded = self.compressor.compress_all(body)
+            entry = CachedResponse(body, response.status_code, media_type, encoded=encoded)
+            self.cache.put(key, entry)
+
+        encoding = None
+        if entry.encoded:
+            encoding = self.compressor.select_encoding(request.headers.get("accept-encoding"))
+
+        if etag_matches(request.headers.get("if-none-match"), entry.etag_for(encoding)):
+            self.cache.not_modified += 1
+            return Response(status_code=304, headers=self._cache_headers(entry, encoding))
+
+        return Response(
+            content=entry.encoded[encoding] if encoding else entry.body,
+            status_code=entry.status_code,
+            media_type=entry.media_type,
+            headers=self._cache_headers(entry, encoding)
+        )
+
+    @staticmethod
+    def _cache_headers(entry: CachedResponse, encoding: Optional[str] = None) -> Dict[str, str]:
+        # no-cache: browser boleh menyimpan, tapi selalu revalidasi via ETag
+        headers = {"ETag": entry.etag_for(encoding), "Cache-Control": "no-cache"}
+        if entry.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
@@ -142,6 +142,33 @@ class PredictionRequest(BaseModel):
     def _validate_region(cls, v):
         return validate_region_name(v)
 
+class DailyPriceRecord(BaseModel):
+    """Satu baris harga harian untuk incremental ingestion"""
+    tanggal: date = Field(..., description="Tanggal harga (YYYY-MM-DD)")
+    harga: float = Field(..., gt=0, description="Harga")
+    tavg_final: Optional[float] = Field(None, description="Suhu rata-rata")
+    rh_avg_final: Optional[float] = Field(None, description="Kelembaban rata-rata")
+    ff_avg_final: Optional[float] = Field(None, description="Kecepatan angin rata-rata")
+    rr: float = Field(0.0, ge=0, description="Curah hujan")
+    dum_ramadan: int = Field(0, ge=0, le=1)
+    dum_idulfitri: int = Field(0, ge=0, le=1)
+    dum_natal_newyr: int = Field(0, ge=0, le=1)
+
+class PriceIngestRequest(BaseModel):
+    """Validation model for daily price ingestion"""
+    commodity: str = Field(..., min_length=2, max_length=100, description="Nama komoditas")
+    region: str = Field(..., min_length=3, max_length=100, description="Nama wilayah")
+    records: List[DailyPriceRecord] = Field(..., description="Baris harga harian baru")
+
+    @field_validator('records')
+    @classmethod
+    def _validate_records(cls, v):
+        if len(v) == 0:
+            raise ValueError("Minimal harus ada 1 record")
+        if len(v) > 1000:
+            raise ValueError("Maksimal 1000 record per request")
+        return v
+
 class AIInsightRequest(BaseModel):
     """Validation model for AI insight generation"""
     predictions: List[float] = Field(..., description="Price predictions")
@@ -281,6 +308,7 @@ __all__ = [
     'validate_price_value', 'validate_date_range_util',
     'BaseResponse', 'ErrorResponse',
     'HistoricalDataRequest', 'PredictionRequest',
+    'DailyPriceRecord', 'PriceIngestRequest',
     'AIInsightRequest', 'ChatRequest',
     'HistoricalDataResponse', 'PredictionResponse',
     'AIInsightResponse', 'ChatResponse',